@@ -0,0 +1,46 @@
+/// Copyright 2012-2017 Alexander Bohn <fish2000@gmail.com>
+/// License: MIT (see COPYING.MIT file)
+
+#ifndef HALDOL_INCLUDE_JIT_HH_
+#define HALDOL_INCLUDE_JIT_HH_
+
+#include <map>
+#include <string>
+#include <vector>
+#include "Halide.h"
+
+namespace jit {
+    
+    using stringmap_t = std::map<std::string, std::string>;
+    using argvec_t = std::vector<Halide::Argument>;
+    using argv_t = std::vector<void const*>;
+    using argv_function_t = int (*)(void const**);
+    
+    /// A registered generator, built for a target with the given GeneratorParam
+    /// values and JIT-compiled -- which may then be called any number of times,
+    /// from any thread (the GIL need not be held), with a vector of pointers: one
+    /// per argument, in the order of `arguments()` -- halide_buffer_t pointers
+    /// for buffer arguments, and pointers to the values of scalar arguments:
+    class callable {
+        
+        public:
+            callable(std::string const& generator_name,
+                     stringmap_t const& params,
+                     Halide::Target const& target);
+            
+            std::string const& name() const;
+            argvec_t const& arguments() const;
+            
+            /// Returns zero on success, or a nonzero halide_error_code_t value:
+            int call(argv_t& argv) const;
+        
+        private:
+            std::string function_name;
+            argvec_t function_arguments;
+            Halide::Internal::JITModule jit_module;
+            argv_function_t argv_function;
+    };
+    
+}
+
+#endif /// HALDOL_INCLUDE_JIT_HH_
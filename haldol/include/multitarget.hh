@@ -0,0 +1,33 @@
+/// Copyright 2012-2017 Alexander Bohn <fish2000@gmail.com>
+/// License: MIT (see COPYING.MIT file)
+
+#ifndef HALDOL_INCLUDE_MULTITARGET_HH_
+#define HALDOL_INCLUDE_MULTITARGET_HH_
+
+#include <map>
+#include <string>
+#include <vector>
+#include "Halide.h"
+
+namespace multitarget {
+    
+    using stringmap_t = std::map<std::string, std::string>;
+    using targetvec_t = std::vector<Halide::Target>;
+    
+    /// A Halide::ModuleProducer that builds a module for the named registered
+    /// generator, with the given GeneratorParam values, for whichever target
+    /// it is asked for:
+    Halide::ModuleProducer generator_module_producer(std::string const& generator_name,
+                                                     stringmap_t const& params);
+    
+    /// Compile the named registered generator for each of the targets, combining
+    /// the results into one runtime-dispatching multi-target static library:
+    void compile_generator(std::string const& generator_name,
+                           stringmap_t const& params,
+                           Halide::Outputs const& outputs,
+                           targetvec_t const& targets,
+                           stringmap_t const& suffixes);
+    
+}
+
+#endif /// HALDOL_INCLUDE_MULTITARGET_HH_
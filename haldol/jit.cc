@@ -0,0 +1,44 @@
+
+#include <stdexcept>
+#include "jit.hh"
+#include "multitarget.hh"
+
+namespace jit {
+    
+    callable::callable(std::string const& generator_name,
+                       stringmap_t const& params,
+                       Halide::Target const& target)
+        :function_name(generator_name)
+        {
+            Halide::Target jit_target = target.with_feature(Halide::Target::JIT);
+            Halide::Module module = multitarget::generator_module_producer(generator_name,
+                                                                           params)(generator_name,
+                                                                                   jit_target);
+            Halide::Internal::LoweredFunc function = module.get_function_by_name(generator_name);
+            for (auto const& argument : function.args) {
+                function_arguments.push_back(argument);
+            }
+            jit_module = Halide::Internal::JITModule(module, function);
+            argv_function = reinterpret_cast<argv_function_t>(
+                            jit_module.argv_entrypoint_symbol().address);
+            if (!argv_function) {
+                throw std::runtime_error("no JIT entry point for generator: " + generator_name);
+            }
+        }
+    
+    std::string const& callable::name() const {
+        return function_name;
+    }
+    
+    argvec_t const& callable::arguments() const {
+        return function_arguments;
+    }
+    
+    int callable::call(argv_t& argv) const {
+        if (argv.size() != function_arguments.size()) {
+            return halide_error_code_generic_error;
+        }
+        return argv_function(argv.data());
+    }
+    
+}
@@ -0,0 +1,31 @@
+
+#include "multitarget.hh"
+
+namespace multitarget {
+    
+    Halide::ModuleProducer generator_module_producer(std::string const& generator_name,
+                                                     stringmap_t const& params) {
+        Halide::GeneratorParamsMap params_map;
+        for (auto const& param : params) {
+            params_map[param.first] = Halide::Internal::StringOrLoopLevel(param.second);
+        }
+        return [generator_name, params_map](std::string const& function_name,
+                                            Halide::Target const& target) -> Halide::Module {
+            auto generator = Halide::Internal::GeneratorRegistry::create(generator_name,
+                                                                         Halide::GeneratorContext(target));
+            generator->set_generator_param_values(params_map);
+            return generator->build_module(function_name);
+        };
+    }
+    
+    void compile_generator(std::string const& generator_name,
+                           stringmap_t const& params,
+                           Halide::Outputs const& outputs,
+                           targetvec_t const& targets,
+                           stringmap_t const& suffixes) {
+        Halide::compile_multitarget(generator_name, outputs, targets,
+                                    generator_module_producer(generator_name, params),
+                                    suffixes);
+    }
+    
+}
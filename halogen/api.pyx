@@ -1,6 +1,9 @@
 #!/usr/bin/env cython
 # distutils: language = c++
 from array import array
+import struct
+import sys
+import threading
 
 import cython
 cimport cython
@@ -12,8 +15,11 @@ from libc.stdint cimport *
 # from libcpp.cast cimport static_cast
 from libcpp.string cimport string
 from libcpp.memory cimport unique_ptr
+from libcpp.vector cimport vector
 
 from cpython.bool cimport PyBool_FromLong
+from cpython.buffer cimport PyObject_GetBuffer, PyBuffer_Release
+from cpython.buffer cimport PyBUF_STRIDES, PyBUF_FORMAT, PyBUF_WRITABLE
 from cpython.int cimport PyInt_FromLong, PyInt_AsLong
 # from cpython.long cimport PyLong_AsLong
 from cpython.mapping cimport PyMapping_Check
@@ -31,6 +37,7 @@ from ext.halide.module cimport LinkageType, LoweredFunc
 from ext.halide.module cimport Internal as Linkage_Internal
 from ext.halide.module cimport funcvec_t
 from ext.halide.module cimport modulevec_t
+from ext.halide.module cimport targetvec_t
 from ext.halide.module cimport link_modules as halide_link_modules
 from ext.halide.module cimport halide_compile_standalone_runtime_for_path
 from ext.halide.module cimport halide_compile_standalone_runtime_with_outputs
@@ -74,9 +81,16 @@ from ext.halide.util cimport running_program_name as halide_running_program_name
 from ext.halide.func cimport Stage as HalStage
 from ext.halide.func cimport Func as HalFunc
 
-from ext.halide.buffers cimport Buffer
+from ext.halide.runtime cimport halide_dimension_t, halide_buffer_t
+from ext.halide.runtime cimport halide_scalar_value_t
+from ext.halide.buffers cimport Buffer as HalBuffer
 from ext.halide.buffers cimport buffervec_t
 
+from ext.haldol.multitarget cimport compile_generator_multitarget
+from ext.haldol.jit cimport callable as HalJITCallable
+from ext.haldol.jit cimport argvec_t as jitargvec_t
+from ext.haldol.jit cimport argv_t as jitargv_t
+
 
 cdef inline bytes u8encode(object source):
     return bytes(source, encoding='UTF-8')
@@ -641,6 +655,26 @@ cdef class Outputs:
         out.__this__ = self.__this__.schedule(u8bytes(s))
         return out
     
+    def to_dict(self):
+        """ Return the compact form of the outputs: a dict of the non-empty filenames,
+            keyed by the names of their properties (as in “object_name” et al.) """
+        out = {}
+        for name in ("object_name", "assembly_name", "bitcode_name",
+                     "llvm_assembly_name", "c_header_name", "c_source_name",
+                     "python_extension_name", "stmt_name", "stmt_html_name",
+                     "static_library_name", "schedule_name"):
+            value = getattr(self, name)
+            if value:
+                out[name] = value
+        return out
+    
+    def __reduce__(self):
+        return (type(self), tuple(), self.to_dict())
+    
+    def __setstate__(self, object state not None):
+        for name, value in state.items():
+            setattr(self, name, value)
+    
     def to_string(self):
         return stringify(self, ("object_name", "assembly_name", "bitcode_name",
                                 "llvm_assembly_name", "c_header_name", "c_source_name",
@@ -890,6 +924,220 @@ cdef class EmitOptions:
         return self.to_string().decode('UTF-8')
 
 
+
+# Buffer-protocol format characters (the same as the NumPy “typechar” codes, q.v.
+# haldol/include/typecode.hh) mapped to the Halide type codes and bit widths they
+# correspond to -- the widths of the platform-dependent C types are as `struct` says:
+buffer_typechars = {
+    '?' : ('Bool',  8),
+    'b' : ('Int',   8), 'B' : ('UInt',  8),
+    'h' : ('Int',  16), 'H' : ('UInt', 16),
+    'i' : ('Int',  32), 'I' : ('UInt', 32),
+    'l' : ('Int',  struct.calcsize('l') * 8), 'L' : ('UInt', struct.calcsize('L') * 8),
+    'q' : ('Int',  64), 'Q' : ('UInt', 64),
+    'n' : ('Int',  struct.calcsize('n') * 8), 'N' : ('UInt', struct.calcsize('N') * 8),
+    'e' : ('Float', 16),
+    'f' : ('Float', 32),
+    'd' : ('Float', 64)
+}
+
+# Format byte-order prefixes denoting native byte order:
+native_byteorders = ('@', '=', sys.byteorder == 'little' and '<' or '>')
+
+# The largest extent or element stride a halide_dimension_t can hold:
+cdef int64_t DIMENSION_MAX = 2**31 - 1
+
+cdef Type buffer_format_type(object fmt, Py_ssize_t itemsize):
+    """ Return the Halide Type for a buffer-protocol format string, raising
+        a ValueError for non-native byte orders and non-scalar formats,
+        and a TypeError for formats lacking a Halide equivalent.
+    """
+    cdef Type out
+    typechar = fmt or 'B'
+    if typechar[0] in '@=<>!':
+        if typechar[0] not in native_byteorders:
+            raise ValueError(f"byte-swapped buffer format “{fmt}” is unsupported")
+        typechar = typechar[1:]
+    if len(typechar) != 1:
+        raise ValueError(f"buffer format “{fmt}” is not a single scalar type")
+    if typechar not in buffer_typechars:
+        raise TypeError(f"buffer format “{fmt}” has no Halide type equivalent")
+    code, bits = buffer_typechars[typechar]
+    if code == 'Bool':
+        out = Type.Bool()
+    else:
+        out = getattr(Type, code)(bits)
+    if max(bits // 8, 1) != itemsize:
+        raise ValueError(f"buffer format “{fmt}” has an itemsize of {itemsize} "
+                         f"(expected {max(bits // 8, 1)})")
+    return out
+
+
+cdef class Buffer:
+    """ Cython wrapper class for Halide::Buffer<void> -- constructed from an instance
+        of `numpy.ndarray` (or anything else exporting the buffer protocol) without
+        copying: the Halide buffer points into the array’s memory, with the array’s
+        extents and strides. The buffer keeps a reference to the array -- and holds
+        its buffer export, so e.g. the array can’t be resized -- until it is released.
+        
+        By default the dimensions are reversed, such that the last (fastest-varying,
+        in a C-contiguous array) NumPy axis becomes the first Halide dimension -- so
+        an array of shape (height, width, channels) is a Halide buffer indexed as
+        (c, x, y). Pass `reverse_axes=False` to keep the NumPy order, as you might
+        for Fortran-ordered arrays.
+        
+        The array’s dtype must map to a Halide type, in native byte order; its
+        strides must be multiples of its itemsize (Halide strides are counted in
+        elements, not bytes); its data must be aligned to its itemsize; and all its
+        extents and strides must fit in 32 bits. If `writable` is True, the array
+        must be writable -- if it is None (the default) read-only arrays are also
+        accepted, and the `writable` property says which it was. Whatever doesn’t
+        pass muster raises a ValueError (or a TypeError, for unsupported dtypes).
+    """
+    
+    cdef:
+        HalBuffer[void] __this__
+        Py_buffer view
+        bint has_view
+        readonly object array
+        readonly bint writable
+        readonly bint reverse_axes
+    
+    @classmethod
+    def check(cls, instance):
+        return getattr(instance, '__class__', None) is cls
+    
+    def __cinit__(self, object array=None, object name=None, object writable=None,
+                                                            bint reverse_axes=True):
+        cdef int flags = PyBUF_STRIDES | PyBUF_FORMAT
+        cdef int ndim, idx, axis
+        cdef Py_ssize_t itemsize, stride
+        cdef vector[halide_dimension_t] shape
+        cdef Type dtype
+        cdef string name_string
+        
+        self.has_view = False
+        self.array = array
+        self.writable = False
+        self.reverse_axes = reverse_axes
+        if array is None:
+            return
+        
+        # Request a writable export first -- falling back to
+        # a read-only export unless writability was demanded:
+        try:
+            PyObject_GetBuffer(array, &self.view, flags | PyBUF_WRITABLE)
+            self.writable = True
+        except BufferError:
+            if writable:
+                raise ValueError("array is read-only, but a writable buffer was requested")
+            PyObject_GetBuffer(array, &self.view, flags)
+        self.has_view = True
+        
+        itemsize = self.view.itemsize
+        ndim = self.view.ndim
+        fmt = self.view.format is not NULL and (<bytes>self.view.format).decode('UTF-8') or 'B'
+        dtype = buffer_format_type(fmt, itemsize)
+        
+        if (<uintptr_t>self.view.buf) % itemsize != 0:
+            raise ValueError(f"array data is not aligned to its itemsize ({itemsize})")
+        
+        shape.resize(ndim)
+        for idx in range(ndim):
+            axis = (ndim - 1 - idx) if reverse_axes else idx
+            stride = self.view.strides[axis]
+            if stride % itemsize != 0:
+                raise ValueError(f"stride {stride} of axis {axis} is not a multiple "
+                                 f"of the array itemsize ({itemsize})")
+            stride //= itemsize
+            if self.view.shape[axis] > DIMENSION_MAX or abs(stride) > DIMENSION_MAX:
+                raise ValueError(f"axis {axis} is too large for a Halide buffer")
+            shape[idx] = halide_dimension_t(0, <int32_t>self.view.shape[axis],
+                                               <int32_t>stride, 0)
+        
+        name_string = <string>u8bytes(name or '')
+        self.__this__ = HalBuffer[void](dtype.__this__, self.view.buf, ndim,
+                                        shape.data(), name_string)
+    
+    def __dealloc__(self):
+        self.release()
+    
+    cpdef void release(Buffer self):
+        """ Drop the Halide buffer and release the array’s buffer export """
+        self.__this__ = HalBuffer[void]()
+        if self.has_view:
+            PyBuffer_Release(&self.view)
+            self.has_view = False
+    
+    @property
+    def defined(self):
+        return self.__this__.defined()
+    
+    @property
+    def name(self):
+        return self.__this__.name().decode('UTF-8')
+    @name.setter
+    def name(self, object value not None):
+        self.__this__.set_name(<string>u8bytes(value))
+    
+    @property
+    def type(self):
+        out = Type()
+        out.__this__ = self.__this__.type()
+        return out
+    
+    @property
+    def dimensions(self):
+        if not self.__this__.defined():
+            return 0
+        return self.__this__.dimensions()
+    
+    @property
+    def extents(self):
+        """ The extent of each dimension, in Halide order """
+        cdef halide_buffer_t* raw
+        if not self.__this__.defined():
+            return tuple()
+        raw = self.__this__.raw_buffer()
+        return tuple(raw.dim[idx].extent for idx in range(raw.dimensions))
+    
+    @property
+    def strides(self):
+        """ The stride of each dimension, in elements, in Halide order """
+        cdef halide_buffer_t* raw
+        if not self.__this__.defined():
+            return tuple()
+        raw = self.__this__.raw_buffer()
+        return tuple(raw.dim[idx].stride for idx in range(raw.dimensions))
+    
+    @property
+    def size_in_bytes(self):
+        if not self.__this__.defined():
+            return 0
+        return self.__this__.size_in_bytes()
+    
+    def __len__(self):
+        if not self.__this__.defined():
+            return 0
+        return self.__this__.number_of_elements()
+    
+    def __array__(self, *args):
+        # N.B. this returns the original array -- the Halide buffer shares its memory:
+        return self.array
+    
+    def to_string(self):
+        return stringify(self, ("name", "type", "extents", "strides", "writable"))
+    
+    def __bytes__(self):
+        return self.to_string()
+    
+    def __str__(self):
+        return self.to_string().decode('UTF-8')
+    
+    def __repr__(self):
+        return self.to_string().decode('UTF-8')
+
+
 ctypedef unique_ptr[HalModule] module_ptr_t
 
 cdef class Module:
@@ -898,9 +1146,11 @@ cdef class Module:
     
     cdef:
         module_ptr_t __this__
+        dict compiled
     
     def __cinit__(self, *args, **kwargs):
         cdef HalTarget htarg
+        self.compiled = {}
         for arg in args:
             if type(arg) is type(self):
                 htarg = HalTarget(<string>arg.get_target().to_string())
@@ -975,12 +1225,16 @@ cdef class Module:
     
     def append(self, other not None):
         # Eventually this’ll cover the other Halide::Module::append(…) overloads:
-        # Halide::Buffer<void>, Halide::LoweredFunc, and Halide::ExternalCode --
-        # which those (at time of writing) do not yet have wrapper cdef-class types:
+        # Halide::LoweredFunc and Halide::ExternalCode -- which those (at time
+        # of writing) do not yet have wrapper cdef-class types:
         cdef Module mother
+        cdef Buffer buffer
         if type(other) is type(self):
             mother = <Module>other
             deref(self.__this__).append(deref(mother.__this__))
+        elif type(other) is Buffer:
+            buffer = <Buffer>other
+            deref(self.__this__).append(buffer.__this__)
     
     cdef void replace_instance(Module self, HalModule&& m) nogil:
         self.__this__.reset(new HalModule(m))
@@ -990,8 +1244,15 @@ cdef class Module:
         cdef HalOutputs outs = <HalOutputs>outputs.__this__
         with nogil:
             this.compile(outs)
+        self.compiled.update(outputs.to_dict())
         return self
     
+    @property
+    def outputs(self):
+        """ A dict of the filenames to which the module has been compiled, keyed
+            by the names of the halogen.api.Outputs properties (q.v. supra.) """
+        return dict(self.compiled)
+    
     def resolve_submodules(self):
         return Module.with_instance(
             deref(self.__this__).resolve_submodules())
@@ -1008,6 +1269,20 @@ cdef class Module:
         cdef stringmap_t metadata_map = deref(self.__this__).get_metadata_name_map()
         return dict(metadata_map)
     
+    def serialize(self):
+        """ Return the compact serialized form of the module -- its name, target string,
+            metadata map and output filenames, as a dict of strings -- from which a
+            lightweight proxy can be reconstituted (q.v. `module_proxy(…)` sub.) """
+        return dict(name=u8str(self.name),
+                    target=u8str(self.get_target().to_string()),
+                    metadata={ u8str(k) : u8str(v) for k, v in self.get_metadata().items() },
+                    outputs=self.outputs)
+    
+    def __reduce__(self):
+        # The std::unique_ptr<Halide::Module> can’t be pickled, so the module is
+        # unpickled as a proxy -- sans buffers, functions and submodules:
+        return (module_proxy, (self.serialize(),))
+    
     def to_string(self):
         cdef string name = <string>deref(self.__this__).name()
         cdef string targ = <string>deref(self.__this__).target().to_string()
@@ -1043,6 +1318,13 @@ cdef class Module:
         return self.to_string().decode('UTF-8')
 
 
+def module_proxy(object serialized not None):
+    """ Reconstitute the serialized form of a halogen.api.Module instance
+        (q.v. `Module.serialize()` supra.) as a lightweight proxy -- an instance
+        of halogen.generate.ModuleMetadata -- without rebuilding the module. """
+    from halogen.generate import ModuleMetadata
+    return ModuleMetadata(**serialized)
+
 ## FUNCTION WRAPPERS:
 
 def get_host_target():
@@ -1061,13 +1343,33 @@ cpdef bint validate_target_string(object target_string):
     """ Halide::Target::validate_target_string(s) static method wrapper call. """
     return HalTarget.validate_target_string(<string>u8bytes(target_string))
 
+# A snapshot of the names in the generator registry, taken the first time anyone asks for
+# it -- and retaken only after it’s invalidated (q.v. `invalidate_registry()` sub.), which
+# happens whenever halogen.generate.preload(…) loads a library, registering its generators:
+cdef object registry_names = None
+
+cpdef frozenset registry_snapshot():
+    """ Return a frozenset of the names of the registered generators, enumerating
+        them using Halide::GeneratorRegistry only if the snapshot was invalidated. """
+    global registry_names
+    if registry_names is None:
+        registry_names = frozenset(u8str(enumerated_name) \
+                               for enumerated_name in GeneratorRegistry.enumerate())
+    return registry_names
+
+cpdef void invalidate_registry():
+    """ Invalidate the generator registry snapshot -- call this after loading any
+        library that registers generators, other than by way of `preload(…)`. """
+    global registry_names
+    registry_names = None
+
 cpdef set registered_generators():
     """ Enumerate registered generators using Halide::GeneratorRegistry. """
-    cdef set out = set()
-    cdef tuple names = tuple(GeneratorRegistry.enumerate())
-    for enumerated_name in names:
-        out |= { u8str(enumerated_name) }
-    return out
+    return set(registry_snapshot())
+
+cpdef bint is_registered_generator(object name):
+    """ Check if a generator is registered (by name), in O(1) time. """
+    return u8str(name) in registry_snapshot()
 
 cdef string halide_compute_base_path(string& output_dir,
                                      string& function_name,
@@ -1102,8 +1404,12 @@ def compute_base_path(object output_dir not None,
 cpdef Module get_generator_module(object name, object arguments={}):
     """ Retrieve a Halide::Module, wrapped as halogen.api.Module,
         corresponding to the registered generator instance (by name). """
-    # first, check name against registered generators:
-    if u8str(name) not in registered_generators():
+    # first, check name against registered generators -- loading the library that
+    # registers the generator, if it’s not yet loaded and the generator index knows it:
+    if not is_registered_generator(name):
+        from halogen.generate import load_generators
+        load_generators(u8str(name))
+    if not is_registered_generator(name):
         raise ValueError("""can't find a registered generator named "%s" """ % u8str(name))
     
     # next, check that `arguments` is a mapping type:
@@ -1155,6 +1461,218 @@ cpdef Module get_generator_module(object name, object arguments={}):
     # return the newly built module:
     return out
 
+cdef void jit_scalar_value(halide_scalar_value_t* slot, Type scalar_type, object value) except *:
+    """ Store a Python value in a halide_scalar_value_t, per the Halide type of the argument """
+    cdef int bits = scalar_type.bits()
+    if scalar_type.is_bool():
+        slot.u.b = bool(value)
+    elif scalar_type.is_float():
+        if bits == 32:
+            slot.u.f32 = float(value)
+        elif bits == 64:
+            slot.u.f64 = float(value)
+        else:
+            raise TypeError(f"unsupported scalar argument type: {scalar_type}")
+    elif scalar_type.is_int():
+        if bits == 8:
+            slot.u.i8 = value
+        elif bits == 16:
+            slot.u.i16 = value
+        elif bits == 32:
+            slot.u.i32 = value
+        elif bits == 64:
+            slot.u.i64 = value
+        else:
+            raise TypeError(f"unsupported scalar argument type: {scalar_type}")
+    elif scalar_type.is_uint():
+        if bits == 8:
+            slot.u.u8 = value
+        elif bits == 16:
+            slot.u.u16 = value
+        elif bits == 32:
+            slot.u.u32 = value
+        elif bits == 64:
+            slot.u.u64 = value
+        else:
+            raise TypeError(f"unsupported scalar argument type: {scalar_type}")
+    else:
+        raise TypeError(f"unsupported scalar argument type: {scalar_type}")
+
+ctypedef unique_ptr[HalJITCallable] jit_callable_ptr_t
+
+cdef class JITCallable:
+    """ A registered generator, JIT-compiled in-process for a given target (with
+        a given set of GeneratorParam values) -- call it with its arguments, either
+        positionally (in the order of `argument_names`) or by name, to run the
+        pipeline with the GIL released. Buffer arguments may be halogen.api.Buffer
+        instances, or NumPy arrays (or other buffer-protocol exporters) which are
+        wrapped without copying; outputs must be writable, and are written in place.
+        Calling returns the output array -- or a tuple of them, if there are several.
+        
+        Don’t construct these directly: use `jit_compile(…)` or `realize(…)` (q.v. sub.)
+        which build each distinct (name, GeneratorParams, target) callable once only.
+    """
+    
+    cdef:
+        jit_callable_ptr_t __this__
+        readonly object name
+        readonly object params
+        readonly Target target
+        readonly tuple argument_names
+        tuple signature
+    
+    @staticmethod
+    cdef JITCallable with_generator(object name, dict params, Target target):
+        cdef JITCallable out = JITCallable()
+        cdef string generator_name = <string>u8bytes(name)
+        cdef stringmap_t parameters
+        cdef HalTarget htarget = target.__this__
+        cdef jitargvec_t arguments
+        cdef Type argument_type
+        
+        for k, v in params.items():
+            parameters[<string>u8bytes(k)] = <string>u8bytes(v)
+        
+        with nogil:
+            out.__this__.reset(new HalJITCallable(generator_name, parameters, htarget))
+        
+        out.name = u8str(name)
+        out.params = dict(params)
+        out.target = target
+        
+        # Describe each argument as a tuple: (name, is-buffer, is-output, dimensions, type):
+        signature = []
+        arguments = deref(out.__this__).arguments()
+        for idx in range(arguments.size()):
+            argument_type = Type()
+            argument_type.__this__ = arguments[idx].argument_type
+            signature.append((u8str(arguments[idx].name),
+                              bool(arguments[idx].is_buffer()),
+                              bool(arguments[idx].is_output()),
+                              int(arguments[idx].dimensions),
+                              argument_type))
+        out.signature = tuple(signature)
+        out.argument_names = tuple(argument[0] for argument in signature)
+        return out
+    
+    def __call__(self, *args, **kwargs):
+        cdef HalJITCallable* this = self.__this__.get()
+        cdef vector[halide_scalar_value_t] scalars
+        cdef jitargv_t argv
+        cdef Buffer buffer
+        cdef Type argument_type
+        cdef Py_ssize_t idx
+        cdef int result
+        
+        if this == NULL:
+            raise ValueError("JITCallable instance was not compiled")
+        if len(args) > len(self.signature):
+            raise TypeError(f"{self.name}() takes {len(self.signature)} arguments "
+                            f"({len(args)} given)")
+        
+        scalars.resize(len(self.signature))
+        argv.resize(len(self.signature))
+        buffers = []
+        outputs = []
+        
+        for idx, (argument_name, is_buffer, is_output, dimensions, argument_type) in enumerate(self.signature):
+            if idx < len(args):
+                if argument_name in kwargs:
+                    raise TypeError(f"{self.name}() got multiple values for argument “{argument_name}”")
+                value = args[idx]
+            elif argument_name in kwargs:
+                value = kwargs.pop(argument_name)
+            else:
+                raise TypeError(f"{self.name}() missing argument “{argument_name}”")
+            
+            if is_buffer:
+                if type(value) is Buffer:
+                    buffer = <Buffer>value
+                else:
+                    buffer = Buffer(value, name=argument_name, writable=is_output or None)
+                if not buffer.__this__.defined():
+                    raise ValueError(f"buffer argument “{argument_name}” is undefined")
+                if is_output and not buffer.writable:
+                    raise ValueError(f"output buffer argument “{argument_name}” is read-only")
+                if buffer.__this__.dimensions() != dimensions:
+                    raise ValueError(f"buffer argument “{argument_name}” has {buffer.__this__.dimensions()} "
+                                     f"dimensions (expected {dimensions})")
+                if buffer.type.code() != argument_type.code() or \
+                   buffer.type.bits() != argument_type.bits():
+                    raise ValueError(f"buffer argument “{argument_name}” is of type {buffer.type} "
+                                     f"(expected {argument_type})")
+                buffers.append(buffer)
+                if is_output:
+                    outputs.append(buffer.array if buffer.array is not None else buffer)
+                argv[idx] = <const void*>buffer.__this__.raw_buffer()
+            else:
+                jit_scalar_value(&scalars[idx], argument_type, value)
+                argv[idx] = <const void*>&scalars[idx]
+        
+        if len(kwargs) > 0:
+            raise TypeError(f"{self.name}() got unexpected arguments: {', '.join(kwargs)}")
+        
+        with nogil:
+            result = deref(this).call(argv)
+        
+        if result != 0:
+            raise RuntimeError(f"{self.name}() failed with Halide error code {result}")
+        
+        if len(outputs) == 1:
+            return outputs[0]
+        return tuple(outputs)
+    
+    def to_string(self):
+        return stringify(self, ("name", "params", "target", "argument_names"))
+    
+    def __bytes__(self):
+        return self.to_string()
+    
+    def __str__(self):
+        return self.to_string().decode('UTF-8')
+    
+    def __repr__(self):
+        return self.to_string().decode('UTF-8')
+
+# JIT-compiled generators, keyed by (name, GeneratorParams, target string) -- filled by
+# `jit_compile(…)` (q.v. sub.) and emptied by `jit_cache_clear()`:
+cdef dict jit_callables = {}
+jit_lock = threading.RLock()
+
+cpdef JITCallable jit_compile(object name, object arguments={}, object target=None):
+    """ JIT-compile the registered generator (by name) with the GeneratorParam values
+        in `arguments`, for the target -- by default, the JIT target from the environment
+        (q.v. HL_JIT_TARGET) -- returning a JITCallable. Each distinct combination of
+        name, GeneratorParam values and target is compiled once only, and cached. """
+    if not is_registered_generator(name):
+        raise ValueError("""can't find a registered generator named "%s" """ % u8str(name))
+    if not PyMapping_Check(arguments):
+        raise ValueError(""""arguments" must be a mapping (dict-ish) type""")
+    
+    if target is None:
+        target = Target.jit_target_from_environment()
+    elif type(target) is not Target:
+        target = Target(target_string=target)
+    
+    params = { u8str(k) : u8str(v) for k, v in arguments.items() }
+    key = (u8str(name), frozenset(params.items()), str(target))
+    
+    with jit_lock:
+        if key not in jit_callables:
+            jit_callables[key] = JITCallable.with_generator(name, params, target)
+        return jit_callables[key]
+
+cpdef void jit_cache_clear():
+    """ Forget all of the JIT-compiled generators cached by `jit_compile(…)` """
+    with jit_lock:
+        jit_callables.clear()
+
+def realize(object name not None, *args, object arguments={}, object target=None, **kwargs):
+    """ Run a registered generator in-process, on the given buffers and scalar values --
+        JIT-compiling it first, if it wasn’t already compiled (q.v. `jit_compile(…)` supra.)
+        with these GeneratorParam values for this target. Returns the output array(s). """
+    return jit_compile(name, arguments, target)(*args, **kwargs)
+
 cdef void f_insert_into(Module module, modulevec_t& modulevec) nogil:
     modulevec.push_back(deref(module.__this__))
 
@@ -1180,6 +1698,47 @@ def link_modules(module_name not None, *modules):
     
     return out
 
+def compile_multitarget(object name not None,
+                        Outputs outputs not None,
+                       *targets, object arguments={},
+                                 object suffixes={}):
+    """ Python wrapper for Halide::compile_multitarget() from src/Module.h --
+        compiles the registered generator (by name) once for each of the targets,
+        combining the results into one runtime-dispatching static library (and
+        header) as per the “outputs” object. GeneratorParam values may be passed
+        in the “arguments” dict, as per `get_generator_module()`. """
+    cdef string generator_name = <string>u8bytes(name)
+    cdef targetvec_t targetvec
+    cdef stringmap_t argmap
+    cdef stringmap_t suffixmap
+    cdef HalOutputs outs = <HalOutputs>outputs.__this__
+    cdef Target t
+    
+    # check name against registered generators:
+    if not is_registered_generator(name):
+        raise ValueError("""can't find a registered generator named "%s" """ % u8str(name))
+    
+    # check that we got some targets, of the right type:
+    if len(targets) < 1:
+        raise ValueError("""compile_multitarget() called without targets""")
+    for target_instance in targets:
+        if type(target_instance) is not Target:
+            raise TypeError("""All positional args must be halogen.api.Target""")
+        t = <Target>target_instance
+        targetvec.push_back(t.__this__)
+    
+    # Copy any GeneratorParam values and per-target filename suffixes
+    # from the Python dicts to the STL maps:
+    for k, v in dict(arguments).items():
+        argmap[<string>u8bytes(k)] = <string>u8bytes(v)
+    for k, v in dict(suffixes).items():
+        suffixmap[<string>u8bytes(k)] = <string>u8bytes(v)
+    
+    with nogil:
+        compile_generator_multitarget(generator_name, argmap, outs, targetvec, suffixmap)
+    
+    return outputs
+
 def compile_standalone_runtime(Target target=Target.target_from_environment(),
                                   object pth=None,
                              Outputs outputs=None):
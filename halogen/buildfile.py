@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function
+
+import os
+import re
+import shlex
+import typing as tx
+
+if __package__ is None or __package__ == '':
+    from errors import BuildFileError
+    from utils import u8str
+else:
+    from .errors import BuildFileError
+    from .utils import u8str
+
+__all__ = ('ninja_escape', 'ninja_expand',
+           'cmake_quote',
+           'BuildRule', 'BuildStep', 'BuildPlan')
+
+__dir__ = lambda: list(__all__)
+
+def ninja_escape(pth):
+    """ Escape a path for use in a Ninja “build” line -- where dollar signs, spaces
+        and colons are all significant, and must be escaped with a dollar sign.
+    """
+    return u8str(os.fspath(pth)).replace("$", "$$").replace(" ", "$ ").replace(":", "$:")
+
+# Ninja variable references -- “$$” (an escaped dollar sign), “${name}” or “$name”:
+ninja_variable = re.compile(r"\$(\$|\{\w+\}|\w+)")
+
+def ninja_expand(template, variables):
+    """ Expand the Ninja variable references in a command template, given a dict of
+        variable values -- as Ninja itself would, when running the command. Escaped
+        dollar signs become dollar signs; unknown variables expand to nothing.
+    """
+    def substitute(match):
+        name = match.group(1)
+        if name == "$":
+            return "$"
+        return variables.get(name.strip("{}"), "")
+    return ninja_variable.sub(substitute, template)
+
+def cmake_quote(argument):
+    """ Quote an argument for use in a CMake command invocation """
+    argument = u8str(argument)
+    for character, escape in (("\\", "\\\\"), ('"', '\\"'), ("$", "\\$"), (";", "\\;")):
+        argument = argument.replace(character, escape)
+    return f'"{argument}"'
+
+class BuildRule(tx.NamedTuple):
+
+    """ A Ninja-style rule: a command template -- in which “$in”, “$out” and the
+        variables of each build step are expanded -- along with a description
+        and, optionally, the path to the depfile that the command writes out.
+    """
+    
+    name: str
+    command: str
+    description: str = ""
+    depfile: tx.Optional[str] = None
+    restat: bool = False
+
+class BuildStep(tx.NamedTuple):
+
+    """ One build step: the outputs made from the inputs by running the command of
+        the named rule. Implicit dependencies are those that trigger a rebuild when
+        they change, but are not passed to the command as “$in”; `variables` is a
+        tuple of (name, value) pairs expanded in the command template.
+    """
+    
+    rule: str
+    outputs: tx.Tuple[str, ...]
+    inputs: tx.Tuple[str, ...] = tuple()
+    implicit: tx.Tuple[str, ...] = tuple()
+    variables: tx.Tuple[tx.Tuple[str, str], ...] = tuple()
+
+class BuildPlan(object):
+
+    """ A build graph -- of rules, and the steps that use them -- that can be written
+        out as a `build.ninja` file, or as a CMake fragment of custom commands. Either
+        way, the commands are exactly those that halogen would run itself; the build
+        system takes over the scheduling (and the incrementality) from there.
+        
+        As in:
+            
+            plan = BuildPlan(name="yodogg")
+            plan.rule('cxx', "c++ -c $in -o $out -MD -MF $out.d", depfile="$out.d")
+            plan.build('cxx', "yodogg.o", "yodogg.cpp")
+            plan.write_ninja("build.ninja")
+    """
+    
+    def __init__(self, name="halogen"):
+        self.name = u8str(name)
+        self.rules = {}
+        # N.B. plain lists, as the build steps are kept in the order that they’re added:
+        self.steps = []
+        self.defaults = []
+    
+    def rule(self, name, command, description="", depfile=None, restat=False):
+        """ Add a rule, returning the new halogen.buildfile.BuildRule """
+        if name in self.rules:
+            raise BuildFileError(f"duplicate rule: {name}")
+        self.rules[name] = BuildRule(name=name, command=command,
+                                                description=description,
+                                                depfile=depfile,
+                                                restat=bool(restat))
+        return self.rules[name]
+    
+    def build(self, rule, outputs, inputs=tuple(), implicit=tuple(), variables=None, default=False):
+        """ Add a build step using a previously-added rule, returning the new
+            halogen.buildfile.BuildStep -- optionally adding its outputs to
+            those that are built by default.
+        """
+        if rule not in self.rules:
+            raise BuildFileError(f"unknown rule: {rule}")
+        outputs = tuple(u8str(os.fspath(output)) for output in pathlist(outputs))
+        if len(outputs) < 1:
+            raise BuildFileError(f"build step using “{rule}” has no outputs")
+        step = BuildStep(rule=rule, outputs=outputs,
+                                    inputs=tuple(u8str(os.fspath(pth)) for pth in pathlist(inputs)),
+                                    implicit=tuple(u8str(os.fspath(pth)) for pth in pathlist(implicit)),
+                                    variables=tuple(sorted(dict(variables or {}).items())))
+        self.steps.append(step)
+        if default:
+            self.defaults.extend(outputs)
+        return step
+    
+    @property
+    def outputs(self):
+        """ A list of all of the outputs of all build steps """
+        return [output for step in self.steps for output in step.outputs]
+    
+    def commands(self, step):
+        """ Expand the command for a build step, returning a list of argument lists --
+            one per shell command, if the command template chains several with “&&”.
+        """
+        rule = self.rules[step.rule]
+        variables = { name : shlex.quote(value) for name, value in step.variables }
+        variables['in'] = " ".join(shlex.quote(pth) for pth in step.inputs)
+        variables['out'] = " ".join(shlex.quote(pth) for pth in step.outputs)
+        out, command = [], []
+        for argument in shlex.split(ninja_expand(rule.command, variables)):
+            if argument == "&&":
+                out.append(command)
+                command = []
+            else:
+                command.append(argument)
+        out.append(command)
+        return [command for command in out if len(command) > 0]
+    
+    def to_ninja(self):
+        """ Render the plan as the contents of a `build.ninja` file """
+        lines = [f"# Generated by halogen for “{self.name}” -- edits will be overwritten",
+                  "ninja_required_version = 1.3",
+                  ""]
+        for rule in self.rules.values():
+            lines.append(f"rule {rule.name}")
+            lines.append(f"  command = {rule.command}")
+            if rule.description:
+                lines.append(f"  description = {rule.description}")
+            if rule.depfile:
+                lines.append(f"  depfile = {rule.depfile}")
+                lines.append("  deps = gcc")
+            if rule.restat:
+                lines.append("  restat = 1")
+            lines.append("")
+        for step in self.steps:
+            line = f"build {' '.join(ninja_escape(pth) for pth in step.outputs)}: {step.rule}"
+            if step.inputs:
+                line += f" {' '.join(ninja_escape(pth) for pth in step.inputs)}"
+            if step.implicit:
+                line += f" | {' '.join(ninja_escape(pth) for pth in step.implicit)}"
+            lines.append(line)
+            for name, value in step.variables:
+                lines.append(f"  {name} = {value.replace('$', '$$')}")
+        if self.defaults:
+            lines.append("")
+            lines.append(f"build {ninja_escape(self.name)}: phony {' '.join(ninja_escape(pth) for pth in self.defaults)}")
+            lines.append(f"default {ninja_escape(self.name)}")
+        lines.append("")
+        return "\n".join(lines)
+    
+    def to_cmake(self):
+        """ Render the plan as a CMake fragment -- one `add_custom_command(…)` per build
+            step, and an `add_custom_target(…)` named for the plan, building the defaults.
+            N.B. depfiles are passed along with DEPFILE, which requires CMake 3.20 or later
+            (or 3.7, with the Ninja generator).
+        """
+        lines = [f"# Generated by halogen for “{self.name}” -- edits will be overwritten",
+                  ""]
+        for step in self.steps:
+            rule = self.rules[step.rule]
+            lines.append("add_custom_command(")
+            lines.append(f"    OUTPUT {' '.join(cmake_quote(pth) for pth in step.outputs)}")
+            for command in self.commands(step):
+                lines.append(f"    COMMAND {' '.join(cmake_quote(argument) for argument in command)}")
+            if step.inputs or step.implicit:
+                lines.append(f"    DEPENDS {' '.join(cmake_quote(pth) for pth in step.inputs + step.implicit)}")
+            if rule.depfile:
+                depfile = ninja_expand(rule.depfile, dict(step.variables, out=step.outputs[0]))
+                lines.append(f"    DEPFILE {cmake_quote(depfile)}")
+            if rule.description:
+                description = ninja_expand(rule.description, dict(step.variables, out=" ".join(step.outputs),
+                                                                                   **{ 'in' : " ".join(step.inputs) }))
+                lines.append(f"    COMMENT {cmake_quote(description)}")
+            lines.append("    VERBATIM)")
+            lines.append("")
+        if self.defaults:
+            lines.append(f"add_custom_target({self.name} ALL")
+            lines.append(f"    DEPENDS {' '.join(cmake_quote(pth) for pth in self.defaults)})")
+            lines.append("")
+        return "\n".join(lines)
+    
+    def write_ninja(self, pth):
+        """ Write the plan out as a `build.ninja` file, returning the path """
+        return self.write(pth, self.to_ninja())
+    
+    def write_cmake(self, pth):
+        """ Write the plan out as a CMake fragment, returning the path """
+        return self.write(pth, self.to_cmake())
+    
+    def write(self, pth, contents):
+        pth = os.fspath(pth)
+        temporary = f"{pth}{os.extsep}tmp"
+        with open(temporary, mode='w') as handle:
+            handle.write(contents)
+        os.replace(temporary, pth)
+        return pth
+    
+    def __len__(self):
+        return len(self.steps)
+    
+    def __repr__(self):
+        return f"<{type(self).__name__}(name={self.name!r}) rules={len(self.rules)} steps={len(self.steps)}>"
+
+def pathlist(value):
+    """ Return a list of paths from a lone path (or string) or an iterable of them """
+    if isinstance(value, (str, bytes)) or hasattr(value, '__fspath__'):
+        return [value]
+    return list(value or [])
+
+def test():
+
+    """ Run the inline tests for the halogen.buildfile module """
+    
+    if __package__ is None or __package__ == '':
+        from filesystem import TemporaryDirectory
+    else:
+        from .filesystem import TemporaryDirectory
+    
+    assert ninja_escape("yo dogg: $1") == "yo$ dogg$:$ $$1"
+    assert ninja_expand("cc $in -o $out -MF ${out}.d $$HOME $nope", { 'in' : "a.c", 'out' : "a.o" }) == \
+                        "cc a.c -o a.o -MF a.o.d $HOME "
+    assert cmake_quote('say "$yo;dogg"') == '"say \\"\\$yo\\;dogg\\""'
+    
+    plan = BuildPlan(name="yodogg")
+    plan.rule('cxx', "c++ -c $in -o $out -MD -MF $out.d", description="CXX $out",
+                                                          depfile="$out.d")
+    plan.rule('ar', "rm -f $out && ar rcs $out $in", description="AR $out")
+    plan.build('cxx', "/tmp/yo dogg.o", "/tmp/yo dogg.cpp")
+    plan.build('ar', "/tmp/yodogg.a", ["/tmp/yo dogg.o"], default=True)
+    assert len(plan) == 2
+    assert plan.outputs == ["/tmp/yo dogg.o", "/tmp/yodogg.a"]
+    assert plan.commands(plan.steps[1]) == [["rm", "-f", "/tmp/yodogg.a"],
+                                            ["ar", "rcs", "/tmp/yodogg.a", "/tmp/yo dogg.o"]]
+    
+    try:
+        plan.build('ld', "/tmp/yodogg.so", "/tmp/yo dogg.o")
+    except BuildFileError:
+        pass
+    else:
+        assert False, "unknown rule didn’t raise"
+    
+    ninja = plan.to_ninja()
+    assert "build /tmp/yo$ dogg.o: cxx /tmp/yo$ dogg.cpp" in ninja
+    assert "  deps = gcc" in ninja
+    assert "default yodogg" in ninja
+    
+    cmake = plan.to_cmake()
+    assert 'DEPFILE "/tmp/yo dogg.o.d"' in cmake
+    assert 'COMMAND "rm" "-f" "/tmp/yodogg.a"' in cmake
+    assert "add_custom_target(yodogg ALL" in cmake
+    
+    with TemporaryDirectory(prefix="test-buildfile-", change=False) as td:
+        pth = plan.write_ninja(td.subpath("build.ninja"))
+        with open(pth, mode='r') as handle:
+            assert handle.read() == ninja
+    print("* Build file tests completed OK")
+
+if __name__ == '__main__':
+    test()
@@ -0,0 +1,502 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+if __package__ is None or __package__ == '':
+    from config import compiler_version, environ_override
+    from errors import CacheError, ExecutionError
+    from filesystem import back_tick, rm_rf
+    from filesystem import Directory
+    from utils import stringify, u8bytes
+else:
+    from .config import compiler_version, environ_override
+    from .errors import CacheError, ExecutionError
+    from .filesystem import back_tick, rm_rf
+    from .filesystem import Directory
+    from .utils import stringify, u8bytes
+
+__all__ = ('DEFAULT_CACHE_DIRECTORY',
+           'DEFAULT_CACHE_SIZE',
+           'file_digest', 'halide_version',
+           'ContentCache', 'ObjectCache',
+                           'ArtifactCache')
+
+__dir__ = lambda: list(__all__)
+
+DEFAULT_CACHE_DIRECTORY = os.environ.get('HALOGEN_CACHE_DIR',
+                          os.path.join(os.path.expanduser('~'), '.cache', 'halogen'))
+
+DEFAULT_CACHE_SIZE = int(os.environ.get('HALOGEN_CACHE_SIZE',
+                         5 * 1024 * 1024 * 1024)) # 5 GiB
+
+file_digests = {}
+
+def file_digest(pth):
+    """ Compute the hex digest of the contents of a file -- memoized on the
+        files’ real path, size and modification time.
+    """
+    realpth = os.path.realpath(os.fspath(pth))
+    st = os.stat(realpth)
+    memo = (realpth, st.st_size, st.st_mtime_ns)
+    if memo not in file_digests:
+        hasher = hashlib.sha256()
+        with open(realpth, mode='rb') as handle:
+            for block in iter(lambda: handle.read(1024 * 1024), b''):
+                hasher.update(block)
+        file_digests[memo] = hasher.hexdigest()
+    return file_digests[memo]
+
+def loaded_library(name):
+    """ Return the real path to the shared library “lib<name>” -- preferably the one mapped
+        into this process (as linked by, say, the halogen.api extension module) or failing
+        that, whichever one `ctypes.util.find_library(…)` turns up -- or None, if neither pans
+        out. N.B. on Linux, `find_library(…)` returns a bare soname (e.g. “libHalide.so.17”)
+        rather than a path, which is why the process’ memory map is consulted first.
+    """
+    import ctypes.util
+    prefix = f"lib{name}{os.extsep}"
+    maps = os.path.join(os.sep, 'proc', 'self', 'maps')
+    if os.path.exists(maps):
+        with open(maps, mode='r') as handle:
+            for line in handle:
+                fields = line.split(None, 5)
+                if len(fields) < 6:
+                    continue
+                pth = fields[5].strip()
+                if os.path.basename(pth).startswith(prefix) and os.path.isfile(pth):
+                    return os.path.realpath(pth)
+    found = ctypes.util.find_library(name)
+    if found and os.path.isabs(found) and os.path.isfile(found):
+        return os.path.realpath(found)
+    return None
+
+def halide_version():
+    """ Return a string identifying the Halide library in use: the real path to the
+        Halide shared library loaded by the halogen.api extension module (which, on
+        most platforms, is versioned) plus the size and modification time of both that
+        library and the extension module itself, which is built against it. This is
+        cheaper than hashing the (rather large) Halide library, and changes whenever
+        the library is rebuilt or replaced -- even within the same soname. If the
+        library can’t be found at all, its soname is used in lieu of the path.
+    """
+    if not hasattr(halide_version, 'memo'):
+        import ctypes.util
+        if __package__ is None or __package__ == '':
+            import api # type: ignore
+        else:
+            from . import api # type: ignore
+        components = []
+        library = loaded_library('Halide') or ctypes.util.find_library('Halide')
+        for pth in (library, getattr(api, '__file__', None)):
+            components.append(str(pth))
+            if pth and os.path.isfile(pth):
+                st = os.stat(pth)
+                components.append(f"{st.st_size}:{st.st_mtime_ns}")
+        halide_version.memo = ":".join(components)
+    return halide_version.memo
+
+class ContentCache(object):
+
+    """ A persistent, content-addressed, size-bounded on-disk cache.
+        
+        Entries are regular files, stored under `directory/subdirectory` by the
+        hex digest key by which they are addressed. Fetching an entry bumps its
+        modification time, and once the total size of all entries exceeds the
+        `maximum_size` (in bytes), the least-recently-used entries are evicted.
+        
+        Hit, miss, store and eviction counts are kept per-instance, and can be
+        merged into a running total kept in the cache directory by calling
+        `save_stats()`. Instances are safe to share between threads.
+    """
+    
+    fields = ('directory', 'maximum_size', 'size', 'hits', 'misses', 'stores', 'evictions')
+    subdirectory = 'entries'
+    stats_filename = f'stats{os.extsep}json'
+    counters = ('hits', 'misses', 'stores', 'evictions')
+    
+    def __init__(self, directory=None, maximum_size=None):
+        self.directory = Directory(pth=directory or DEFAULT_CACHE_DIRECTORY)
+        self.maximum_size = int(maximum_size or DEFAULT_CACHE_SIZE)
+        self.entries = self.directory.subdirectory(self.subdirectory)
+        os.makedirs(self.entries.name, exist_ok=True)
+        self.lock = threading.RLock()
+        self._size = None
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def digest(*components):
+        """ Compute a hex-digest cache key from any number of string-ish components """
+        hasher = hashlib.sha256()
+        for component in components:
+            hasher.update(u8bytes(component))
+            hasher.update(b'\0')
+        return hasher.hexdigest()
+    
+    def entry_path(self, key, suffix=''):
+        """ The path at which the entry for `key` is (or would be) stored """
+        if not key:
+            raise CacheError("a cache key is required")
+        return os.path.join(self.entries.name, key[:2], f"{key}{suffix}")
+    
+    def __contains__(self, key):
+        return os.path.isfile(self.entry_path(key))
+    
+    @property
+    def size(self):
+        """ The total size (in bytes) of all cache entries """
+        with self.lock:
+            if self._size is None:
+                self._size = sum(size for size, _, _ in self.scan())
+            return self._size
+    
+    def scan(self):
+        """ Yield a (size, mtime, path) tuple for each file in the entry store """
+        for path, dirs, files in os.walk(self.entries.name):
+            for filename in files:
+                pth = os.path.join(path, filename)
+                try:
+                    st = os.stat(pth)
+                except FileNotFoundError:
+                    continue
+                yield (st.st_size, st.st_mtime, pth)
+    
+    def tally(self, hit):
+        """ Count a cache hit (if `hit` is truthy) or a miss (if not), returning `hit` """
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return hit
+    
+    def fetch(self, key, destination, suffix='', count=True):
+        """ Copy the entry for `key` (if any) to `destination`, returning True on a hit
+            and False on a miss. Pass `count=False` to leave the hit and miss counts be
+            (e.g. when fetching several related entries as one, q.v. `tally(…)` supra).
+        """
+        entry = self.entry_path(key, suffix)
+        try:
+            shutil.copyfile(entry, os.fspath(destination))
+            os.utime(entry)
+        except FileNotFoundError:
+            hit = False
+        else:
+            hit = True
+        return count and self.tally(hit) or hit
+    
+    def store(self, key, source, suffix=''):
+        """ Store a copy of the file at `source` as the entry for `key`, evicting the
+            least-recently-used entries as necessary, and returning the entry path.
+        """
+        source = os.fspath(source)
+        if not os.path.isfile(source):
+            raise CacheError(f"can't cache a non-file: {source}")
+        entry = self.entry_path(key, suffix)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        # Copy to a unique name, then atomically rename -- so concurrent
+        # readers and writers never see a partial entry:
+        incoming = f"{entry}{os.extsep}{os.getpid()}-{threading.get_ident()}{os.extsep}tmp"
+        shutil.copyfile(source, incoming)
+        os.replace(incoming, entry)
+        with self.lock:
+            self.stores += 1
+            if self._size is not None:
+                self._size += os.path.getsize(entry)
+        self.evict()
+        return entry
+    
+    def evict(self, maximum_size=None):
+        """ Remove least-recently-used entries until the cache fits within its size
+            limit (or the limit passed in), returning the number of entries evicted.
+        """
+        limit = int(maximum_size is None and self.maximum_size or maximum_size)
+        evicted = 0
+        with self.lock:
+            if self.size <= limit:
+                return evicted
+            # Evict down to 90% of the limit, so we don't thrash at the margin:
+            target = int(limit * 0.9)
+            for size, _, pth in sorted(self.scan(), key=lambda entry: entry[1]):
+                if self._size <= target:
+                    break
+                if rm_rf(pth):
+                    self._size -= size
+                    evicted += 1
+            self.evictions += evicted
+        return evicted
+    
+    def clear(self):
+        """ Remove every entry from the cache """
+        with self.lock:
+            out = rm_rf(self.entries)
+            os.makedirs(self.entries.name, exist_ok=True)
+            self._size = 0
+        return out
+    
+    @property
+    def stats_path(self):
+        return self.directory.subpath(self.stats_filename)
+    
+    def stats(self):
+        """ Return a dict of this instances’ counters, plus the current cache size """
+        with self.lock:
+            out = { counter : getattr(self, counter) for counter in self.counters }
+        out['size'] = self.size
+        out['maximum_size'] = self.maximum_size
+        return out
+    
+    def saved_stats(self):
+        """ Return the running totals stored in the cache directory """
+        try:
+            with open(self.stats_path, mode='r') as handle:
+                return dict(json.load(handle))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return { counter : 0 for counter in self.counters }
+    
+    def save_stats(self):
+        """ Merge this instances’ counters into the running totals stored in the cache
+            directory, reset the counters, and return the new totals.
+        """
+        with self.lock:
+            totals = self.saved_stats()
+            for counter in self.counters:
+                totals[counter] = int(totals.get(counter, 0)) + getattr(self, counter)
+                setattr(self, counter, 0)
+            incoming = f"{self.stats_path}{os.extsep}{os.getpid()}{os.extsep}tmp"
+            with open(incoming, mode='w') as handle:
+                json.dump(totals, handle, indent=4)
+            os.replace(incoming, self.stats_path)
+        return totals
+    
+    def report(self):
+        """ Return a summary of the cache statistics -- the running totals, as stored
+            in the cache directory, plus those of this instance -- as a string.
+        """
+        totals = self.saved_stats()
+        for counter in self.counters:
+            totals[counter] = int(totals.get(counter, 0)) + getattr(self, counter)
+        lookups = totals['hits'] + totals['misses']
+        ratio = lookups and 100.0 * totals['hits'] / lookups or 0.0
+        return "\n".join((f"{type(self).__name__}: {self.directory}",
+                          f"    Hits:      {totals['hits']} ({ratio:.1f}% of {lookups} lookups)",
+                          f"    Misses:    {totals['misses']}",
+                          f"    Stores:    {totals['stores']}",
+                          f"    Evictions: {totals['evictions']}",
+                          f"    Size:      {self.size} of {self.maximum_size} bytes"))
+    
+    def to_string(self):
+        return stringify(self, type(self).fields)
+    
+    def __repr__(self):
+        return stringify(self, type(self).fields)
+    
+    def __str__(self):
+        return os.fspath(self.directory)
+
+
+class ObjectCache(ContentCache):
+
+    """ A cache for compiled generator object code, á la `ccache`.
+        
+        Objects are keyed on the hash of the preprocessed source, the C++ compiler
+        command (with the input and output file names factored out, as these vary
+        from run to run), and the version banner of the compiler itself. Sources
+        that fail to preprocess are simply not cached -- the actual compilation
+        will then fail on its own, with a proper error message.
+    """
+    
+    subdirectory = 'objects'
+    
+    def key_for(self, conf, source):
+        """ Compute the cache key for compiling `source` with a config instance --
+            returning None if the source can’t be preprocessed.
+        """
+        source = os.fspath(source)
+        try:
+            preprocessed = back_tick(conf.cxx_preprocessor_flag_string(os.path.basename(source)),
+                                     as_str=False,
+                                     directory=os.path.dirname(source))
+        except ExecutionError:
+            return None
+        return self.digest(preprocessed,
+                           conf.cxx_flag_string("<output>", "<input>"),
+                           compiler_version(environ_override('CXX')))
+
+
+class ArtifactCache(ContentCache):
+
+    """ A cache for the outputs of running generators -- static libraries, headers,
+        statement files and the like -- so that re-running an unchanged generator
+        needn’t re-lower and re-codegen its module.
+        
+        Artifacts are keyed on the contents of the generator libraries, the name of
+        the generator, its GeneratorParam values, the target string, the emits and
+        filename substitutions, and the Halide library version (q.v. `halide_version()`
+        supra). Each output file is stored as its own entry, along with a JSON entry
+        listing those files and the module metadata -- a hit requires all of them.
+        
+        On a hit, the outputs are materialized by copying them from the cache -- or,
+        if the cache was constructed with `hardlink=True`, by hard-linking them (and
+        falling back to copying, e.g. across filesystems). N.B. hard-linked outputs
+        share their storage with the cache entries, and mustn’t be modified in place.
+    """
+    
+    fields = ('directory', 'maximum_size', 'size', 'hardlink', 'hits', 'misses', 'stores', 'evictions')
+    subdirectory = 'artifacts'
+    index_suffix = f"{os.extsep}json"
+    
+    def __init__(self, directory=None, maximum_size=None, hardlink=False):
+        super(ArtifactCache, self).__init__(directory=directory, maximum_size=maximum_size)
+        self.hardlink = bool(hardlink)
+    
+    def key_for(self, generator, target, emits, substitutions=None, params=None, libraries=()):
+        """ Compute the cache key for running the named generator """
+        return self.digest(*sorted(file_digest(library) for library in libraries),
+                           generator,
+                           json.dumps(dict(params or {}), sort_keys=True),
+                           target,
+                           ",".join(sorted(emits)),
+                           json.dumps(dict(substitutions or {}), sort_keys=True),
+                           halide_version())
+    
+    def materialize(self, entry, destination):
+        """ Hard-link (or copy) a cache entry to a destination path """
+        destination = os.fspath(destination)
+        if os.path.lexists(destination):
+            os.unlink(destination)
+        if self.hardlink:
+            try:
+                os.link(entry, destination)
+            except OSError:
+                pass
+            else:
+                return destination
+        shutil.copyfile(entry, destination)
+        return destination
+    
+    def fetch_outputs(self, key, names):
+        """ Materialize the cached outputs for `key` at the paths named in `names` (a dict
+            of halogen.api.Outputs property names and filenames), returning the metadata
+            of the cached module as a dict -- or None, on a miss.
+            
+            On a miss, any of the named outputs hard-linked from the cache by a previous hit
+            are unlinked -- lest the generator, when run, write through them into the cache.
+        """
+        try:
+            with open(self.entry_path(key, self.index_suffix), mode='r') as handle:
+                index = dict(json.load(handle))
+            for name in index['outputs']:
+                entry = self.entry_path(key, f"-{name}")
+                self.materialize(entry, names[name])
+                os.utime(entry)
+        except (FileNotFoundError, KeyError, json.JSONDecodeError):
+            for pth in names.values():
+                if pth and os.path.isfile(pth) and os.stat(pth).st_nlink > 1:
+                    os.unlink(pth)
+            return self.tally(None)
+        os.utime(self.entry_path(key, self.index_suffix))
+        self.tally(True)
+        return index['module']
+    
+    def store_outputs(self, key, names, module):
+        """ Store those of the outputs named in `names` that exist, along with a dict
+            of module metadata (its name, target and metadata mapping).
+        """
+        stored = []
+        for name, pth in sorted(names.items()):
+            if pth and os.path.isfile(pth):
+                self.store(key, pth, suffix=f"-{name}")
+                stored.append(name)
+        # Store the index last, so that concurrent readers never see an index
+        # naming outputs that aren’t (yet) in the cache:
+        incoming = self.directory.subpath(f"{key}{os.extsep}{os.getpid()}-{threading.get_ident()}{os.extsep}tmp")
+        try:
+            with open(incoming, mode='w') as handle:
+                json.dump(dict(outputs=stored, module=dict(module)), handle, indent=4, sort_keys=True)
+            self.store(key, incoming, suffix=self.index_suffix)
+        finally:
+            rm_rf(incoming)
+        return stored
+
+
+def test():
+
+    """ Run the inline tests for the halogen.cache module """
+    
+    from tempfile import gettempdir
+    if __package__ is None or __package__ == '':
+        from filesystem import TemporaryDirectory, TemporaryName
+    else:
+        from .filesystem import TemporaryDirectory, TemporaryName
+    
+    with TemporaryDirectory(prefix="test-cache-", change=False) as td:
+        cache = ContentCache(directory=td, maximum_size=1024)
+        key = cache.digest("yo", "dogg")
+        assert key not in cache
+        
+        with TemporaryName(suffix="txt", parent=gettempdir()) as tn:
+            with open(tn.name, mode='w') as handle:
+                handle.write("i heard you like caches" * 10)
+            cache.store(key, tn)
+            assert key in cache
+        
+        with TemporaryName(suffix="txt", parent=gettempdir()) as tn:
+            assert cache.fetch(key, tn)
+            assert tn.exists
+            assert not cache.fetch(cache.digest("nope"), tn)
+        
+        assert cache.hits == 1
+        assert cache.misses == 1
+        assert cache.stores == 1
+        assert cache.save_stats()['hits'] == 1
+        assert cache.hits == 0
+        
+        # Overfill the cache, to provoke an eviction:
+        for idx in range(10):
+            with TemporaryName(suffix="txt", parent=gettempdir()) as tn:
+                with open(tn.name, mode='w') as handle:
+                    handle.write("x" * 200)
+                cache.store(cache.digest("entry", str(idx)), tn)
+        assert cache.evictions > 0
+        assert cache.size <= cache.maximum_size
+        print(f"* Cache tests completed OK: {cache.stats()}")
+    
+    with TemporaryDirectory(prefix="test-artifact-cache-", change=False) as td:
+        cache = ArtifactCache(directory=td.subdirectory('cache'), hardlink=True)
+        names = { 'static_library_name' : td.subpath(f"yodogg{os.extsep}a"),
+                  'c_header_name'       : td.subpath(f"yodogg{os.extsep}h"),
+                  'stmt_name'           : td.subpath(f"yodogg{os.extsep}stmt") }
+        for name in ('static_library_name', 'c_header_name'):
+            with open(names[name], mode='w') as handle:
+                handle.write(f"// {name}\n")
+        library = names['c_header_name']
+        key = cache.key_for("yodogg", "host", ('static_library', 'h'), libraries=(library,))
+        assert key == cache.key_for("yodogg", "host", ('h', 'static_library'), libraries=(library,))
+        assert key != cache.key_for("yodogg", "host", ('h',), libraries=(library,))
+        assert key != cache.key_for("yodogg", "host", ('static_library', 'h'), params={ 'yo' : 'dogg' },
+                                                                               libraries=(library,))
+        
+        assert cache.fetch_outputs(key, names) is None
+        module = dict(name="yodogg", target="host", metadata={})
+        assert cache.store_outputs(key, names, module) == ['c_header_name', 'static_library_name']
+        for name in ('static_library_name', 'c_header_name'):
+            os.unlink(names[name])
+        assert cache.fetch_outputs(key, names) == module
+        assert os.path.isfile(names['static_library_name'])
+        assert not os.path.exists(names['stmt_name'])
+        assert cache.hits == 1
+        assert cache.misses == 1
+        print(cache.report())
+
+if __name__ == '__main__':
+    test()
@@ -1,42 +1,73 @@
 #!/usr/bin/env python
 # -*- encoding: utf-8 -*-
 #
-#       halogen.py
+#       cli.py
 #
-#       Run a Halide generator as part of a build system
+#       Run Halide generators as part of a build system
 #       (c) 2016 Alexander Bohn, All Rights Reserved
 #
 from __future__ import print_function
 
-import os, sys, re
-from os.path import basename, dirname
+import os, sys
 from docopt import docopt # type: ignore
 
+if __package__ is None or __package__ == '':
+    from cache import DEFAULT_CACHE_DIRECTORY, ArtifactCache, ObjectCache
+    from errors import HalogenError
+    from stats import BuildStats
+else:
+    from .cache import DEFAULT_CACHE_DIRECTORY, ArtifactCache, ObjectCache
+    from .errors import HalogenError
+    from .stats import BuildStats
+
+__all__ = ('parse_arguments',
+           'cli', 'main')
+
+__dir__ = lambda: list(__all__)
+
 __version__ = '0.1.0'
 
-halogen_source = basename(__file__)
-libimread_base = os.path.abspath(os.environ.get('LIBIMREAD_BASE',
-                 dirname(dirname(dirname(__file__)))))
-generator_base = os.path.relpath(os.environ.get('HALOGEN_BASE',
-                 os.path.join(libimread_base, 'build', 'halogen')))
-scratch_output = os.path.relpath(
-                 os.path.join(libimread_base, 'build', 'scratch_GENERATOR'))
+halogen_source = 'halogen'
 version_string = "%s %s" % (halogen_source, __version__)
 
 __doc__ = """
 %(version)s
 
+Compile, link and preload generators from a directory of C++ sources (or preload
+a previously linked generator library) and run them, GenGen-style. Arguments name
+the generators to run (all of them, by default) as does GenGen’s “-g NAME” -- those
+of the form NAME=VALUE are GeneratorParam values, with “target=…” taken as the list
+of targets.
+
 Usage:
-  %(source)s GENERATOR    [-e BINARY   | --executable=BINARY]
-                          [-o OUTDIR   | --output=OUTDIR]
-                          [-t TARGETS  | --targets=TARGETS]
-                          [-V | --verbose]
+  %(source)s [ARGUMENT...] (-s SOURCES | --sources=SOURCES | -l LIBRARY | --library=LIBRARY)
+                           [-g NAME     | --generator=NAME]
+                           [-o OUTDIR   | --output=OUTDIR]
+                           [-t TARGETS  | --targets=TARGETS]
+                           [-e EMITS    | --emit=EMITS]
+                           [-j JOBS     | --jobs=JOBS]
+                           [-i DIR      | --intermediate=DIR]
+                           [--cache-dir=DIR] [--incremental] [--multitarget]
+                           [--stats] [--trace=FILE] [-V | --verbose]
+  %(source)s --stats       [--cache-dir=DIR]
   %(source)s -h | --help | -v | --version
-  
+
 Options:
-  -e BINARY, --executable=BINARY    specify path to executable [default: %(generators)s/GENERATOR].
-  -o OUTDIR, --output=OUTDIR        specify output directory [default: %(scratch)s].
+  -s SOURCES, --sources=SOURCES     specify a directory of generator sources to build.
+  -l LIBRARY, --library=LIBRARY     specify a previously linked generator library.
+  -g NAME, --generator=NAME         specify a generator to run, as per GenGen.
+  -o OUTDIR, --output=OUTDIR        specify output directory [default: .].
   -t TARGETS, --targets=TARGETS     specify comma-separated list of targets [default: host].
+  -e EMITS, --emit=EMITS            specify comma-separated list of emit options, or one of
+                                    “default”, “expanded” or “all” [default: default].
+  -j JOBS, --jobs=JOBS              specify the number of parallel jobs [default: %(jobs)s].
+  -i DIR, --intermediate=DIR        specify a directory for intermediate build artifacts.
+  --cache-dir=DIR                   cache object code and generator outputs in this directory.
+  --incremental                     only rebuild what changed (requires --intermediate).
+  --multitarget                     also emit a multi-target library per generator.
+  --stats                           print per-phase timings and cache statistics -- or,
+                                    on its own, just the cache statistics [cache: %(cache)s].
+  --trace=FILE                      write Chrome trace-event JSON of the build phases.
   -V, --verbose                     print verbose output.
   -h, --help                        show this text.
   -v, --version                     print version.
@@ -44,54 +75,152 @@ Options:
 """ % {
     'version'       : version_string,
     'source'        : halogen_source,
-    'generators'    : generator_base,
-    'scratch'       : scratch_output
+    'jobs'          : os.cpu_count() or 1,
+    'cache'         : DEFAULT_CACHE_DIRECTORY
 }
 
+def parse_arguments(arguments):
+    """ Split the ARGUMENT values into generator names and GeneratorParam values --
+        returning a tuple of (names, params, targets), where `targets` is the list
+        of targets from a “target=…” param (if there was one) or None.
+    """
+    names, params, targets = [], {}, None
+    for argument in arguments:
+        if '=' in argument:
+            key, value = argument.split('=', 1)
+            if key == 'target':
+                targets = [target.strip() for target in value.split(',') if target.strip()]
+            else:
+                params[key] = value
+        else:
+            names.append(argument)
+    return names, params, targets
+
 def cli(argv=None):
+    """ Run the halogen command line interface, returning the exit status """
     if not argv:
         argv = sys.argv
-    
+
     arguments = docopt(__doc__, argv=argv[1:],
                                 help=True,
                                 version=version_string)
-    
-    print(argv)
-    print(arguments)
-    # sys.exit()
-    
+
+    if __package__ is None or __package__ == '':
+        from compile import CONF, Generators
+        from generate import generate, preload, profile_summary
+    else:
+        from .compile import CONF, Generators
+        from .generate import generate, preload, profile_summary
+
+    cache_directory = arguments.get('--cache-dir')
+    show_stats = bool(arguments.get('--stats'))
+
+    if show_stats and not (arguments.get('--sources') or arguments.get('--library')):
+        cache_directory = cache_directory or DEFAULT_CACHE_DIRECTORY
+        print(ObjectCache(directory=cache_directory).report())
+        print(ArtifactCache(directory=cache_directory).report())
+        return 0
+
     verbose = bool(arguments.get('--verbose'))
-    name = arguments.get('GENERATOR')
-    executable = re.sub('GENERATOR', name, arguments.get('--executable'))
-    output = re.sub('GENERATOR', name, arguments.get('--output'))
-    targets = [target.strip() for target in arguments.get('--targets').split(',')]
-    
-    if not os.path.isabs(executable):
-        executable = os.path.join(libimread_base, executable)
-    if not os.path.isabs(output):
-        output = os.path.join(libimread_base, output)
-    # if not os.path.isdir(output):
-    #     os.makedirs(output)
-    
-    print('')
-    print("VERBOSE: %s" % verbose)
-    print("NAME: %s" % name)
-    print("EXECUTABLE: %s" % executable)
-    print("IS FILE? %s" % os.path.isfile(executable))
-    print("OUTPUT: %s" % output)
-    print("IS DIR? %s" % os.path.isdir(output))
-    
-    print('')
-    print("TARGETS (%s): %s" % (len(targets), ", ".join(targets)))
+    names, params, targets = parse_arguments(arguments.get('ARGUMENT'))
+    if arguments.get('--generator'):
+        names.append(arguments.get('--generator'))
+    targets = targets or [target.strip() for target in arguments.get('--targets').split(',')]
+    emit = [emit.strip() for emit in arguments.get('--emit').split(',') if emit.strip()]
+    if len(emit) == 1 and emit[0] in Generators.emits:
+        emit = Generators.emits[emit[0]]
+    jobs = int(arguments.get('--jobs'))
+    output = os.path.abspath(arguments.get('--output'))
+    intermediate = arguments.get('--intermediate')
+
+    if not os.path.isdir(output):
+        os.makedirs(output)
+
+    errors = {}
+    profiles = {}
+
+    def run(library, stats, loaded):
+        with stats.measure('generate', category='phase'):
+            return generate(*(names or loaded), verbose=verbose,
+                                                target=targets if len(targets) > 1 else targets[0],
+                                                emit=emit,
+                                                output_directory=output,
+                                                jobs=jobs,
+                                                libraries=(library,),
+                                                multitarget=bool(arguments.get('--multitarget')),
+                                                params=params,
+                                                profile=profiles if show_stats else None,
+                                                errors=errors,
+                                                cache=cache_directory)
+
+    try:
+        if arguments.get('--library'):
+            if __package__ is None or __package__ == '':
+                import api # type: ignore
+            else:
+                from . import api # type: ignore
+            stats = BuildStats()
+            library = os.path.abspath(arguments.get('--library'))
+            with stats.measure('preload', category='phase'):
+                preload(library, verbose=verbose)
+            artifacts = run(library, stats, api.registry_snapshot())
+        else:
+            with Generators(CONF, directory=arguments.get('--sources'),
+                                  destination=output,
+                                  intermediate=intermediate,
+                                  do_static=False,
+                                  jobs=jobs,
+                                  cache=cache_directory,
+                                  incremental=bool(arguments.get('--incremental')),
+                                  trace=arguments.get('--trace') or None,
+                                  verbose=verbose) as gens:
+                stats = gens.stats
+                artifacts = run(gens.library, stats, gens.loaded_generators())
+    except HalogenError as exc:
+        print(f"{type(exc).__name__}: {exc}", file=sys.stderr)
+        return 2
+
+    if arguments.get('--library') and arguments.get('--trace'):
+        stats.write_trace(arguments.get('--trace'))
+
+    if show_stats:
+        print("")
+        print(stats.report())
+        if len(profiles) > 0:
+            print("")
+            print(profile_summary(profiles))
+        if cache_directory:
+            print("")
+            print(ObjectCache(directory=cache_directory).report())
+            print(ArtifactCache(directory=cache_directory).report())
+
+    for label, exc in errors.items():
+        print(f"{label}: {type(exc).__name__}: {exc}", file=sys.stderr)
+
+    if verbose:
+        print(f"Generated {len(artifacts)} modules in {output}")
+
+    return len(errors) > 0 and 1 or 0
+
+def main():
+    return cli(sys.argv)
 
 def test():
     import tempfile
-    # cli(sys.argv)
-    # cli(['halogen.py', '--help', '--verbose'])
-    # cli(['halogen.py', '--version'])
-    cli(['halogen.py', '--output=%s' % tempfile.gettempdir(), '--targets=host,dev,yodogg', 'resize'])
-    cli(['halogen.py', 'resize', '--output', tempfile.gettempdir(), '--targets', 'host,dev,yodogg'])
-    cli(['halogen.py', 'resize'])
+    assert parse_arguments(['brighten', 'layout=planar', 'target=host,x86-64-linux']) == \
+                          (['brighten'], { 'layout' : 'planar' }, ['host', 'x86-64-linux'])
+    assert parse_arguments([]) == ([], {}, None)
+    assert cli(['halogen', '--stats', f"--cache-dir={tempfile.gettempdir()}"]) == 0
+    try:
+        cli(['halogen', 'resize'])
+    except SystemExit:
+        pass # docopt exits when neither --sources nor --library is given
+    else:
+        assert False, "cli() without sources or a library didn’t exit"
+    print("* CLI tests completed OK")
 
 if __name__ == '__main__':
-    test()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == '--test':
+        test()
+    else:
+        sys.exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+#
+#       client.py
+#
+#       Ask a running halogen generator daemon to run generators
+#       (q.v. halogen.daemon) -- sans Halide, sans halogen.api
+#
+"""
+Usage:
+  client.py GENERATOR...  [-o OUTDIR   | --output=OUTDIR]
+                          [-t TARGETS  | --targets=TARGETS]
+                          [-e EMITS    | --emit=EMITS]
+                          [-p PARAM=VALUE... | --param=PARAM=VALUE...]
+                          [-s SOCKET   | --socket=SOCKET]
+                          [--multitarget] [-V | --verbose]
+  client.py --preload LIBRARY... [-s SOCKET | --socket=SOCKET]
+  client.py (--ping | --list | --shutdown) [-s SOCKET | --socket=SOCKET]
+  client.py -h | --help
+
+Options:
+  -o OUTDIR, --output=OUTDIR        specify output directory [default: .].
+  -t TARGETS, --targets=TARGETS     specify comma-separated list of targets [default: host].
+  -e EMITS, --emit=EMITS            specify comma-separated list of emit options [default: static_library,h].
+  -p PARAM=VALUE, --param=PARAM=VALUE
+                                    specify a GeneratorParam value.
+  -s SOCKET, --socket=SOCKET        specify the daemon socket path.
+  --multitarget                     also emit a multi-target library per generator.
+  --preload                         have the daemon preload generator libraries.
+  --ping                            check that the daemon is running.
+  --list                            list the generators registered with the daemon.
+  --shutdown                        stop the daemon.
+  -V, --verbose                     print verbose output.
+  -h, --help                        show this text.
+
+"""
+from __future__ import print_function
+
+import json
+import os
+import socket
+import sys
+import tempfile
+
+if __package__ is None or __package__ == '':
+    from errors import DaemonError
+else:
+    from .errors import DaemonError
+
+__all__ = ('DEFAULT_SOCKET',
+           'DEFAULT_CLIENT_TIMEOUT',
+           'encode_message', 'decode_message',
+           'GeneratorClient')
+
+__dir__ = lambda: list(__all__)
+
+# The daemon listens on the socket named by the `HALOGEN_SOCKET` environment variable,
+# or failing that, one in the temporary directory named for the user:
+DEFAULT_SOCKET = os.environ.get('HALOGEN_SOCKET',
+                 os.path.join(tempfile.gettempdir(), f"halogen-{os.getuid()}.sock"))
+
+# Generation may take a while -- but not forever:
+DEFAULT_CLIENT_TIMEOUT = 600
+
+def encode_message(message):
+    """ Encode a message dict as a line of JSON (the daemon protocol is one message per line) """
+    return json.dumps(message, separators=(',', ':')).encode('UTF-8') + b"\n"
+
+def decode_message(line):
+    """ Decode a line of JSON as a message dict, raising DaemonError if it isn’t one """
+    try:
+        message = json.loads(line.decode('UTF-8'))
+    except (UnicodeDecodeError, ValueError) as exc:
+        raise DaemonError(f"malformed daemon message: {exc}")
+    if not isinstance(message, dict):
+        raise DaemonError(f"malformed daemon message: {line[:64]!r}")
+    return message
+
+class GeneratorClient(object):
+
+    """ A client for the halogen generator daemon (q.v. halogen.daemon.GeneratorDaemon).
+        Each request is a JSON message, naming an operation -- “ping”, “preload”,
+        “generators”, “generate” or “shutdown” -- along with its arguments; each response
+        has an “ok” field and either a “result” or an “error”. Failed requests raise a
+        DaemonError. The connection is opened on first use and kept open, so one client
+        can make any number of requests; use it as a context manager to close it after.
+        
+        This module imports nothing from halogen but its errors, so that it is cheap to
+        load -- build systems invoke it (e.g. as `python -m halogen.client …`) in lieu
+        of the full CLI, leaving Halide and the generator libraries to the daemon.
+    """
+    
+    def __init__(self, socket_path=None, timeout=DEFAULT_CLIENT_TIMEOUT):
+        self.socket_path = os.fspath(socket_path or DEFAULT_SOCKET)
+        self.timeout = timeout
+        self.connection = None
+        self.reader = None
+    
+    def connect(self):
+        if self.connection is None:
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.settimeout(self.timeout)
+            try:
+                connection.connect(self.socket_path)
+            except OSError as exc:
+                connection.close()
+                raise DaemonError(f"can’t connect to the halogen daemon at {self.socket_path}: {exc}")
+            self.connection = connection
+            self.reader = connection.makefile('rb')
+        return self.connection
+    
+    def close(self):
+        if self.connection is not None:
+            self.reader.close()
+            self.connection.close()
+            self.connection = None
+            self.reader = None
+    
+    def request(self, op, **arguments):
+        """ Send a request to the daemon and return the result, raising DaemonError on failure """
+        arguments.update(op=op)
+        connection = self.connect()
+        try:
+            connection.sendall(encode_message(arguments))
+            line = self.reader.readline()
+        except OSError as exc:
+            self.close()
+            raise DaemonError(f"lost the connection to the halogen daemon: {exc}")
+        if not line:
+            self.close()
+            raise DaemonError("the halogen daemon closed the connection")
+        response = decode_message(line)
+        if not response.get('ok'):
+            raise DaemonError(response.get('error', "unknown daemon error"))
+        return response.get('result')
+    
+    def ping(self):
+        return self.request('ping')
+    
+    def preload(self, *libraries):
+        return self.request('preload', libraries=[os.path.abspath(os.fspath(library)) \
+                                                                  for library in libraries])
+    
+    def generators(self):
+        return self.request('generators')
+    
+    def generate(self, *generators, **arguments):
+        """ Run generators in the daemon -- taking the same keyword arguments as
+            halogen.generate.generate(…), less those that can’t be sent as JSON -- and
+            return a dict with the “artifacts” (a list of dicts, one per output module)
+            and any per-generator “errors”.
+        """
+        if 'output_directory' in arguments:
+            arguments['output_directory'] = os.path.abspath(os.fspath(arguments['output_directory']))
+        return self.request('generate', generators=list(generators), **arguments)
+    
+    def shutdown(self):
+        out = self.request('shutdown')
+        self.close()
+        return out
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type=None, exc_val=None, exc_tb=None):
+        self.close()
+        return exc_type is None
+
+def main(argv=None):
+    from docopt import docopt # type: ignore
+    arguments = docopt(__doc__, argv=(argv or sys.argv)[1:], help=True)
+    
+    with GeneratorClient(socket_path=arguments.get('--socket')) as client:
+        try:
+            if arguments.get('--ping'):
+                print(json.dumps(client.ping(), indent=4))
+            elif arguments.get('--list'):
+                print("\n".join(client.generators()))
+            elif arguments.get('--shutdown'):
+                client.shutdown()
+            elif arguments.get('--preload'):
+                print("\n".join(client.preload(*arguments.get('LIBRARY'))))
+            else:
+                params = dict(param.split('=', 1) for param in arguments.get('--param'))
+                result = client.generate(*arguments.get('GENERATOR'),
+                                         output_directory=arguments.get('--output'),
+                                         target=[target.strip() for target in arguments.get('--targets').split(',')],
+                                         emit=[emit.strip() for emit in arguments.get('--emit').split(',')],
+                                         params=params,
+                                         multitarget=bool(arguments.get('--multitarget')))
+                if arguments.get('--verbose'):
+                    print(json.dumps(result, indent=4))
+                for label, error in result.get('errors', {}).items():
+                    print(f"{label}: {error}", file=sys.stderr)
+                if len(result.get('errors', {})) > 0:
+                    return 1
+        except DaemonError as exc:
+            print(str(exc), file=sys.stderr)
+            return 2
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,44 +3,73 @@
 
 from __future__ import print_function
 
+import asyncio
 import contextlib
+import importlib.util
 import os
+import shlex
 import sys
+import sysconfig
+import tempfile
+import time
 import typing as tx
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 if __package__ is None or __package__ == '':
     import config
-    from compiledb import CDBJsonFile
+    from cache import DEFAULT_CACHE_DIRECTORY, ArtifactCache, ContentCache, ObjectCache
+    from compiledb import CDBJsonFile, CDBJsonStream
     from config import SHARED_LIBRARY_SUFFIX, STATIC_LIBRARY_SUFFIX, DEFAULT_VERBOSITY
-    from errors import HalogenError, GeneratorLoaderError, GenerationError
-    from generate import default_emits, valid_emits
-    from generate import generate, preload
+    from buildfile import BuildPlan
+    from errors import HalogenError, GeneratorLoaderError, GenerationError, ExtensionError
+    from generate import default_emits, valid_emits, output_names
+    from generate import generate, preload, index_library
+    from filesystem import DEFAULT_TIMEOUT
     from filesystem import rm_rf, temporary, TemporaryName
-    from filesystem import Directory, cd
+    from filesystem import Directory
     from filesystem import TemporaryDirectory, Intermediate
+    from manifest import DEPFILE_SUFFIX, parse_depfile, BuildManifest
     from ocd import OCDFrozenSet, OCDList
-    from utils import is_string, listify, tuplize, u8str
+    from stats import BuildStats, measured
+    from unity import unity_batches, write_jumbo, read_timings, write_timings
+    from utils import is_string, listify, tuplize, u8bytes, u8str
 else:
     from . import config
-    from .compiledb import CDBJsonFile
+    from .cache import DEFAULT_CACHE_DIRECTORY, ArtifactCache, ContentCache, ObjectCache
+    from .compiledb import CDBJsonFile, CDBJsonStream
     from .config import SHARED_LIBRARY_SUFFIX, STATIC_LIBRARY_SUFFIX, DEFAULT_VERBOSITY
-    from .errors import HalogenError, GeneratorLoaderError, GenerationError
-    from .generate import default_emits, valid_emits
-    from .generate import generate, preload
+    from .buildfile import BuildPlan
+    from .errors import HalogenError, GeneratorLoaderError, GenerationError, ExtensionError
+    from .generate import default_emits, valid_emits, output_names
+    from .generate import generate, preload, index_library
+    from .filesystem import DEFAULT_TIMEOUT
     from .filesystem import rm_rf, temporary, TemporaryName
-    from .filesystem import Directory, cd
+    from .filesystem import Directory
     from .filesystem import TemporaryDirectory, Intermediate
+    from .manifest import DEPFILE_SUFFIX, parse_depfile, BuildManifest
     from .ocd import OCDFrozenSet, OCDList
-    from .utils import is_string, listify, tuplize, u8str
+    from .stats import BuildStats, measured
+    from .unity import unity_batches, write_jumbo, read_timings, write_timings
+    from .utils import is_string, listify, tuplize, u8bytes, u8str
 
 __all__ = ('CONF', 'DEFAULT_MAXIMUM_GENERATOR_COUNT',
+                   'DEFAULT_JOBS',
+                   'DEFAULT_PRECOMPILED_HEADER',
            'CompilerError', 'LinkerError', 'ArchiverError',
-           'Generator',
+           'find_header',
+           'build_python_extension', 'import_python_extension',
+           'Generator', 'PrecompiledHeader',
            'Generators')
 
 __dir__ = lambda: list(__all__)
 
 DEFAULT_MAXIMUM_GENERATOR_COUNT = 1024
+DEFAULT_JOBS = os.cpu_count() or 1
+DEFAULT_PRECOMPILED_HEADER = f"Halide{os.extsep}h"
+
+# The filename suffix for Python extension modules, e.g. “.cpython-37m-darwin.so”:
+EXTENSION_SUFFIX = sysconfig.get_config_var('EXT_SUFFIX') or SHARED_LIBRARY_SUFFIX
 
 CONF = config.ConfigUnion(config.SysConfig(),
                           config.BrewedHalideConfig())
@@ -84,10 +113,19 @@ class Generator(contextlib.AbstractContextManager):
             raise CompilerError("A C++ generator source file is required")
         self.VERBOSE = bool(kwargs.pop('verbose', DEFAULT_VERBOSITY))
         self.cdb = kwargs.pop('cdb', None)
+        self.cache = kwargs.pop('cache', None)
+        self.stats = kwargs.pop('stats', None)
+        if self.stats is None:
+            self.stats = BuildStats()
+        self.cache_key = None
+        self.cache_hit = False
         self.conf = conf
         self.destination = os.fspath(destination)
         self.source = os.path.realpath(os.fspath(source))
         self.intermediate = 'intermediate' in kwargs and os.fspath(kwargs.pop('intermediate')) or None
+        self.depfile = 'depfile' in kwargs and os.fspath(kwargs.pop('depfile')) or None
+        self.timeout = kwargs.pop('timeout', DEFAULT_TIMEOUT)
+        self.on_stderr = kwargs.pop('on_stderr', None)
         self._compiled = False
         self._destroy = True
         self.result = tuple()
@@ -99,8 +137,12 @@ class Generator(contextlib.AbstractContextManager):
             print(f"* Output filepath: {self.destination}")
             if self.cdb:
                 print(f"*  Compilation DB: {repr(self.cdb)}")
+            if self.cache is not None:
+                print(f"*    Object cache: {self.cache}")
             if self.intermediate:
                 print(f"*    Intermediate: {self.intermediate}")
+            if self.depfile:
+                print(f"* Dependency file: {self.depfile}")
             print("")
     
     def precompile(self):
@@ -125,27 +167,87 @@ class Generator(contextlib.AbstractContextManager):
     
     def compile(self):
         """ Execute the CXX compilation command, using our stored config instance,
-            our validated source file, and a temporary output file name:
+            our validated source file, and a temporary output file name.
+            
+            If we were furnished with an object cache, the cache is consulted first --
+            on a hit, the cached object code is copied to the temporary output file, and
+            no compiler is invoked at all (although the compilation database entry for
+            the source is still recorded). If we were also asked for a dependency file,
+            it has to come out of the cache too, for it to count as a hit.
         """
-        if self.compiled:
+        if self.compiled or self.compile_cached():
             return True
         sourcebase = os.path.basename(self.source)
         dirname = os.path.dirname(self.source)
+        if self.VERBOSE:
+            print(f"Compiling: {sourcebase} to {os.path.basename(self.transient)}")
+            print("")
+        # N.B. the compiler subprocess is run with the source directory as its
+        # working directory -- we don’t use halogen.filesystem.cd for this, as
+        # changing the process working directory is not a thread-safe move:
+        self.result += config.CXX(self.conf, self.transient,
+                                             sourcebase,
+                                             cdb=self.cdb,
+                                             depfile=self.depfile,
+                                             directory=dirname,
+                                             timeout=self.timeout,
+                                             verbose=self.VERBOSE)
+        return True
+    
+    async def compile_async(self):
+        """ Execute the CXX compilation command asynchronously -- this coroutine does what
+            `compile()` does (q.v. supra) without blocking, by way of `config.CXX.run_async(…)`,
+            passing along any `on_stderr` callback with which we were initialized, to which
+            compiler diagnostics are streamed as they arrive.
+        """
+        if self.compiled or self.compile_cached():
+            return True
+        sourcebase = os.path.basename(self.source)
+        if self.VERBOSE:
+            print(f"Compiling asynchronously: {sourcebase} to {os.path.basename(self.transient)}")
+            print("")
+        self.result += await config.CXX.run_async(self.conf, self.transient,
+                                                             sourcebase,
+                                                             cdb=self.cdb,
+                                                             depfile=self.depfile,
+                                                             directory=os.path.dirname(self.source),
+                                                             timeout=self.timeout,
+                                                             on_stderr=self.on_stderr,
+                                                             verbose=self.VERBOSE)
+        return True
+    
+    def compile_cached(self):
+        """ Choose a temporary output file name for the compilation, and consult the object
+            cache (if we have one) -- returning True if the cache furnished the object code,
+            in which case there is no need to invoke the compiler, and False otherwise.
+        """
+        sourcebase = os.path.basename(self.source)
+        dirname = os.path.dirname(self.source)
         splitbase = os.path.splitext(sourcebase)
         suffix = os.path.splitext(self.destination)[1]
         self.transient = temporary(prefix=splitbase[0],
                                    suffix=suffix,
                                    parent=self.intermediate)
-        if self.VERBOSE:
-            print(f"Compiling: {sourcebase} to {os.path.basename(self.transient)}")
-            print("")
-        with cd(dirname) as cwd:
-            self.result += config.CXX(self.conf, self.transient,
-                                                 sourcebase,
-                                                 cdb=self.cdb,
-                                                 directory=cwd,
-                                                 verbose=self.VERBOSE)
-        return True
+        if self.cache is not None:
+            self.cache_key = self.cache.key_for(self.conf, self.source)
+            if self.cache_key:
+                hit = self.cache.fetch(self.cache_key, self.transient, count=False)
+                if hit and self.depfile:
+                    hit = self.cache.fetch(self.cache_key, self.depfile, suffix=DEPFILE_SUFFIX,
+                                                                         count=False)
+                self.cache_hit = self.cache.tally(hit)
+            if self.cache_hit:
+                if self.VERBOSE:
+                    print(f"Object cache hit: {sourcebase} to {os.path.basename(self.transient)}")
+                    print("")
+                if self.cdb is not None:
+                    self.cdb.push(sourcebase, self.conf.cxx_flag_string(self.transient, sourcebase,
+                                                                        depfile=self.depfile),
+                                              directory=dirname,
+                                              destination=self.transient)
+                self.result += ('', '')
+                return True
+        return False
     
     def postcompile(self):
         """ Examine the results of the compilation command, ascertaining success
@@ -164,6 +266,10 @@ class Generator(contextlib.AbstractContextManager):
                 raise CompilerError(self.result[1])
             if not os.path.isfile(self.transient):
                 raise CompilerError(f"compiler output isn’t a regular file: {self.transient}")
+            if self.cache_key and not self.cache_hit:
+                self.cache.store(self.cache_key, self.transient)
+                if self.depfile and os.path.isfile(self.depfile):
+                    self.cache.store(self.cache_key, self.depfile, suffix=DEPFILE_SUFFIX)
             shutil.copy2(self.transient, self.destination)
             self._compiled = os.path.isfile(self.destination)
         return self.compiled
@@ -196,6 +302,210 @@ class Generator(contextlib.AbstractContextManager):
                 print(f"Cleaning up: {os.path.basename(self.transient)}")
             return rm_rf(self.transient)
     
+    def __enter__(self):
+        with self.stats.measure(os.path.basename(self.source), category='source') as args:
+            self.precompile()
+            self.compile()
+            self.postcompile()
+            args['cache_hit'] = self.cache_hit
+        return self
+    
+    def __exit__(self, exc_type=None, exc_val=None, exc_tb=None):
+        # N.B. return False to throw, True to supress:
+        self.clear()
+        return exc_type is None
+    
+    async def __aenter__(self):
+        with self.stats.measure(os.path.basename(self.source), category='source') as args:
+            self.precompile()
+            await self.compile_async()
+            self.postcompile()
+            args['cache_hit'] = self.cache_hit
+        return self
+    
+    async def __aexit__(self, exc_type=None, exc_val=None, exc_tb=None):
+        return self.__exit__(exc_type, exc_val, exc_tb)
+
+
+def find_header(conf, header):
+    """ Search the include directories named by a config instance for a header file,
+        returning the full path to the first one found -- or None, if it’s AWOL.
+    """
+    for flag in shlex.split(conf.get_includes()):
+        if flag.startswith("-I"):
+            candidate = os.path.join(flag[2:], header)
+            if os.path.isfile(candidate):
+                return os.path.realpath(candidate)
+    return None
+
+
+def build_python_extension(conf, name, source, library, destination, intermediate=None,
+                                                                     timeout=DEFAULT_TIMEOUT,
+                                                                     verbose=DEFAULT_VERBOSITY):
+    """ Compile a Python extension source, as emitted by a generator with the
+        “python_extension” emit option, and link it with the generator’s static
+        library -- as emitted with “static_library” -- into an extension module
+        named for the generator, in the destination directory. The object code
+        goes in the intermediate directory (the destination, by default).
+        
+        The config instance must furnish the Python compile and link flags -- e.g.
+        a ConfigUnion including a SysConfig instance, like CONF (q.v. supra) -- plus
+        whatever else the generator needs. Returns the path to the extension module.
+    """
+    simple_name = u8str(name).split('::')[-1]
+    destination = os.fspath(destination)
+    intermediate = intermediate and os.fspath(intermediate) or destination
+    objfile = os.path.join(intermediate, f"{simple_name}{os.extsep}py{os.extsep}o")
+    extension = os.path.join(destination, f"{simple_name}{EXTENSION_SUFFIX}")
+    for source_path in (source, library):
+        if not source_path or not os.path.isfile(source_path):
+            raise ExtensionError(f"missing python extension input for {name}: {source_path}")
+    rm_rf(objfile)
+    rm_rf(extension)
+    output, errors = config.CXX(conf, objfile, os.fspath(source), timeout=timeout,
+                                                                  verbose=verbose)
+    if not os.path.isfile(objfile):
+        raise CompilerError(errors or f"couldn’t compile python extension for {name}")
+    output, errors = config.LD(conf, extension, objfile, os.fspath(library), timeout=timeout,
+                                                                             verbose=verbose)
+    if not os.path.isfile(extension):
+        raise LinkerError(errors or f"couldn’t link python extension for {name}")
+    return extension
+
+def import_python_extension(name, extension):
+    """ Import a Python extension module built by `build_python_extension(…)` (q.v. supra)
+        from its path, returning the module. The callable for the generator’s pipeline is
+        the module attribute named for the generator (sans any C++ namespaces).
+    """
+    simple_name = u8str(name).split('::')[-1]
+    spec = importlib.util.spec_from_file_location(simple_name, os.fspath(extension))
+    if spec is None:
+        raise ExtensionError(f"can’t import python extension for {name}: {extension}")
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except ImportError as exc:
+        raise ExtensionError(f"can’t import python extension for {name}: {exc}")
+    if not hasattr(module, simple_name):
+        raise ExtensionError(f"python extension for {name} lacks a “{simple_name}” callable")
+    return module
+
+class PrecompiledHeader(contextlib.AbstractContextManager):
+    
+    """ Precompile a header file -- Halide.h, by default -- using a specific “Config”-ish
+        instance, for use in the compilation of many generator sources that each include it.
+        
+        The precompiled header is written to a subdirectory of the furnished directory, named
+        for a hash of the compiler command, the compiler version, and the path, size, and mtime
+        of the header -- so a change to any of these (e.g. by way of upgrading Halide) yields a
+        fresh precompiled header, and a precompiled header that already exists is reused as-is.
+        
+        Once compiled, the `config` property furnishes a config instance that wraps the original,
+        and uses the precompiled header in all of its C++ compilation commands. """
+    
+    def __init__(self, conf, directory, header=None,
+                                      **kwargs):
+        if not conf:
+            raise CompilerError("A config-ish instance is required")
+        if not directory:
+            raise CompilerError("A directory for the precompiled header is required")
+        self.VERBOSE = bool(kwargs.pop('verbose', DEFAULT_VERBOSITY))
+        self.conf = conf
+        self.source = header and os.path.realpath(os.fspath(header)) \
+                              or find_header(conf, DEFAULT_PRECOMPILED_HEADER)
+        if not self.source or not os.path.isfile(self.source):
+            raise CompilerError(f"can't find a header to precompile: {header or DEFAULT_PRECOMPILED_HEADER}")
+        self.clang = config.compiler_is_clang(config.environ_override('CXX'))
+        sourcebase = os.path.basename(self.source)
+        suffix = self.clang and "pch" or "gch"
+        self.key = self.digest()
+        self.directory = Directory(pth=directory).subdirectory(f"{os.path.splitext(sourcebase)[0]}-{self.key[:16]}")
+        self.header = self.directory.subpath(sourcebase)
+        self.destination = self.directory.subpath(f"{sourcebase}{os.extsep}{suffix}")
+        self.transient = f"{self.destination}{os.extsep}{os.getpid()}{os.extsep}tmp"
+        self._compiled = False
+        self.result = tuple()
+        if self.VERBOSE:
+            print("")
+            print("Initialized C++ header precompilation manager")
+            print(f"*    Config class: {self.conf.name}")
+            print(f"* Header filename: {self.source}")
+            print(f"* Output filepath: {self.destination}")
+            print("")
+    
+    def digest(self):
+        """ Compute the hash that distinguishes this precompiled header from any other """
+        st = os.stat(self.source)
+        return ContentCache.digest(self.conf.pch_flag_string("<output>", "<input>"),
+                                   config.compiler_version(config.environ_override('CXX')),
+                                   self.source, str(st.st_size),
+                                                str(st.st_mtime_ns))
+    
+    def precompile(self):
+        """ Check for an existing precompiled header, and -- failing that -- write out
+            the stub header (which just includes the real thing) to precompile:
+        """
+        if self.compiled:
+            return True
+        if os.path.isfile(self.destination):
+            if self.VERBOSE:
+                print(f"Reusing precompiled header: {self.destination}")
+            self._compiled = True
+            return True
+        if not self.directory.exists:
+            self.directory.makedirs()
+        with open(self.header, mode='w') as handle:
+            handle.write(f"#include \"{self.source}\"\n")
+        return True
+    
+    def compile(self):
+        """ Execute the C++ header precompilation command, using our stored config instance: """
+        if self.compiled:
+            return True
+        if self.VERBOSE:
+            print(f"Precompiling: {os.path.basename(self.source)} to {self.destination}")
+            print("")
+        self.result += config.PCH(self.conf, self.transient,
+                                             self.header,
+                                             directory=self.directory,
+                                             verbose=self.VERBOSE)
+        return True
+    
+    def postcompile(self):
+        """ Examine the results of the precompilation command, raising exceptions as needed
+            and atomically moving the precompiled header into place if all is well:
+        """
+        if self.compiled:
+            return True
+        if len(self.result) > 0: # apres-compilation
+            if len(self.result[1]) > 0: # failure
+                raise CompilerError(self.result[1])
+            if not os.path.isfile(self.transient):
+                raise CompilerError(f"precompiler output isn’t a regular file: {self.transient}")
+            os.replace(self.transient, self.destination)
+            self._compiled = os.path.isfile(self.destination)
+        return self.compiled
+    
+    @property
+    def compiled(self):
+        """ Has the header successfully been precompiled? """
+        return self._compiled
+    
+    @property
+    def config(self):
+        """ A config instance that wraps our own, using the precompiled header """
+        if not self.compiled:
+            raise CompilerError(f"can't use a header before precompilation: {self.source}")
+        return config.PrecompiledHeaderWrap(self.conf, header=self.header,
+                                                       pch=self.destination,
+                                                       clang=self.clang)
+    
+    def clear(self):
+        """ Delete temporary precompilation artifacts (but not the precompiled header): """
+        if os.path.exists(self.transient):
+            return rm_rf(self.transient)
+        return True
+    
     def __enter__(self):
         self.precompile()
         self.compile()
@@ -215,7 +525,60 @@ class Generators(contextlib.AbstractContextManager):
         shared-object library. As a context manager, all of the intermediate Generator instances
         created during compilation (because that is how it works dogg, like by using a Generator
         for each discovered source file, OK) use a TemporaryName as their output targets -- so
-        it's like POOF, no fuss no muss, basically
+        it's like POOF, no fuss no muss, basically.
+        
+        … unless you ask for an incremental build, with `incremental=True` -- in which case the
+        object code is kept in the intermediate directory (which you must then specify, so that
+        it sticks around between runs) along with a build manifest, recording what went into the
+        compilation of each object, by way of the dependency files written by the compiler. Later
+        runs using the same intermediate directory will only recompile those sources whose object
+        code is stale, and will only relink and/or rearchive if any of the object code changed.
+        
+        Pass `precompiled_header=True` to precompile Halide.h (or pass the path to some other
+        header to precompile that instead) before compiling any generators, all of which are
+        then compiled against it. The precompiled header is kept in the object cache directory,
+        if there is one, or the intermediate directory otherwise -- q.v. PrecompiledHeader supra.
+        
+        Pass `unity=N` for a unity build, in which up to N sources at a time are merged into
+        jumbo translation units in the intermediate directory -- which then get compiled (in
+        parallel, natch) in place of the sources themselves. Sources that can’t be merged are
+        compiled standalone, q.v. `compile_unity()` sub. (Unity builds can’t be incremental.)
+        The compile times of unity and per-file builds are recorded, for comparison, in the
+        object cache directory if there is one, or in DEFAULT_CACHE_DIRECTORY otherwise -- pass
+        `timings` (a directory path) to record them somewhere else, q.v. `record_timing()` sub.
+        
+        Pass `batch=N` to have up to N sources at a time compiled by a single compiler invocation,
+        with the object code written to the intermediate directory -- this saves on the cost of
+        starting up a compiler process for each source. If a batch fails to compile, its sources
+        are all recompiled one by one, to isolate the failure, q.v. `compile_batched()` sub.
+        (Batched builds can’t also be unity builds, nor use the object cache.)
+        
+        Pass `artifact_cache=True` (or the path to a cache directory, or an ArtifactCache
+        instance) to have `run()` consult a persistent cache of generator outputs, rather
+        than re-running generators whose library, parameters and targets are unchanged.
+        
+        Pass `linker="auto"` to link with the fastest linker on hand (mold or lld, if the host has
+        either) or the name of a specific linker -- the default is the `HALOGEN_LINKER` environment
+        variable, if set, or whatever `LDCXXSHARED` runs, if not; q.v. `config.linker_flags(…)`.
+        Pass `thin_archive=True` to have the static library archived as a thin archive, which
+        references its object code in place rather than copying it -- N.B. the archive is only
+        usable for as long as the object code sticks around, so thin archives are only allowed
+        for incremental builds, whose object code is kept in the intermediate directory.
+        
+        Pass `stream_cdb=True` to have the compilation database written by a CDBJsonStream,
+        which appends new and changed entries to the database file under an advisory lock --
+        so that concurrent builds into the same intermediate directory can share one database
+        without clobbering one another’s entries, q.v. halogen.compiledb.CDBJsonStream.
+        
+        Use it as an asynchronous context manager -- as in `async with Generators(…) as gens`
+        -- and the build runs as a DAG of awaitables, q.v. `build_async()` sub. Pass `timeout`
+        to limit how many seconds any one compiler, linker or archiver command may take (None
+        for no limit at all) and `on_stderr` to have their diagnostics streamed to a callback.
+        
+        The wall time, CPU time and peak RSS of each build phase, and of the compilation of
+        each source, are measured in the `stats` attribute (a halogen.stats.BuildStats instance)
+        -- pass `trace` (a file path) to have these written out as Chrome trace-event JSON,
+        upon scope exit.
     """
     
     emits = {
@@ -235,6 +598,13 @@ class Generators(contextlib.AbstractContextManager):
                                                           use_cdb=True,
                                                           do_shared=True, do_static=True,
                                                           do_preload=True,
+                                                          jobs=None,
+                                                          cache=None,
+                                                          incremental=False,
+                                                          precompiled_header=None,
+                                                          unity=None,
+                                                          batch=None,
+                                                          artifact_cache=None,
                                                         **kwargs):
         if not conf:
             raise CompilerError("A config-ish instance is required")
@@ -242,8 +612,34 @@ class Generators(contextlib.AbstractContextManager):
             suffix = "cpp"
         if not prefix:
             prefix = "yodogg"
+        if not jobs:
+            jobs = DEFAULT_JOBS
+        if int(jobs) < 1:
+            raise CompilerError(f"The number of compilation jobs must be 1 or more (not {jobs})")
+        if incremental and intermediate is None:
+            raise CompilerError("Incremental builds require a persistent intermediate directory")
+        if unity and incremental:
+            raise CompilerError("Unity builds can’t also be incremental builds")
+        if unity and int(unity) < 2:
+            raise CompilerError(f"Unity builds must merge 2 or more sources per unit (not {unity})")
+        if batch and unity:
+            raise CompilerError("Batched builds can’t also be unity builds")
+        if batch and cache:
+            raise CompilerError("Batched builds can’t also use the object cache")
+        if batch and int(batch) < 2:
+            raise CompilerError(f"Batched builds must compile 2 or more sources per batch (not {batch})")
+        if kwargs.get('thin_archive') and not incremental:
+            raise CompilerError("Thin archives require an incremental build, as they reference the object code in place")
         self.MAXIMUM =  int(kwargs.pop('maximum', DEFAULT_MAXIMUM_GENERATOR_COUNT))
         self.VERBOSE = bool(kwargs.pop('verbose', DEFAULT_VERBOSITY))
+        self.timeout = kwargs.pop('timeout', DEFAULT_TIMEOUT)
+        self.on_stderr = kwargs.pop('on_stderr', None)
+        self.trace = 'trace' in kwargs and os.fspath(kwargs.pop('trace')) or None
+        self.index = kwargs.pop('index', False)
+        self.linker = kwargs.pop('linker', config.DEFAULT_LINKER) or None
+        self.thin_archive = bool(kwargs.pop('thin_archive', False))
+        self.stats = BuildStats()
+        self.jobs = int(jobs)
         self.conf = conf
         self.prefix = u8str(prefix)
         self.suffix = u8str(suffix).lower()
@@ -251,6 +647,9 @@ class Generators(contextlib.AbstractContextManager):
         self.do_static = bool(do_static)
         self.do_preload = bool(do_shared) and bool(do_preload)
         self.use_cdb = bool(use_cdb)
+        self.incremental = bool(incremental)
+        self.unity = unity and int(unity) or None
+        self.batch = batch and int(batch) or None
         self.directory = Directory(pth=directory)
         if not self.directory.exists:
             raise CompilerError(f"Non-existant generator source directory: {self.directory}")
@@ -263,7 +662,36 @@ class Generators(contextlib.AbstractContextManager):
         if not self.intermediate.exists:
             self.intermediate.makedirs()
         cdb = kwargs.pop('cdb', None)
-        self.cdb = self.use_cdb and (cdb or CDBJsonFile(directory=self.intermediate)) or None
+        cdbclass = kwargs.pop('stream_cdb', False) and CDBJsonStream or CDBJsonFile
+        self.cdb = self.use_cdb and (cdb or cdbclass(directory=self.intermediate)) or None
+        self.manifest = None
+        self.objects = None
+        if self.incremental:
+            # Pick up where the last build left off:
+            if isinstance(self.cdb, CDBJsonFile) and self.cdb.exists:
+                self.cdb.read()
+            self.manifest = BuildManifest(directory=self.intermediate)
+            if self.manifest.exists:
+                self.manifest.read()
+            self.objects = self.intermediate.subdirectory('objects')
+            if not self.objects.exists:
+                self.objects.makedirs()
+        if cache is True:
+            cache = ObjectCache()
+        elif cache and not isinstance(cache, ObjectCache):
+            cache = ObjectCache(directory=cache)
+        self.cache = cache or None
+        self.timings = Directory(pth=kwargs.pop('timings', None) or self.cache and self.cache.directory
+                                                                   or DEFAULT_CACHE_DIRECTORY)
+        if artifact_cache is True:
+            artifact_cache = ArtifactCache()
+        elif artifact_cache and not isinstance(artifact_cache, ArtifactCache):
+            artifact_cache = ArtifactCache(directory=artifact_cache)
+        self.artifact_cache = artifact_cache or None
+        self.precompiled_header = precompiled_header is True and DEFAULT_PRECOMPILED_HEADER \
+                                                              or precompiled_header or None
+        self.pch = None
+        self.pch_error = None
         self._precompiled = False
         self._compiled = False
         self._postcompiled = False
@@ -272,9 +700,20 @@ class Generators(contextlib.AbstractContextManager):
         self._preloaded = False
         self.sources = OCDList()
         self.prelink = OCDList()
+        self.recompiled = OCDList()
+        self.compile_errors = {}
+        self.compile_time = None
+        self.unity_units = {}
+        self.unity_standalone = OCDList()
+        self.unity_fallbacks = {}
+        self.unity_speedup = None
+        self.unity_baseline = None
+        self.batch_fallbacks = {}
         self.link_result = tuple()
         self.archive_result = tuple()
         self.preload_result = None
+        self._loaded_snapshot = None
+        self._loaded_generators = OCDFrozenSet()
         if self.VERBOSE:
             print("")
             print("Initialized Halide generator compile/load/run suite:")
@@ -287,7 +726,24 @@ class Generators(contextlib.AbstractContextManager):
                 print(f"*      Archive: {self.archive}")
             if use_cdb:
                 print(f"*   Compile DB: {repr(self.cdb)}")
+            if self.cache is not None:
+                print(f"* Object cache: {self.cache}")
+            if self.artifact_cache is not None:
+                print(f"* Output cache: {self.artifact_cache}")
+            if self.incremental:
+                print(f"*     Manifest: {self.manifest.name}")
+            if self.precompiled_header:
+                print(f"*   Precompile: {self.precompiled_header}")
+            if self.unity:
+                print(f"*   Unity size: {self.unity}")
+            if self.batch:
+                print(f"*   Batch size: {self.batch}")
+            if self.trace:
+                print(f"*  Build trace: {self.trace}")
+            if self.linker:
+                print(f"*       Linker: {self.linker}")
             print(f"* Intermediate: {self.intermediate}")
+            print(f"*  Worker jobs: {self.jobs}")
             print("")
     
     @property
@@ -349,6 +805,30 @@ class Generators(contextlib.AbstractContextManager):
             return self.cdb.name
         return None
     
+    @property
+    def compile_command(self):
+        """ The C++ compiler command, sans any input or output filenames -- as recorded
+            in the build manifest, when building incrementally
+        """
+        return self.conf.cxx_flag_string("<output>", "<input>")
+    
+    def object_path(self, source):
+        """ When building incrementally, return the stable path within the intermediate
+            directory at which the object code compiled from `source` is to be kept.
+        """
+        if not self.incremental:
+            raise CompilerError("Stable object-code paths are only used in incremental builds")
+        return self.objects.subpath(self.object_name(source))
+    
+    def object_name(self, source):
+        """ The filename for the object code compiled from `source` -- named for the path
+            of the source relative to the source directory, e.g. “subdir.yodogg.cpp.o”.
+        """
+        relative = os.path.relpath(source, self.directory.realpath())
+        stem = os.path.splitext(relative)[0].replace(os.sep, os.extsep)
+        return f"{stem}{os.extsep}{self.object_suffix}"
+    
+    @measured('precompile')
     def precompile(self):
         """ Walk the path of the specified source directory, gathering all C++ generator
             source files that match the suffix furnished in the constructor, and storing
@@ -380,43 +860,474 @@ class Generators(contextlib.AbstractContextManager):
             self._precompiled = True
         return self.precompiled
     
+    def precompile_header(self):
+        """ Precompile the header we were asked to precompile (if any) -- once this succeeds,
+            all subsequent compilation commands will use the precompiled header. If it doesn’t
+            pan out, the exception is stashed in `self.pch_error` and we carry on without it.
+            
+            This method returns a boolean indicating whether or not a precompiled header is in use.
+        """
+        if self.pch is not None:
+            return True
+        if not self.precompiled_header:
+            return False
+        header = self.precompiled_header != DEFAULT_PRECOMPILED_HEADER and self.precompiled_header or None
+        directory = self.cache is not None and self.cache.directory.subdirectory('headers') \
+                                            or self.intermediate
+        try:
+            with PrecompiledHeader(self.conf, directory=os.fspath(directory),
+                                              header=header,
+                                              verbose=self.VERBOSE) as pch:
+                self.conf = pch.config
+                self.pch = pch
+        except (CompilerError, FileNotFoundError) as exc:
+            self.pch_error = exc
+            if self.VERBOSE:
+                print(f"Precompiled header unavailable, continuing without: {str(exc)}")
+                print("")
+        return self.pch is not None
+    
+    def compile_source(self, source):
+        """ Compile one generator source file, returning the path to the resulting
+            object-code artifact -- or None, if the compilation did not pan out.
+            
+            Internally, we use a halogen.filesystem.TemporaryName and a halogen.compile.Generator
+            instance, both within context-managed nested scopes, for atomic operations. This
+            is the unit of work that `compile_all()` hands off to its worker pool; the only
+            shared state it touches is the compilation database, which does its own locking.
+            
+            When building incrementally, the object code goes to a stable path in the intermediate
+            directory instead, and the build manifest (which also does its own locking) is updated
+            with the dependencies named in the depfile written out by the compiler.
+        """
+        if self.incremental:
+            destination = self.object_path(source)
+            depfile = f"{destination}{DEPFILE_SUFFIX}"
+            self.manifest.discard(source)
+            rm_rf(destination)
+            with Generator(self.conf, **self.generator_options(source, destination,
+                                                                       depfile=depfile)) as gen:
+                if gen.compiled:
+                    self.manifest.record(source, destination,
+                                         self.compile_command,
+                                         parse_depfile(depfile, directory=os.path.dirname(source)))
+                    return destination
+            return None
+        sourcebase = os.path.basename(source)
+        splitbase = os.path.splitext(sourcebase)
+        with TemporaryName(prefix=splitbase[0],
+                           suffix=self.object_suffix) as tn:
+            with Generator(self.conf, **self.generator_options(source, tn)) as gen:
+                if gen.compiled:
+                    gen.do_not_destroy()
+                    return tn.do_not_destroy()
+        return None
+    
+    async def compile_source_async(self, source):
+        """ Compile one generator source file asynchronously -- this coroutine does what
+            `compile_source(…)` does (q.v. supra), using Generator as an asynchronous context
+            manager, such that the compiler subprocess is awaited rather than waited upon.
+        """
+        if self.incremental:
+            destination = self.object_path(source)
+            depfile = f"{destination}{DEPFILE_SUFFIX}"
+            self.manifest.discard(source)
+            rm_rf(destination)
+            async with Generator(self.conf, **self.generator_options(source, destination,
+                                                                             depfile=depfile)) as gen:
+                if gen.compiled:
+                    self.manifest.record(source, destination,
+                                         self.compile_command,
+                                         parse_depfile(depfile, directory=os.path.dirname(source)))
+                    return destination
+            return None
+        sourcebase = os.path.basename(source)
+        splitbase = os.path.splitext(sourcebase)
+        with TemporaryName(prefix=splitbase[0],
+                           suffix=self.object_suffix) as tn:
+            async with Generator(self.conf, **self.generator_options(source, tn)) as gen:
+                if gen.compiled:
+                    gen.do_not_destroy()
+                    return tn.do_not_destroy()
+        return None
+    
+    def generator_options(self, source, destination, **kwargs):
+        """ Return the keyword arguments with which to initialize a Generator instance,
+            for compiling `source` to `destination` -- any further keyword arguments
+            are passed along as-is.
+        """
+        kwargs.update(dict(cdb=self.cdb,
+                           cache=self.cache,
+                           source=source,
+                           destination=os.fspath(destination),
+                           intermediate=os.fspath(self.intermediate),
+                           timeout=self.timeout,
+                           on_stderr=self.on_stderr,
+                           stats=self.stats,
+                           verbose=self.VERBOSE))
+        return kwargs
+    
+    @measured('compile')
     def compile_all(self):
         """ Attempt to compile all of the generator source files we discovered while walking
             the directory with which we were initialized.
             
-            Internally, we use a halogen.filesystem.TemporaryName and a halogen.compile.Generator
-            instance, both within context-managed nested scopes, for atomic operations. The
-            return value is boolean: True if all discovered source files were successfully compiled
-            and False if not -- in many such cases, one of the many sub-operations can and will
-            throw an exception (q.v. halogen.errors supra).
+            Sources are compiled concurrently, using a pool of up to `self.jobs` worker threads
+            (one per CPU, by default) each calling `compile_source(…)` (q.v. supra). Each worker
+            spends nearly all of its time waiting on a compiler subprocess, so threads will do.
+            Object files are added to `self.prelink` in source order, regardless of the order
+            in which their compilations finish.
+            
+            The return value is boolean: True if all discovered source files were successfully
+            compiled and False if not. Any exceptions raised while compiling individual sources
+            are collected in the `self.compile_errors` dict (keyed by source path) -- once all
+            compilations have finished, a CompilerError is raised that names every failure.
+            
+            When building incrementally, only those sources whose object code is stale (per the
+            build manifest) are compiled; these are listed in `self.recompiled` thereafter.
+            
+            In batched builds, the sources are instead compiled by `compile_batched(…)`, q.v. sub.
         """
         if self.compiled:
             return True
+        sources, outputs, pending = self.compile_pending()
+        started = time.perf_counter()
+        if self.unity:
+            outputs = self.compile_unity(sources)
+        elif len(pending) > 0:
+            compile_concurrently = self.batch and self.compile_batched or self.compile_concurrently
+            results, errors = compile_concurrently([sources[idx] for idx in pending])
+            for idx, result in zip(pending, results):
+                outputs[idx] = result
+            self.compile_errors.update(errors)
+        self.compile_time = time.perf_counter() - started
+        return self.compile_finish(sources, outputs)
+    
+    @measured('compile')
+    async def compile_all_async(self):
+        """ Attempt to compile all of the generator source files we discovered, asynchronously --
+            this coroutine does what `compile_all()` does (q.v. supra), but the compilations are
+            run by way of `compile_concurrently_async(…)` (q.v. sub) in lieu of a thread pool.
+            Unity and batched builds are still run by `compile_unity(…)` and `compile_batched(…)`
+            respectively, in the event loop’s default executor.
+        """
+        if self.compiled:
+            return True
+        sources, outputs, pending = self.compile_pending()
+        started = time.perf_counter()
+        if self.unity:
+            loop = asyncio.get_running_loop()
+            outputs = await loop.run_in_executor(None, self.compile_unity, sources)
+        elif self.batch and len(pending) > 0:
+            loop = asyncio.get_running_loop()
+            results, errors = await loop.run_in_executor(None, self.compile_batched,
+                                                              [sources[idx] for idx in pending])
+            for idx, result in zip(pending, results):
+                outputs[idx] = result
+            self.compile_errors.update(errors)
+        elif len(pending) > 0:
+            results, errors = await self.compile_concurrently_async([sources[idx] for idx in pending])
+            for idx, result in zip(pending, results):
+                outputs[idx] = result
+            self.compile_errors.update(errors)
+        self.compile_time = time.perf_counter() - started
+        return self.compile_finish(sources, outputs)
+    
+    def compile_pending(self):
+        """ Get ready to compile: precompile the header (if need be) and figure out which of
+            the sources need compiling -- returning a tuple of the sources, a list of their
+            object-code paths (None for those yet to be compiled) and a list of the indexes
+            of those sources pending compilation.
+        """
         if not self.precompiled:
             raise CompilerError(f"can't compile before precompilation: {self.directory}")
         if self.source_count < 1:
             raise CompilerError(f"can't find any compilation inputs: {self.directory}")
+        self.precompile_header()
+        sources = tuple(self.sources)
+        outputs = [None] * len(sources)
+        pending = list(range(len(sources)))
+        if self.incremental:
+            pending = []
+            for idx, source in enumerate(sources):
+                destination = self.object_path(source)
+                if self.manifest.stale(source, destination, self.compile_command):
+                    pending.append(idx)
+                else:
+                    outputs[idx] = destination
+        self.recompiled = OCDList(sources[idx] for idx in pending)
         if self.VERBOSE:
-            print(f"Compiling {self.source_count} generator source files")
-        for source in self.sources:
-            sourcebase = os.path.basename(source)
-            splitbase = os.path.splitext(sourcebase)
-            with TemporaryName(prefix=splitbase[0],
-                               suffix=self.object_suffix) as tn:
-                with Generator(self.conf, cdb=self.cdb,
-                                          source=source,
-                                          destination=os.fspath(tn),
-                                          intermediate=os.fspath(self.intermediate),
-                                          verbose=self.VERBOSE) as gen:
-                    if gen.compiled:
-                        gen.do_not_destroy()
-                        self.prelink.append(tn.do_not_destroy())
+            if self.incremental:
+                print(f"Recompiling {len(pending)} of {self.source_count} generator source files "
+                      f"({self.jobs} jobs)")
+            else:
+                print(f"Compiling {self.source_count} generator source files ({self.jobs} jobs)")
+        self.compile_errors = {}
+        return sources, outputs, pending
+    
+    def compile_finish(self, sources, outputs):
+        """ Wrap up after compiling: gather the object code for linking, update the manifest
+            (or the timing records) and raise a CompilerError naming any failed compilations.
+        """
+        for output in outputs:
+            if output is not None:
+                self.prelink.append(output)
+        if self.incremental:
+            self.manifest.write()
+        elif len(self.compile_errors) == 0:
+            self.record_timing()
+        if self.cache is not None:
+            if self.VERBOSE:
+                print(f"Object cache: {self.cache.hits} hits, {self.cache.misses} misses")
+            self.cache.save_stats()
         if self.VERBOSE:
             print("")
-        if self.source_count == self.prelink_count:
+        if len(self.compile_errors) > 0:
+            failures = "\n".join(f"{os.path.basename(source)}: {str(exc)}" \
+                                 for source, exc in sorted(self.compile_errors.items()))
+            raise CompilerError(f"{len(self.compile_errors)} of {len(sources)} "
+                                f"generator sources failed to compile:\n{failures}")
+        if len(outputs) > 0 and None not in outputs:
             self._compiled = True
         return self.compiled
     
+    def compile_concurrently(self, sources):
+        """ Compile a list of source files concurrently, using a pool of up to `self.jobs`
+            worker threads each calling `compile_source(…)` -- returning a list of the resulting
+            object-code paths (in source order) and a dict of any exceptions raised, keyed by
+            the sources that raised them.
+        """
+        outputs = [None] * len(sources)
+        errors = {}
+        if len(sources) < 1:
+            return outputs, errors
+        with ThreadPoolExecutor(max_workers=min(self.jobs, len(sources))) as executor:
+            futures = { executor.submit(self.compile_source, source) : idx \
+                                                  for idx, source in enumerate(sources) }
+            for future in as_completed(futures):
+                idx = futures[future]
+                try:
+                    outputs[idx] = future.result()
+                except Exception as exc:
+                    errors[sources[idx]] = exc
+        return outputs, errors
+    
+    async def compile_concurrently_async(self, sources):
+        """ Compile a list of source files concurrently, as awaitables -- with up to `self.jobs`
+            compiler subprocesses in flight at any one time -- returning a list of the resulting
+            object-code paths and a dict of any exceptions raised, just like
+            `compile_concurrently(…)` (q.v. supra). If this coroutine is cancelled, so are
+            all of the compilations, and their compiler subprocesses are killed.
+        """
+        outputs = [None] * len(sources)
+        errors = {}
+        if len(sources) < 1:
+            return outputs, errors
+        semaphore = asyncio.Semaphore(self.jobs)
+        
+        async def compile_source(source):
+            async with semaphore:
+                return await self.compile_source_async(source)
+        
+        results = await asyncio.gather(*(compile_source(source) for source in sources),
+                                        return_exceptions=True)
+        for idx, result in enumerate(results):
+            if isinstance(result, Exception):
+                errors[sources[idx]] = result
+            else:
+                outputs[idx] = result
+        return outputs, errors
+    
+    def compile_unity(self, sources):
+        """ Compile the sources as a unity build: batches of up to `self.unity` sources are
+            merged into jumbo translation units, written out to the intermediate directory, and
+            all of these are then compiled concurrently, along with any sources that couldn’t be
+            merged (for sharing namespace-scope names with other sources -- q.v. the function
+            `halogen.unity.unity_symbols(…)` for the details) which get compiled standalone.
+            
+            If a jumbo unit fails to compile, its sources are all recompiled standalone, and the
+            failure is noted in the `self.unity_fallbacks` dict (keyed by the jumbo unit path).
+            The jumbo units themselves are listed in the `self.unity_units` dict, mapping each to
+            a tuple of the sources it includes. This method returns a list of object-code paths.
+        """
+        batches, standalone = unity_batches(sources, self.unity)
+        unitdir = self.intermediate.subdirectory('unity')
+        if not unitdir.exists:
+            unitdir.makedirs()
+        self.unity_units = {}
+        for idx, batch in enumerate(batches):
+            jumbo = unitdir.subpath(f"{self.prefix}-unity-{idx:03}{os.extsep}{self.suffix}")
+            self.unity_units[write_jumbo(jumbo, batch)] = batch
+        self.unity_standalone = OCDList(standalone)
+        self.unity_fallbacks = {}
+        if self.VERBOSE:
+            print(f"Unity build: merged {len(sources) - len(standalone)} of {len(sources)} sources "
+                  f"into {len(batches)} jumbo units")
+        units = list(self.unity_units.keys()) + list(standalone)
+        outputs, errors = self.compile_concurrently(units)
+        objects = []
+        fallbacks = []
+        for unit, output in zip(units, outputs):
+            if unit in self.unity_units and output is None:
+                self.unity_fallbacks[unit] = errors.pop(unit, None)
+                fallbacks.extend(self.unity_units[unit])
+            else:
+                objects.append(output)
+        self.compile_errors.update(errors)
+        if len(fallbacks) > 0:
+            if self.VERBOSE:
+                print(f"Unity build: {len(self.unity_fallbacks)} jumbo units failed -- "
+                      f"compiling their {len(fallbacks)} sources standalone")
+            outputs, errors = self.compile_concurrently(fallbacks)
+            objects.extend(outputs)
+            self.compile_errors.update(errors)
+            self.unity_standalone.extend(fallbacks)
+        return objects
+    
+    def compile_batches(self, sources):
+        """ Group sources into batches for `compile_batched(…)` -- of up to `self.batch` sources
+            apiece, with no two sources in any one batch sharing a basename (as the compiler names
+            the object code for each source after its basename). N.B. all of our sources are
+            compiled with the same config, and therefore the same flags, so any of them may share
+            a batch. The batch size is as requested, even if that leaves some of the `self.jobs`
+            workers idle -- saving on compiler start-ups is the whole point, after all.
+        """
+        size = self.batch
+        batches = []
+        for source in sources:
+            stem = os.path.splitext(os.path.basename(source))[0]
+            for batch in batches:
+                if len(batch) < size and stem not in batch:
+                    batch[stem] = source
+                    break
+            else:
+                batches.append({ stem : source })
+        return [list(batch.values()) for batch in batches]
+    
+    def compile_batch(self, batch):
+        """ Compile a batch of sources with a single compiler invocation, run in a scratch
+            directory within the intermediate directory -- returning a list of the paths to
+            the resulting object code, in batch order, or raising a CompilerError if the
+            compiler complained or any of the object code failed to materialize.
+            
+            The object code is moved from the scratch directory to the intermediate directory,
+            or to the stable object-code paths when building incrementally, in which case the
+            build manifest is updated as per `compile_source(…)`, q.v. supra.
+        """
+        batchdir = tempfile.mkdtemp(prefix=f"{self.prefix}-batch-", dir=os.fspath(self.intermediate))
+        try:
+            with self.stats.measure(f"{os.path.basename(batch[0])} (+{len(batch) - 1})",
+                                      category='source') as args:
+                args['batch'] = len(batch)
+                result = config.CXXBATCH(self.conf, *batch, cdb=self.cdb,
+                                                            depfiles=self.incremental,
+                                                            directory=batchdir,
+                                                            timeout=self.timeout,
+                                                            verbose=self.VERBOSE)
+            if len(result) > 1 and len(result[1]) > 0: # failure
+                raise CompilerError(result[1])
+            outputs = []
+            for source in batch:
+                stem = os.path.splitext(os.path.basename(source))[0]
+                compiled = os.path.join(batchdir, f"{stem}{os.extsep}o")
+                if not os.path.isfile(compiled):
+                    raise CompilerError(f"compiler output isn’t a regular file: {compiled}")
+                if self.incremental:
+                    destination = self.object_path(source)
+                    depfile = os.path.join(batchdir, f"{stem}{DEPFILE_SUFFIX}")
+                    # The compiler ran in the scratch directory, so any relative paths
+                    # in the depfile are relative to it -- resolve them while it exists:
+                    dependencies = parse_depfile(depfile, directory=batchdir)
+                    self.manifest.discard(source)
+                    os.replace(compiled, destination)
+                    os.replace(depfile, f"{destination}{DEPFILE_SUFFIX}")
+                    self.manifest.record(source, destination,
+                                         self.compile_command,
+                                         dependencies)
+                else:
+                    destination = self.intermediate.subpath(self.object_name(source))
+                    os.replace(compiled, destination)
+                outputs.append(destination)
+            return outputs
+        finally:
+            rm_rf(batchdir)
+    
+    def compile_batched(self, sources):
+        """ Compile a list of source files in batches (q.v. `compile_batches(…)` supra.) using
+            a pool of up to `self.jobs` worker threads each calling `compile_batch(…)` -- returning
+            a list of the resulting object-code paths (in source order) and a dict of any exceptions
+            raised, keyed by source, just like `compile_concurrently(…)`, q.v. supra.
+            
+            When a batch fails, there’s no telling which of its sources is to blame -- so they’re
+            all compiled again one by one, by `compile_concurrently(…)`, and the failure of the
+            batch is noted in the `self.batch_fallbacks` dict (keyed by the tuple of its sources).
+        """
+        outputs = [None] * len(sources)
+        errors = {}
+        if len(sources) < 1:
+            return outputs, errors
+        batches = self.compile_batches(sources)
+        indexes = { source : idx for idx, source in enumerate(sources) }
+        self.batch_fallbacks = {}
+        if self.VERBOSE:
+            print(f"Batched build: compiling {len(sources)} sources in {len(batches)} batches")
+        fallbacks = []
+        with ThreadPoolExecutor(max_workers=min(self.jobs, len(batches))) as executor:
+            futures = { executor.submit(self.compile_batch, batch) : batch for batch in batches }
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    for source, output in zip(batch, future.result()):
+                        outputs[indexes[source]] = output
+                except Exception as exc:
+                    self.batch_fallbacks[tuple(batch)] = exc
+                    fallbacks.extend(batch)
+        if len(fallbacks) > 0:
+            if self.VERBOSE:
+                print(f"Batched build: {len(self.batch_fallbacks)} batches failed -- "
+                      f"compiling their {len(fallbacks)} sources one by one")
+            results, errors = self.compile_concurrently(fallbacks)
+            for source, output in zip(fallbacks, results):
+                outputs[indexes[source]] = output
+        return outputs, errors
+    
+    def record_timing(self):
+        """ Record how long it took to compile all of our sources -- in the `self.timings`
+            directory, which persists between builds (q.v. the class docstring supra.) -- alongside
+            any previous timings for the same source directory, so that unity builds can be
+            compared with per-file builds. Compilations that hit the object cache are skewed,
+            and aren’t recorded. After a unity build, the last recorded per-file build is stored
+            in `self.unity_baseline` and the speedup over it in `self.unity_speedup` -- both of
+            which are left as None, with a note to that effect, if there is no such baseline.
+        """
+        if self.compile_time is None:
+            return None
+        if self.cache is not None and self.cache.hits > 0:
+            return None
+        directory = self.timings
+        if not directory.exists:
+            directory.makedirs()
+        timings = read_timings(directory)
+        record = timings.setdefault(self.directory.realpath(), {})
+        mode = self.unity and 'unity' or self.batch and 'batched' or 'per_file'
+        record[mode] = dict(seconds=self.compile_time,
+                            sources=self.source_count,
+                            jobs=self.jobs)
+        if self.unity and 'per_file' in record:
+            baseline = self.unity_baseline = dict(record['per_file'])
+            per_source = float(baseline['seconds']) / max(int(baseline['sources']), 1)
+            self.unity_speedup = (per_source * self.source_count) / max(self.compile_time, 1e-6)
+        if self.VERBOSE:
+            print(f"Compiled {self.source_count} generator sources in {self.compile_time:.2f}s")
+            if self.unity_speedup:
+                print(f"Unity build speedup over per-file build: {self.unity_speedup:.2f}x")
+        if self.unity and self.unity_baseline is None:
+            print(f"No per-file build of {self.directory} timed in {directory} -- "
+                   "build without `unity` first, for a unity build speedup")
+        write_timings(directory, timings)
+        return record
+    
+    @measured('postcompile')
     def postcompile(self):
         """ If compilation has previously been successful, the `postcompile()` method will,
             if the `use_cdb` initializatiion option was True, attempt to write out a compilation
@@ -444,6 +1355,7 @@ class Generators(contextlib.AbstractContextManager):
                 self._postcompiled = True
         return self.postcompiled
     
+    @measured('link')
     def link(self):
         """ If compilation has previously been successful, the `link()` method will attempt
             to link all of the compiled object code artifacts into a dynamic-link library file,
@@ -452,7 +1364,9 @@ class Generators(contextlib.AbstractContextManager):
             
             The `link()` method considers the discovery of an existing dynamic-link library file
             to be an error condition -- it will not, at the time of writing, overwrite a file
-            at its destination path.
+            at its destination path… unless we’re building incrementally, in which case an existing
+            library will be left as-is if none of its object code has changed since it was linked,
+            and replaced if otherwise.
             
             * - that is, if this code ever runs on Windows, which I think would take some
                 kind of crazy miracle, and/or someone giving me a Windows machine and a ton
@@ -464,23 +1378,38 @@ class Generators(contextlib.AbstractContextManager):
             raise LinkerError(f"can't link before compilation: {self.directory}")
         if self.prelink_count < 1:
             raise LinkerError(f"no files available for linker: {self.directory}")
+        command = self.conf.ld_flag_string(self.library, *self.prelink, linker=self.linker)
         if os.path.exists(self.library):
-            raise LinkerError(f"can't overwrite linker output: {self.library}")
+            if not self.incremental:
+                raise LinkerError(f"can't overwrite linker output: {self.library}")
+            if not self.manifest.stale(self.library, self.library, command):
+                if self.VERBOSE:
+                    print(f"Library is up to date: {os.path.basename(self.library)}")
+                    print("")
+                self._linked = True
+                return self.linked
+            rm_rf(self.library)
         if self.VERBOSE:
             # print("")
             print(f"Linking {self.prelink_count} generators as {os.path.basename(self.library)}")
             print("")
         self.link_result += config.LD(self.conf,
                                       self.library,
-                                     *self.prelink, verbose=self.VERBOSE)
+                                     *self.prelink, linker=self.linker,
+                                                    timeout=self.timeout,
+                                                    verbose=self.VERBOSE)
         if len(self.link_result) > 0: # apres-link
             self._linked = os.path.isfile(self.library)
         if not self.linked:
             if len(self.link_result[1]) > 0: # failure
                 raise LinkerError(self.link_result[1])
             raise LinkerError(f"Dynamic-link library file wasn’t created: {self.library}")
+        if self.incremental:
+            self.manifest.record(self.library, self.library, command, self.prelink)
+            self.manifest.write()
         return self.linked
     
+    @measured('arch')
     def arch(self):
         """ If compilation has previously been successful, the `arch()` method will attempt
             to link all of the compiled object code artifacts into a static-link library file,
@@ -489,7 +1418,9 @@ class Generators(contextlib.AbstractContextManager):
             
             The `arch()` method considers the discovery of an existing static-link library file
             to be an error condition -- it will not, at the time of writing, overwrite a file
-            at its destination path.
+            at its destination path… unless we’re building incrementally, in which case an existing
+            archive will be left as-is if none of its object code has changed since it was archived,
+            and replaced if otherwise.
             
             * - that is, if this code ever runs on Windows, which I think would take some
                 kind of crazy miracle, and/or someone giving me a Windows machine and a ton
@@ -501,23 +1432,61 @@ class Generators(contextlib.AbstractContextManager):
             raise ArchiverError(f"can't archive before compilation: {self.directory}")
         if self.prelink_count < 1:
             raise ArchiverError(f"no files available for archiver: {self.directory}")
+        command = self.conf.ar_flag_string(self.archive, *self.prelink, thin=self.thin_archive)
         if os.path.exists(self.archive):
-            raise ArchiverError(f"can't overwrite archiver output: {self.archive}")
+            if not self.incremental:
+                raise ArchiverError(f"can't overwrite archiver output: {self.archive}")
+            if not self.manifest.stale(self.archive, self.archive, command):
+                if self.VERBOSE:
+                    print(f"Archive is up to date: {os.path.basename(self.archive)}")
+                    print("")
+                self._archived = True
+                return self.archived
+            # N.B. the archiver would otherwise add to the existing archive:
+            rm_rf(self.archive)
         if self.VERBOSE:
             # print("")
             print(f"Archiving {self.prelink_count} generators as {os.path.basename(self.archive)}")
             print("")
         self.archive_result += config.AR(self.conf,
                                          self.archive,
-                                        *self.prelink, verbose=self.VERBOSE)
+                                        *self.prelink, thin=self.thin_archive,
+                                                       timeout=self.timeout,
+                                                       verbose=self.VERBOSE)
         if len(self.archive_result) > 0: # apres-arch
             self._archived = os.path.isfile(self.archive)
         if not self.archived:
             if len(self.archive_result[1]) > 0: # failure
                 raise ArchiverError(self.archive_result[1])
             raise ArchiverError(f"Static library archive file wasn’t created: {self.archive}")
+        if self.incremental:
+            self.manifest.record(self.archive, self.archive, command, self.prelink)
+            self.manifest.write()
         return self.archived
     
+    def link_and_arch(self):
+        """ Link dynamically and statically -- that is, call `link()` and `arch()`, as called
+            for by `do_shared` and `do_static` -- concurrently, as neither depends on the other.
+            Each runs its command as a subprocess, in a thread of its own, so both read the
+            object code at once. If either raises, the first such exception is re-raised
+            once both have finished.
+        """
+        phases = []
+        if self.do_shared:
+            phases.append(self.link)
+        if self.do_static:
+            phases.append(self.arch)
+        if len(phases) < 2:
+            for phase in phases:
+                phase()
+            return
+        with ThreadPoolExecutor(max_workers=len(phases)) as executor:
+            futures = [executor.submit(phase) for phase in phases]
+        for future in futures:
+            if future.exception() is not None:
+                raise future.exception()
+    
+    @measured('preload')
     def preload_all(self):
         """ If both compilation and dynamic-library linking have been successful -- that is to
             say, both the `compile_all()` and `link()` have been successfully called without error,
@@ -529,6 +1498,13 @@ class Generators(contextlib.AbstractContextManager):
             property `generators.preloaded` will thereafter appear as `True` iff the call to
             `halogen.generate.preload(…)` was able to successfully load the library via ctypes.
             
+            If an index was passed to the constructor as `index` -- True for the default one, or
+            the path to the directory of another, or a halogen.index.GeneratorIndex instance --
+            the generators registered by the library are recorded in that generator index, such
+            that they can later be loaded on demand, q.v. `halogen.generate.load_generators(…)`.
+            By default, nothing is indexed: libraries built in temporary directories are of no
+            use to anyone, once those directories are gone.
+            
             Exceptions of type `halogen.errors.GeneratorLoaderError` can raise if things go awry.
         """
         # preload() may also raise GeneratorLoaderError:
@@ -540,7 +1516,11 @@ class Generators(contextlib.AbstractContextManager):
                 print(f"Preloading generators from {self.library}")
                 # print("")
             try:
-                self.preload_result = preload(self.library, verbose=self.VERBOSE)
+                if self.index is None or self.index is False:
+                    self.preload_result = preload(self.library, verbose=self.VERBOSE)
+                else:
+                    index_library(self.library, index=self.index, verbose=self.VERBOSE)
+                    self.preload_result = preload(self.library, verbose=self.VERBOSE)
             except GeneratorLoaderError as preload_error:
                 raise preload_error
             else:
@@ -552,19 +1532,25 @@ class Generators(contextlib.AbstractContextManager):
         """ Return a tuple containing the names of all successfully loaded and currently available
             generator modules.
             
-            This `loaded_generators()` method calls `halogen.api.registered_generators()`, which
+            This `loaded_generators()` method calls `halogen.api.registry_snapshot()`, which
             uses Cython’s C++ bridge to call `Halide::GeneratorRegistry::enumerate()` and convert
-            the returned `std::vector<std::string>` into a Python set of Python strings. That is,
-            if the instance of `halogen.compile.Generators` has previously successfully ran its
+            the returned `std::vector<std::string>` into a Python set of Python strings -- or
+            rather, it does so once, and returns the same snapshot until a library is loaded. That
+            is, if the instance of `halogen.compile.Generators` has previously successfully ran its
             compilation phase, its link-dynamic phase, and its preload phase -- if not, it’ll
             just toss back an empty set without making any calls into Halide whatsoever.
+            The sorted set is itself kept for as long as the registry snapshot is current.
         """
         if self.preloaded:
             if __package__ is None or __package__ == '':
                 import api # type: ignore
             else:
                 from . import api
-            return OCDFrozenSet(api.registered_generators())
+            snapshot = api.registry_snapshot()
+            if self._loaded_snapshot is not snapshot:
+                self._loaded_snapshot = snapshot
+                self._loaded_generators = OCDFrozenSet(snapshot)
+            return self._loaded_generators
         return OCDFrozenSet()
     
     @property
@@ -572,13 +1558,59 @@ class Generators(contextlib.AbstractContextManager):
         """ Number (int) of dynamic-link-loaded generator modules currently available """
         return len(self.loaded_generators())
     
-    def run(self, target=None, emit=None, substitutions=None):
+    @classmethod
+    def emit_options(cls, emit=None):
+        """ Return a tuple of emit option names, given the “emit” argument to `run(…)` --
+            which may be None (for the defaults), the name of one of the sets of emits in
+            the `emits` class dict (e.g. “expanded”), or an iterable of emit option names.
+        """
+        emits = cls.emits
+        if not emit:
+            emit = tuplize(*emits['default'])
+        elif is_string(emit):
+            emit = u8str(emit)
+            if emit in emits:
+                emit = tuplize(*emits.get(emit))
+            else:
+                possibles = ", ".join(OCDList(emits.keys()))
+                raise GenerationError("String value for “emit” when calling Generators::run(…) "
+                                     f"must be one of: {possibles}")
+        else:
+            emit = tuplize(*emit)
+        
+        if len(emit) < 1:
+            possibles = ", ".join(emits['all'])
+            raise GenerationError("Iterable value for “emit” when calling Generators::run(…) must contain "
+                                 f"one or more valid emit options (one of: {possibles})")
+        return emit
+    
+    @measured('run')
+    def run(self, target=None, emit=None, substitutions=None, multitarget=False, params=None,
+                                                                                  profile=None,
+                                                                                  jobs=1):
         """ Use the halogen.compile.Generators.run(…) method to run generators.
             
             All generator code that this instance knows about must have been previously compiled,
             dynamically linked, and preloaded. Assuming that all of these generators were properly
             programmed, they will then be available to halogen via the Halide Generator API --
             specifically the Generator Registry (q.v. `loaded_generators()` method docstring, supra).
+            
+            Generators are run one at a time, in this process, by default -- pass `jobs=N` to
+            run them concurrently in up to N worker processes, each of which preloads the library
+            anew. N.B. in that case, the modules come back as halogen.generate.ModuleMetadata
+            instances, rather than halogen.api.Module instances -- q.v. the docstring of the
+            function `halogen.generate.generate(…)` for the details.
+            
+            The `target` argument may be a list of target strings, in which case the artifacts
+            are returned in a dict keyed by target string, each value of which is a dict of
+            artifacts keyed by module name. With `multitarget=True`, the artifacts for the
+            runtime-dispatching multi-target libraries are keyed by the comma-separated list
+            of all the target strings. GeneratorParam values may be passed as a dict in `params`.
+            
+            Pass `profile=True` to have a dict of halogen.generate.GenerationProfile tuples, one
+            for each generator run, returned alongside the artifacts -- as in `generated, profiles
+            = gens.run(…, profile=True)` -- or pass a dict as `profile` to have it filled in with
+            the same; q.v. the `halogen.generate.generate(…)` docstring.
         """
         # Check self-status:
         if not self.precompiled:
@@ -599,48 +1631,240 @@ class Generators(contextlib.AbstractContextManager):
         if not substitutions:
             substitutions = {}
         
-        emits = type(self).emits
-        if not emit:
-            emit = tuplize(*emits['default'])
-        elif is_string(emit):
-            emit = u8str(emit)
-            if emit in emits:
-                emit = tuplize(*emits.get(emit))
-            else:
-                possibles = ", ".join(OCDList(emits.keys()))
-                raise GenerationError("String value for “emit” when calling Generators::run(…) "
-                                     f"must be one of: {possibles}")
-        else:
-            emit = tuplize(*emit)
+        emit = self.emit_options(emit)
         
-        if len(emit) < 1:
-            possibles = ", ".join(emits['all'])
-            raise GenerationError("Iterable value for “emit” when calling Generators::run(…) must contain "
-                                 f"one or more valid emit options (one of: {possibles})")
+        # Profile into a dict of our own, if asked to return the profiles:
+        return_profile = profile is True
+        if return_profile:
+            profile = {}
         
-        # Run generators, storing output files in $TMP/yodogg
+        # Run generators, storing output files in $TMP/yodogg -- in worker processes,
+        # each of which will preload our dynamic-link library, if asked to use them:
         artifacts = generate(*self.loaded_generators(), verbose=self.VERBOSE,
                                                         target=target,
                                                         emit=emit,
                                                         output_directory=self.destination,
-                                                        substitutions=substitutions)
+                                                        substitutions=substitutions,
+                                                        jobs=jobs,
+                                                        libraries=(self.library,),
+                                                        multitarget=multitarget,
+                                                        params=params or {},
+                                                        profile=profile,
+                                                        cache=self.artifact_cache)
         
-        # Re-dictify:
-        generated = { artifact[2].name : dict(base_path=artifact[0],
-                                              outputs=artifact[1],
-                                              module=artifact[2]) for artifact in artifacts }
+        # Re-dictify -- by target, if we’ve run for more than one:
+        if is_string(target):
+            generated = { artifact[2].name : dict(base_path=artifact[0],
+                                                  outputs=artifact[1],
+                                                  module=artifact[2]) for artifact in artifacts }
+        else:
+            generated = {}
+            for artifact in artifacts:
+                module_target = u8str(artifact[2].target)
+                generated.setdefault(module_target, {})[artifact[2].name] = dict(base_path=artifact[0],
+                                                                                 outputs=artifact[1],
+                                                                                 module=artifact[2])
         
         # TELL ME ABOUT IT.
         if self.VERBOSE:
             module_names = ", ".join(u8str(key) for key in OCDList(generated.keys()))
             print(f"run(): Accreted {len(generated)} total generation artifacts")
             print(f"run(): Module names: {module_names}")
+            if self.artifact_cache is not None:
+                print(self.artifact_cache.report())
         
-        # Return redictified artifacts:
+        # Return redictified artifacts -- and their profiles, if asked:
+        if return_profile:
+            return generated, profile
         return generated
     
+    @measured('extensions')
+    def extensions(self, generated):
+        """ Build Python extension modules from the artifacts returned by `run()` (q.v. supra)
+            -- which must have been run for one target, emitting at least “python_extension”
+            and “static_library” (as with the “expanded” emit set) -- and import them.
+            
+            Each generator’s emitted extension source is compiled and linked with its static
+            library, in parallel -- as many at a time as `self.jobs` allows -- using the config
+            instance with which this Generators instance was set up (q.v. `build_python_extension(…)`
+            supra). The extension modules are written alongside the other outputs, and imported;
+            returns a dict of their callables, keyed by generator name. These run the pipelines
+            ahead-of-time compiled for the target -- no JIT required.
+            
+            Any failures are collected, and raised in one ExtensionError, once every extension
+            has had its turn.
+        """
+        if not self.preloaded:
+            raise ExtensionError("Can’t build extensions before generators have been run")
+        
+        tasks = {}
+        for name, artifact in dict(generated).items():
+            if not isinstance(artifact, dict) or 'outputs' not in artifact:
+                raise ExtensionError("Extensions can only be built from the artifacts of a single-target run()")
+            outputs = artifact['outputs']
+            tasks[name] = (outputs.python_extension_name,
+                           outputs.static_library_name)
+        
+        if len(tasks) < 1:
+            return {}
+        
+        def build(name):
+            source, library = tasks[name]
+            return build_python_extension(self.conf, name, source, library,
+                                          destination=os.path.dirname(source or os.fspath(self.destination)),
+                                          intermediate=os.fspath(self.intermediate),
+                                          timeout=self.timeout,
+                                          verbose=self.VERBOSE)
+        
+        extensions = {}
+        failures = {}
+        with ThreadPoolExecutor(max_workers=min(self.jobs, len(tasks))) as executor:
+            futures = { executor.submit(build, name) : name for name in tasks }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    extensions[name] = future.result()
+                except Exception as exc:
+                    failures[name] = exc
+        
+        # Import in the calling thread, in order:
+        callables = {}
+        for name in sorted(extensions):
+            try:
+                module = import_python_extension(name, extensions[name])
+            except ExtensionError as exc:
+                failures[name] = exc
+            else:
+                callables[name] = getattr(module, u8str(name).split('::')[-1])
+        
+        if self.VERBOSE:
+            print(f"extensions(): Built and imported {len(callables)} python extensions")
+        
+        if len(failures) > 0:
+            summary = "\n".join(f"• {name}: {type(exc).__name__}: {exc}" for name, exc in failures.items())
+            raise ExtensionError(f"Failed to build {len(failures)} python extensions:\n{summary}")
+        
+        return callables
+    
+    def build_plan(self, builddir, target=None, emit=None, generators=None, params=None):
+        """ Return a halogen.buildfile.BuildPlan for building (and running) the generators,
+            as this instance would -- but leaving the build itself to Ninja or CMake, q.v.
+            `write_ninja(…)` and `write_cmake(…)` sub.
+            
+            The plan has one compile step per generator source, with object code going to
+            `<builddir>/objects` and the dependencies named in a depfile alongside, using the
+            exact command from the config’s `cxx_flag_string(…)`; a step linking the library
+            (with `ld_flag_string(…)`) and/or one archiving it (with `ar_flag_string(…)`); and
+            a generate step -- running the halogen CLI on the library -- for each generator
+            and target. The `target`, `emit` and `params` arguments are as per `run(…)`.
+            
+            Generators are named in `generators` or, failing that, are those loaded into
+            the registry by `preload_all()` -- absent either, there are no generate steps.
+        """
+        if __package__ is None or __package__ == '':
+            import api # type: ignore
+            from generate import emit_options_for
+        else:
+            from . import api # type: ignore
+            from .generate import emit_options_for
+        
+        if not self.precompile():
+            raise CompilerError(f"no generator sources found: {self.directory}")
+        builddir = os.path.abspath(os.fspath(builddir))
+        
+        # Commands are rendered with placeholders, which are then swapped for
+        # Ninja variables -- after escaping any literal dollar signs:
+        def template(command):
+            command = command.replace("$", "$$")
+            for placeholder, variable in (("<output>", "$out"), ("<input>", "$in"),
+                                                                ("<depfile>", "$out.d")):
+                command = command.replace(placeholder, variable)
+            return command
+        
+        plan = BuildPlan(name=f"{self.prefix}_generators")
+        plan.rule('cxx', template(self.conf.cxx_flag_string("<output>", "<input>", depfile="<depfile>")),
+                         description="CXX $out", depfile="$out.d")
+        
+        objects = []
+        for source in self.sources:
+            objects.append(os.path.join(builddir, 'objects', self.object_name(source)))
+            plan.build('cxx', objects[-1], source)
+        
+        if self.do_shared:
+            plan.rule('ld', template(self.conf.ld_flag_string("<output>", "<input>", linker=self.linker)),
+                            description="LD $out")
+            plan.build('ld', self.library, objects, default=True)
+        
+        if self.do_static:
+            # N.B. the archiver would otherwise add to an existing archive:
+            plan.rule('ar', f"rm -f $out && {template(self.conf.ar_flag_string('<output>', '<input>', thin=self.thin_archive))}",
+                            description="AR $out")
+            plan.build('ar', self.archive, objects, default=True)
+        
+        generators = tuple(sorted(u8str(generator) for generator in generators or \
+                                     (self.preloaded and self.loaded_generators()) or tuple()))
+        if len(generators) < 1:
+            return plan
+        if not self.do_shared:
+            raise GenerationError("Generate steps require the dynamic-link library (q.v. `do_shared`)")
+        
+        # Normalize the target strings, as halogen.generate.generate(…) does:
+        targets = {}
+        for target_string in (is_string(target) and (target,) or target or ('host',)):
+            halide_target = api.Target(target_string=u8bytes(target_string))
+            targets.setdefault(u8str(halide_target), halide_target)
+        
+        emit = self.emit_options(emit)
+        emit_options = emit_options_for(emit, {})
+        arguments = " ".join(shlex.quote(f"{key}={value}") for key, value in dict(params or {}).items())
+        plan.rule('generate', f"{shlex.quote(sys.executable)} -m halogen.cli $generator target=$target "
+                              f"--library=$library --output=$outdir --emit={','.join(emit)} "
+                              f"{arguments.replace('$', '$$')}".strip(),
+                              description="GENERATE $generator ($target)",
+                              restat=True)
+        
+        # Each generator and target gets a step, with outputs where generate(…) would put them:
+        for generator in generators:
+            for target_string, halide_target in targets.items():
+                outdir = len(targets) == 1 and os.fspath(self.destination) \
+                                            or os.path.join(os.fspath(self.destination), target_string)
+                base_path = api.compute_base_path(u8bytes(outdir), u8bytes(generator))
+                outputs = emit_options.compute_outputs_for_target_and_path(halide_target, base_path)
+                plan.build('generate', [u8str(getattr(outputs, name)) for name in output_names \
+                                                                      if getattr(outputs, name)],
+                                       implicit=self.library,
+                                       variables=dict(generator=generator, target=target_string,
+                                                                           outdir=outdir,
+                                                                           library=self.library),
+                                       default=True)
+        
+        return plan
+    
+    def write_ninja(self, pth, **kwargs):
+        """ Write out a `build.ninja` file for building and running the generators -- taking
+            the same keyword arguments as `build_plan(…)`, q.v. supra. -- with intermediate
+            build artifacts kept alongside it. Returns the path to the file.
+        """
+        pth = os.path.abspath(os.fspath(pth))
+        kwargs.setdefault('builddir', os.path.dirname(pth))
+        return self.build_plan(**kwargs).write_ninja(pth)
+    
+    def write_cmake(self, pth, **kwargs):
+        """ Write out a CMake fragment -- for `include(…)`-ing in a CMakeLists.txt file --
+            with custom commands for building and running the generators, taking the
+            same keyword arguments as `build_plan(…)`, q.v. supra. -- with intermediate
+            build artifacts kept alongside it. Returns the path to the file.
+        """
+        pth = os.path.abspath(os.fspath(pth))
+        kwargs.setdefault('builddir', os.path.dirname(pth))
+        return self.build_plan(**kwargs).write_cmake(pth)
+    
     def clear(self):
-        """ Delete temporary compilation artifacts: """
+        """ Delete temporary compilation artifacts -- unless we’re building incrementally,
+            in which case the object code is kept for the next build:
+        """
+        if self.incremental:
+            return True
         out = True
         for of in self.prelink:
             out &= rm_rf(of)
@@ -658,13 +1882,9 @@ class Generators(contextlib.AbstractContextManager):
         if self.compiled and self.use_cdb:
             self.postcompile()
         
-        # 3: link dynamically
-        if self.compiled and self.do_shared:
-            self.link()
-        
-        # 4: link statically (née 'archive')
-        if self.compiled and self.do_static:
-            self.arch()
+        # 3, 4: link dynamically and statically (née 'archive') -- concurrently:
+        if self.compiled:
+            self.link_and_arch()
         
         # 5: preload dynamic-linked output:
         if self.linked and self.do_preload:
@@ -675,10 +1895,64 @@ class Generators(contextlib.AbstractContextManager):
     
     def __exit__(self, exc_type=None, exc_val=None, exc_tb=None):
         # N.B. return False to throw, True to supress:
+        if self.VERBOSE:
+            print("Build phase timings:")
+            print(self.stats.report())
+            print("")
+        if self.trace:
+            self.stats.write_trace(self.trace)
         self.intermediate.close()   # will destroy a TemporaryDirectory,
                                     # but not a plain Directory
         self.clear()                # will destroy all .o files
         return exc_type is None
+    
+    async def build_async(self):
+        """ Run the build phases as a DAG of awaitables -- the same phases, with the same
+            preconditions, as run by `__enter__()` (q.v. supra), but:
+            
+            * all of the sources are compiled by `compile_all_async()`, with up to `self.jobs`
+              compiler subprocesses in flight at once, none of which block the event loop;
+            * once compilation is done, writing the compilation database, linking, and
+              archiving -- none of which depend on one another -- are run concurrently,
+              in the event loop’s default executor; and
+            * preloading the library waits on linking, and on nothing else.
+            
+            If any of the concurrent phases raises, the first such exception is re-raised
+            once they have all finished. This coroutine returns `self`.
+        """
+        # 0: start as you mean to go on:
+        self.precompile()
+        
+        # 1: COMPILE ALL THE THINGS
+        if self.precompiled:
+            await self.compile_all_async()
+        
+        # 2, 3, 4: write out compilation database, link dynamically and statically:
+        if self.compiled:
+            loop = asyncio.get_running_loop()
+            phases = []
+            if self.use_cdb:
+                phases.append(loop.run_in_executor(None, self.postcompile))
+            if self.do_shared:
+                phases.append(loop.run_in_executor(None, self.link))
+            if self.do_static:
+                phases.append(loop.run_in_executor(None, self.arch))
+            for result in await asyncio.gather(*phases, return_exceptions=True):
+                if isinstance(result, BaseException):
+                    raise result
+        
+        # 5: preload dynamic-linked output:
+        if self.linked and self.do_preload:
+            self.preload_all()
+        
+        # 6: return self
+        return self
+    
+    async def __aenter__(self):
+        return await self.build_async()
+    
+    async def __aexit__(self, exc_type=None, exc_val=None, exc_tb=None):
+        return self.__exit__(exc_type, exc_val, exc_tb)
 
 ExceptionType = tx.TypeVar('ExceptionType', bound=BaseException, covariant=True)
 
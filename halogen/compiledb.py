@@ -8,20 +8,27 @@ import collections.abc
 import contextlib
 import json
 import os
+import threading
 
 from abc import abstractmethod as abstract
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 if __package__ is None or __package__ == '':
     from errors import CDBError
-    from filesystem import rm_rf, TemporaryName, Directory
+    from filesystem import rm_rf, Directory
     from utils import stringify, u8bytes, u8str, tuplize
 else:
     from .errors import CDBError
-    from .filesystem import rm_rf, TemporaryName, Directory
+    from .filesystem import rm_rf, Directory
     from .utils import stringify, u8bytes, u8str, tuplize
 
 __all__ = ('CDBSubBase', 'CDBBase',
-                         'CDBJsonFile')
+                         'CDBJsonFile',
+                         'CDBJsonStream')
 
 __dir__ = lambda: list(__all__)
 
@@ -59,6 +66,9 @@ class CDBBase(CDBSubBase, collections.abc.Sequence,
     fields = tuplize('length')
     
     def __init__(self):
+        # The lock guards `self.entries` -- halogen.compile.Generators may
+        # push entries from several compilation worker threads at once:
+        self.lock = threading.RLock()
         self.clear()
     
     def push(self, source, command, directory=None,
@@ -74,12 +84,14 @@ class CDBBase(CDBSubBase, collections.abc.Sequence,
             entry.update({
                 'output'    : destination
             })
-        self.entries[source] = entry
+        with self.lock:
+            self.entries[source] = entry
     
     def rollout(self):
         out = []
-        for k, v in self.entries.items():
-            out.append(v)
+        with self.lock:
+            for k, v in self.entries.items():
+                out.append(v)
         return out
     
     @property
@@ -87,7 +99,8 @@ class CDBBase(CDBSubBase, collections.abc.Sequence,
         return len(self.entries)
     
     def clear(self):
-        self.entries = {}
+        with self.lock:
+            self.entries = {}
         return self
     
     def __len__(self):
@@ -148,7 +161,8 @@ class CDBJsonFile(CDBBase, contextlib.AbstractContextManager):
     def exists(self):
         return os.path.isfile(self.name)
     
-    def read(self, pth=None):
+    def load(self, pth=None):
+        """ Load and return the list of entries from a compilation database file, sans merging """
         readpth = pth or self.target
         if not readpth:
             raise CDBError("no path value from which to read")
@@ -160,32 +174,47 @@ class CDBJsonFile(CDBBase, contextlib.AbstractContextManager):
                 cdblist = json.load(handle)
             except json.JSONDecodeError as json_error:
                 raise CDBError(str(json_error))
-            else:
-                for cdbentry in cdblist:
-                    key = cdbentry.get('file')
-                    self.entries[key] = dict(cdbentry)
-        self.read_from = readpth
+        if not isinstance(cdblist, list):
+            raise CDBError(f"malformed compilation database file: {readpth}")
+        return cdblist
+    
+    def read(self, pth=None):
+        cdblist = self.load(pth)
+        with self.lock:
+            for cdbentry in cdblist:
+                key = cdbentry.get('file')
+                self.entries[key] = dict(cdbentry)
+        self.read_from = os.fspath(pth or self.target)
         return self
     
+    @staticmethod
+    def dumps(entries):
+        """ Serialize a list of entries as a JSON array, one entry per line """
+        if len(entries) < 1:
+            return "[\n]\n"
+        return "[\n" + ",\n".join(json.dumps(entry) for entry in entries) + "\n]\n"
+    
+    def replace(self, pth, entries):
+        """ Write a list of entries out to a temporary file alongside `pth`,
+            and then atomically rename the temporary file into place.
+        """
+        pth = os.fspath(pth)
+        if os.path.isdir(pth):
+            raise CDBError("can't overwrite a directory")
+        incoming = f"{pth}{os.extsep}{os.getpid()}{os.extsep}{threading.get_ident()}{os.extsep}tmp"
+        try:
+            with open(incoming, mode='w') as handle:
+                handle.write(self.dumps(entries))
+            os.replace(incoming, pth)
+        finally:
+            if os.path.exists(incoming):
+                rm_rf(incoming)
+        return pth
+    
     def write(self, pth=None):
-        with TemporaryName(prefix=self.splitname[0],
-                           suffix=self.splitname[1][1:]) as tn:
-            with open(tn.name, mode='w') as handle:
-                handle.write(str(self))
-            if pth is None:
-                if self.exists:
-                    rm_rf(self.name)
-                tn.copy(self.name)
-                self.written_to = self.name
-            else:
-                writepth = os.fspath(pth)
-                if os.path.isdir(writepth):
-                    raise CDBError("can't overwrite a directory")
-                if os.path.isfile(writepth) or \
-                   os.path.islink(writepth):
-                    rm_rf(writepth)
-                tn.copy(writepth)
-                self.written_to = writepth
+        if pth is None and not self.directory.exists:
+            self.directory.makedirs()
+        self.written_to = self.replace(pth or self.target, self.rollout())
         return self
     
     def __enter__(self):
@@ -200,8 +229,305 @@ class CDBJsonFile(CDBBase, contextlib.AbstractContextManager):
 
 CDBSubBase.register(CDBJsonFile)
 
+class CDBJsonStream(CDBJsonFile):
+    
+    """ A compilation database file that can be shared by concurrent builds -- e.g. several
+        halogen processes, all compiling into the same intermediate directory.
+        
+        Entries are appended to a journal alongside the database -- one JSON entry per line,
+        written under an advisory `fcntl` lock on a lockfile (so that holding the lock survives
+        renames). Each instance remembers how much of the journal it has read, so merging in
+        the entries written by others costs O(new entries), rather than a re-read of the lot.
+        The database file proper is then written out from the merged entries held in memory
+        -- to a temporary file alongside, which is atomically renamed into place -- such that
+        tools reading it without taking the lock (clangd et al.) never see a partial file.
+        
+        Entries unchanged from those in the journal aren’t written again -- where “unchanged”
+        disregards the output path of the command, which for a non-incremental build is some
+        transient temporary file, different each time around. Changed entries leave their
+        predecessors in the journal, superseded: when there are more superseded entries than
+        live ones, the journal is compacted, and likewise atomically renamed into place.
+        
+        N.B. on platforms without `fcntl`, writes are only serialized between the threads
+        of one process.
+    """
+    
+    fields = ('filename', 'length', 'unwritten_count', 'exists')
+    lockname = f'{CDBJsonFile.filename}{os.extsep}lock'
+    journalname = f'{CDBJsonFile.filename}{os.extsep}journal'
+    
+    def __init__(self, directory=None):
+        super(CDBJsonStream, self).__init__(directory=directory)
+        self.lockfile = self.directory.subpath(self.lockname)
+        self.journal = self.directory.subpath(self.journalname)
+        self.lockdepth = 0
+    
+    def clear(self):
+        with self.lock:
+            self.entries = {}
+            self.unwritten = {}
+            self.ondisk = None
+            self.stale = 0
+            self.offset = 0
+            self.journal_id = None
+        return self
+    
+    @property
+    def unwritten_count(self):
+        return len(self.unwritten)
+    
+    def push(self, source, command, directory=None,
+                                    destination=None):
+        super(CDBJsonStream, self).push(source, command, directory=directory,
+                                                         destination=destination)
+        with self.lock:
+            entry = self.entries[source]
+            if self.ondisk is not None and \
+               self.comparable(self.ondisk.get(source)) == self.comparable(entry):
+                self.unwritten.pop(source, None)
+            else:
+                self.unwritten[source] = entry
+    
+    @staticmethod
+    def comparable(entry):
+        """ Reduce an entry to what matters when comparing it to another -- sans the path
+            to its output (and anything named after its output, like a depfile) wherever
+            that turns up in its command.
+        """
+        if entry is None:
+            return None
+        command = entry.get('command', '')
+        output = entry.get('output')
+        if output:
+            command = command.replace(output, '').replace(os.path.splitext(output)[0] + os.extsep, '')
+        return (entry.get('directory'), entry.get('file'), command)
+    
+    @contextlib.contextmanager
+    def locked(self, shared=False):
+        """ Hold the advisory lock on the database -- exclusively, unless `shared` is True --
+            within the managed context. Reentrant within a thread, as the lock is only taken
+            by the outermost context.
+        """
+        with self.lock:
+            if fcntl is None or self.lockdepth > 0:
+                self.lockdepth += 1
+                try:
+                    yield self
+                finally:
+                    self.lockdepth -= 1
+                return
+            if not self.directory.exists:
+                self.directory.makedirs()
+            descriptor = os.open(self.lockfile, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(descriptor, shared and fcntl.LOCK_SH or fcntl.LOCK_EX)
+                self.lockdepth += 1
+                try:
+                    yield self
+                finally:
+                    self.lockdepth -= 1
+            finally:
+                # Closing the descriptor releases the lock:
+                os.close(descriptor)
+    
+    def catch_up(self):
+        """ Merge in whatever has been appended to the journal since it was last read --
+            or all of it, if it’s been compacted (and so replaced) in the meantime. Absent
+            a journal, the entries of an existing database file are taken as the baseline.
+            N.B. the caller must hold the lock, q.v. `locked()` supra.
+        """
+        try:
+            st = os.stat(self.journal)
+        except FileNotFoundError:
+            if self.ondisk is None:
+                self.ondisk = {}
+                cdblist = self.exists and self.load(self.target) or []
+                for cdbentry in cdblist:
+                    self.ondisk[cdbentry.get('file')] = dict(cdbentry)
+                self.stale = len(cdblist) - len(self.ondisk)
+                self.merge(self.ondisk)
+            return self
+        if self.ondisk is None or self.journal_id != (st.st_dev, st.st_ino) \
+                               or self.offset > st.st_size:
+            self.ondisk, self.stale, self.offset = {}, 0, 0
+        self.journal_id = (st.st_dev, st.st_ino)
+        incoming = {}
+        with open(self.journal, mode='rb') as handle:
+            handle.seek(self.offset)
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    # A partial line, from a writer that died mid-append:
+                    break
+                self.offset += len(line)
+                try:
+                    cdbentry = json.loads(line)
+                except json.JSONDecodeError as json_error:
+                    raise CDBError(f"malformed compilation database journal: {self.journal}: {json_error}")
+                source = cdbentry.get('file')
+                if source in self.ondisk:
+                    self.stale += 1
+                self.ondisk[source] = incoming[source] = cdbentry
+        self.merge(incoming)
+        return self
+    
+    def merge(self, entries):
+        """ Merge entries from disk into our own -- save those pushed but not yet written """
+        with self.lock:
+            for source, cdbentry in entries.items():
+                if source not in self.unwritten:
+                    self.entries[source] = dict(cdbentry)
+    
+    def read(self, pth=None):
+        if pth is not None and os.fspath(pth) != os.fspath(self.target):
+            return super(CDBJsonStream, self).read(pth)
+        with self.locked(shared=True):
+            self.catch_up()
+        self.read_from = self.target
+        return self
+    
+    def write(self, pth=None):
+        if pth is not None and os.fspath(pth) != os.fspath(self.target):
+            # Writing somewhere else entirely -- a snapshot of everything:
+            self.written_to = self.replace(pth, self.rollout())
+            return self
+        with self.locked():
+            with self.lock:
+                self.catch_up()
+                entries = [cdbentry for source, cdbentry in self.unwritten.items() \
+                           if self.comparable(cdbentry) != self.comparable(self.ondisk.get(source))]
+                self.unwritten.clear()
+                if not os.path.exists(self.journal):
+                    merged = dict(self.ondisk)
+                    merged.update({ cdbentry['file'] : cdbentry for cdbentry in entries })
+                    self.rewrite(merged)
+                elif entries:
+                    lines = [u8bytes(json.dumps(cdbentry)) + b"\n" for cdbentry in entries]
+                    with open(self.journal, mode='ab') as handle:
+                        handle.write(b"".join(lines))
+                    for cdbentry, line in zip(entries, lines):
+                        if cdbentry['file'] in self.ondisk:
+                            self.stale += 1
+                        self.ondisk[cdbentry['file']] = cdbentry
+                        self.offset += len(line)
+                    if self.stale > len(self.ondisk):
+                        self.rewrite(self.ondisk)
+                    else:
+                        self.replace(self.target, list(self.ondisk.values()))
+                elif not self.exists:
+                    self.replace(self.target, list(self.ondisk.values()))
+        self.written_to = self.target
+        return self
+    
+    def rewrite(self, merged):
+        """ Atomically replace the journal with one line per entry, sans superseded entries,
+            and the database file to match. N.B. the caller must hold the lock.
+        """
+        self.replace(self.target, list(merged.values()))
+        incoming = f"{self.journal}{os.extsep}{os.getpid()}{os.extsep}{threading.get_ident()}{os.extsep}tmp"
+        try:
+            with open(incoming, mode='wb') as handle:
+                for cdbentry in merged.values():
+                    handle.write(u8bytes(json.dumps(cdbentry)) + b"\n")
+            os.replace(incoming, self.journal)
+        finally:
+            if os.path.exists(incoming):
+                rm_rf(incoming)
+        st = os.stat(self.journal)
+        self.journal_id = (st.st_dev, st.st_ino)
+        self.offset = st.st_size
+        self.ondisk = dict(merged)
+        self.stale = 0
+        return self
+    
+    def compact(self):
+        """ Rewrite the journal sans superseded entries -- merging in the entries written
+            by others, and any not yet written -- and atomically rename it into place.
+        """
+        with self.locked():
+            with self.lock:
+                self.catch_up()
+                merged = dict(self.ondisk)
+                merged.update(self.unwritten)
+                self.unwritten.clear()
+                self.rewrite(merged)
+        return self
+
+CDBSubBase.register(CDBJsonStream)
+
 def test():
-    pass
+    
+    """ Run the inline tests for the halogen.compiledb module """
+    
+    if __package__ is None or __package__ == '':
+        from filesystem import TemporaryDirectory
+    else:
+        from .filesystem import TemporaryDirectory
+    
+    with TemporaryDirectory(prefix="test-compiledb-", change=False) as td:
+        
+        # Two databases, as if in two processes, sharing one file:
+        with CDBJsonStream(directory=td) as cdb:
+            cdb.push("yo.cpp", "c++ -c yo.cpp -o /tmp/yo-abc.o", destination="/tmp/yo-abc.o")
+            cdb.push("dogg.cpp", "c++ -c dogg.cpp", destination="dogg.o")
+        other = CDBJsonStream(directory=td)
+        other.push("heard.cpp", "c++ -c heard.cpp")
+        other.write()
+        
+        def journaled():
+            with open(os.path.join(td.name, CDBJsonStream.journalname), mode='r') as handle:
+                return [json.loads(line) for line in handle]
+        
+        with CDBJsonStream(directory=td) as cdb:
+            assert len(cdb) == 3
+            assert len(cdb.load()) == 3
+            assert len(journaled()) == 3
+            
+            # Unchanged entries aren’t written again -- even with a different output path:
+            cdb.push("yo.cpp", "c++ -c yo.cpp -o /tmp/yo-abc.o", destination="/tmp/yo-abc.o")
+            assert cdb.unwritten_count == 0
+            cdb.push("yo.cpp", "c++ -c yo.cpp -o /tmp/yo-xyz.o", destination="/tmp/yo-xyz.o")
+            assert cdb.unwritten_count == 0
+            
+            # ... changed ones are appended to the journal:
+            cdb.push("yo.cpp", "c++ -O3 -c yo.cpp", destination="yo.o")
+            cdb.write()
+            assert len(journaled()) == 4
+            assert journaled()[-1]['command'] == "c++ -O3 -c yo.cpp"
+            
+            # ... and the database file proper holds one entry per source:
+            assert len(cdb.load()) == 3
+        
+        # The last of several entries for one source wins:
+        assert CDBJsonFile(directory=td).read().entries["yo.cpp"]['command'] == "c++ -O3 -c yo.cpp"
+        assert CDBJsonStream(directory=td).read().entries["yo.cpp"]['command'] == "c++ -O3 -c yo.cpp"
+        
+        # Superseded entries are compacted away, once they outnumber the live ones:
+        cdb = CDBJsonStream(directory=td).read()
+        for idx in range(3):
+            cdb.push("dogg.cpp", f"c++ -O{idx} -c dogg.cpp")
+            cdb.write()
+        assert len(journaled()) == 3
+        assert cdb.stale == 0
+        
+        # Another instance catches up with the compacted journal:
+        other.push("heard.cpp", "c++ -g -c heard.cpp")
+        other.write()
+        assert other.entries["dogg.cpp"]['command'] == "c++ -O2 -c dogg.cpp"
+        assert len(other.load()) == 3
+        
+        # A compilation database written wholesale can be appended to as well:
+        plaindir = td.subdirectory("plain")
+        plaindir.makedirs()
+        plain = CDBJsonFile(directory=plaindir)
+        plain.push("yo.cpp", "c++ -c yo.cpp")
+        plain.write()
+        cdb = CDBJsonStream(directory=plain.directory)
+        cdb.push("dogg.cpp", "c++ -c dogg.cpp")
+        cdb.write()
+        assert [entry['file'] for entry in cdb.load()] == ["yo.cpp", "dogg.cpp"]
+        with open(cdb.target, mode='r') as handle:
+            assert handle.read() == CDBJsonFile.dumps(cdb.load())
+    print("* Compilation database tests completed OK")
 
 if __name__ == '__main__':
     test()
\ No newline at end of file
@@ -5,10 +5,13 @@ from __future__ import print_function
 
 import abc
 import collections
+import hashlib
+import json
 import os
 import re
 import sys
 import sysconfig
+import threading
 import typing as tx
 
 try:
@@ -22,26 +25,33 @@ from functools import wraps
 
 if __package__ is None or __package__ == '':
     import compiledb
-    from errors import ConfigurationError
-    from filesystem import back_tick, script_path
+    from errors import ConfigurationError, ExecutionError
+    from filesystem import back_tick, async_back_tick, script_path
+    from filesystem import DEFAULT_TIMEOUT
     from filesystem import Directory
     from ocd import OCDSet, OCDFrozenSet
     from utils import SimpleNamespace
-    from utils import is_string, stringify
+    from utils import is_string, memoize, stringify
     from utils import tuplize, u8bytes, u8str
 else:
     from . import compiledb
-    from .errors import ConfigurationError
-    from .filesystem import back_tick, script_path
+    from .errors import ConfigurationError, ExecutionError
+    from .filesystem import back_tick, async_back_tick, script_path
+    from .filesystem import DEFAULT_TIMEOUT
     from .filesystem import Directory
     from .ocd import OCDSet, OCDFrozenSet
     from .utils import SimpleNamespace
-    from .utils import is_string, stringify
+    from .utils import is_string, memoize, stringify
     from .utils import tuplize, u8bytes, u8str
 
 __all__ = ('SHARED_LIBRARY_SUFFIX', 'STATIC_LIBRARY_SUFFIX',
            'DEFAULT_VERBOSITY',
+           'DEFAULT_LINKER', 'FAST_LINKERS',
            'environ_override',
+           'compiler_version', 'compiler_is_clang',
+           'fast_linker', 'linker_flags',
+           'archiver_supports_thin',
+           'ProbeCache', 'probe_cache', 'probe',
            'ConfigSubBase', 'ConfigBaseMeta',
            'ConfigBase', 'Macro', 'Macros',
            'PythonConfig', 'BrewedPythonConfig',
@@ -50,8 +60,9 @@ __all__ = ('SHARED_LIBRARY_SUFFIX', 'STATIC_LIBRARY_SUFFIX',
                                      'BrewedHalideConfig',
                                      'BrewedImreadConfig',
            'ConfigUnion',
+           'PrecompiledHeaderWrap',
            'command',
-           'CC', 'CXX', 'LD', 'AR')
+           'CC', 'CXX', 'CXXBATCH', 'LD', 'AR', 'PCH')
 
 __dir__ = lambda: list(__all__)
 
@@ -113,6 +124,203 @@ def environ_override(name: str) -> str:
     return os.environ.get(name,
             sysconfig.get_config_var(name) or '')
 
+@memoize
+def compiler_version(compiler: str) -> str:
+    """ Return the version banner of a compiler command (e.g. the output of
+        `clang++ --version`) -- memoized, so each compiler is asked but once.
+    """
+    try:
+        output, errors = back_tick(f"{compiler} --version", ret_err=True)
+    except ExecutionError:
+        return u8str(compiler)
+    return output or errors or u8str(compiler)
+
+def compiler_is_clang(compiler: str) -> bool:
+    """ Does the compiler command in question invoke Clang (as opposed to e.g. GCC)? """
+    return 'clang' in compiler_version(compiler).lower()
+
+# The faster linkers to look for, in order of preference -- each along with the names
+# of the binaries that a compiler invoked with “-fuse-ld=<name>” might run:
+FAST_LINKERS: tx.Tuple[tx.Tuple[str, tx.Tuple[str, ...]], ...] = (
+    ('mold', ('mold', 'ld.mold')),
+    ('lld',  ('ld.lld', 'ld64.lld', 'lld'))
+)
+
+# Opt into a linker by setting `HALOGEN_LINKER` to its name (e.g. “lld”) or to “auto”,
+# q.v. `linker_flags(…)` sub. -- by default, the linker is whatever `LDCXXSHARED` runs:
+DEFAULT_LINKER: MaybeStr = os.environ.get('HALOGEN_LINKER', None) or None
+
+@memoize
+def fast_linker(compiler: str) -> MaybeStr:
+    """ Return the name of the fastest linker (q.v. FAST_LINKERS supra.) that is both
+        installed on the host and that the compiler command will drive, when passed
+        “-fuse-ld=<name>” -- or None, if there isn’t one. Memoized per compiler.
+    """
+    for name, binaries in FAST_LINKERS:
+        if not any(which(binary) for binary in binaries):
+            continue
+        try:
+            back_tick(f"{compiler} -fuse-ld={name} -Wl,--version", raise_err=True)
+        except (ExecutionError, OSError):
+            continue
+        return name
+    return None
+
+def linker_flags(ldcxxshared: str, linker: MaybeStr = None) -> str:
+    """ Return the flag selecting the linker for a linker-driver command, as per a linker
+        policy: None (or the empty string) for the default linker, “auto” for the fastest
+        available one (q.v. `fast_linker(…)` supra.), or the name of a specific linker.
+    """
+    if not linker:
+        return ""
+    if linker == 'auto':
+        linker = ldcxxshared.split() and fast_linker(ldcxxshared.split()[0]) or None
+        if not linker:
+            return ""
+    return f" -fuse-ld={linker}"
+
+@memoize
+def archiver_supports_thin(archiver: str) -> bool:
+    """ Can the archiver command make thin archives -- archives that reference their
+        members by path, rather than copying them in -- with the “T” modifier? GNU ar
+        and llvm-ar can; the BSD ar that ships with e.g. Mac OS X can’t. Memoized.
+    """
+    if not archiver.split():
+        return False
+    try:
+        output, errors = back_tick(f"{archiver.split()[0]} --version", ret_err=True)
+    except (ExecutionError, OSError):
+        return False
+    banner: str = f"{output} {errors}"
+    return 'GNU ar' in banner or 'LLVM' in banner
+
+class ProbeCache(object):
+    
+    """ A cache for the output of the commands that config classes run to probe the system
+        for their flags -- `pkg-config`, `brew`, `python-config` and the like.
+        
+        Outputs are always memoized in-process. They can also be persisted to a JSON file
+        (by passing its path as `filename`, or calling `persist(…)`) so that new processes
+        needn’t re-probe anything. Each output is stored along with a fingerprint of what
+        might change it: the values of the environment variables named in `environment`,
+        and the path and modification time of the probing tool itself -- when these no
+        longer match, the command is re-run. Anything else (e.g. upgrading a package) calls
+        for an explicit `clear()`. Instances are safe to share between threads.
+    """
+    
+    fields = ('filename', 'length', 'exists')
+    
+    # The environment variables that may affect the output of a probe:
+    environment: tx.ClassVar[tx.Tuple[str, ...]] = ('PATH', 'PKG_CONFIG_PATH',
+                                                            'PKG_CONFIG_LIBDIR',
+                                                            'PKG_CONFIG_SYSROOT_DIR',
+                                                            'HOMEBREW_PREFIX',
+                                                            'HOMEBREW_CELLAR',
+                                                            'PYTHONHOME',
+                                                            'CC', 'CXX',
+                                                            'CFLAGS', 'CXXFLAGS',
+                                                            'LDFLAGS')
+    
+    def __init__(self, filename: MaybeStr = None):
+        self.filename: MaybeStr = filename and os.fspath(filename) or None
+        self.lock = threading.RLock()
+        self.entries: tx.Dict[str, tx.Dict[str, str]] = {}
+        if self.exists:
+            self.read()
+    
+    @property
+    def exists(self) -> bool:
+        return bool(self.filename) and os.path.isfile(self.filename) # type: ignore
+    
+    @property
+    def length(self) -> int:
+        return len(self.entries)
+    
+    def __len__(self) -> int:
+        return self.length
+    
+    def fingerprint(self, command: str) -> str:
+        """ Compute the fingerprint of the circumstances under which a command runs """
+        hasher = hashlib.sha256()
+        for name in self.environment:
+            hasher.update(u8bytes(f"{name}={os.environ.get(name, '')}\0"))
+        tool: str = command.split()[0] if command.split() else ''
+        if tool and not os.path.isabs(tool):
+            tool = which(tool)
+        try:
+            hasher.update(u8bytes(f"{tool}:{os.stat(tool).st_mtime_ns}"))
+        except (OSError, ValueError):
+            hasher.update(u8bytes(tool))
+        return hasher.hexdigest()
+    
+    def probe(self, command: str) -> str:
+        """ Return the output of a probing command, running it only as necessary """
+        fingerprint: str = self.fingerprint(command)
+        with self.lock:
+            entry = self.entries.get(command)
+        if entry is not None and entry.get('fingerprint') == fingerprint:
+            return entry['output']
+        output: str = back_tick(command)
+        with self.lock:
+            self.entries[command] = dict(fingerprint=fingerprint, output=output)
+        if self.filename:
+            self.write()
+        return output
+    
+    def persist(self, filename: str) -> "ProbeCache":
+        """ Persist probe outputs to (and read any previously persisted outputs from) a file """
+        with self.lock:
+            self.filename = os.fspath(filename)
+            if self.exists:
+                self.read()
+        return self
+    
+    def clear(self) -> "ProbeCache":
+        """ Forget all probe outputs -- in memory, and on disk (if persisted) """
+        with self.lock:
+            self.entries.clear()
+            if self.exists:
+                os.unlink(self.filename) # type: ignore
+        return self
+    
+    def read(self) -> "ProbeCache":
+        try:
+            with open(self.filename, mode='r') as handle: # type: ignore
+                entries = json.load(handle)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return self
+        if isinstance(entries, dict):
+            with self.lock:
+                self.entries.update(entries)
+        return self
+    
+    def write(self) -> "ProbeCache":
+        # Write to a temporary file alongside, then atomically rename:
+        with self.lock:
+            directory: str = os.path.dirname(os.path.abspath(self.filename)) # type: ignore
+            os.makedirs(directory, exist_ok=True)
+            incoming: str = f"{self.filename}{os.extsep}{os.getpid()}{os.extsep}tmp"
+            with open(incoming, mode='w') as handle:
+                json.dump(self.entries, handle, indent=4, sort_keys=True)
+            os.replace(incoming, self.filename) # type: ignore
+        return self
+    
+    def __repr__(self) -> str:
+        return stringify(self, type(self).fields)
+    
+    def __str__(self) -> str:
+        return stringify(self, type(self).fields)
+
+# The probe cache used by all config classes -- persisted to the file named
+# by the `HALOGEN_CONFIG_CACHE` environment variable, if it is set:
+probe_cache: ProbeCache = ProbeCache(filename=os.environ.get('HALOGEN_CONFIG_CACHE', None))
+
+def probe(command: str) -> str:
+    """ Run a command that probes the system for configuration flags, returning
+        its output -- by way of the probe cache, q.v. ProbeCache supra.
+    """
+    return probe_cache.probe(command)
+
 class ConfigSubBase(abc.ABC, metaclass=abc.ABCMeta):
     
     """ The abstract base class ancestor of all Config-ish classes we define here.
@@ -185,7 +393,7 @@ class ConfigSubBase(abc.ABC, metaclass=abc.ABCMeta):
         """ Return the path to a subdirectory within this Config instances’ prefix """
         return self.prefix.subpath(subdir, whence, requisite=True)
     
-    # These four methods prepare the command strings,
+    # These methods prepare the command strings,
     # using the result(s) from calling one or more
     # of the get_* methods (q.v. prototypes sub.)
     # to compose their arguments:
@@ -195,21 +403,49 @@ class ConfigSubBase(abc.ABC, metaclass=abc.ABCMeta):
         cflags: str = self.get_cflags().strip()
         return           f"{environ_override('CC')} {cflags} -c {infile} -o {outfile}"
     
-    def cxx_flag_string(self, outfile: str, infile: str) -> str:
-        """ Get the string template for the C++ compiler command """
+    def cxx_flag_string(self, outfile: str, infile: str, depfile: MaybeStr = None) -> str:
+        """ Get the string template for the C++ compiler command -- optionally
+            asking the compiler to write out a Make-style dependency file
+        """
         cflags: str = self.get_cflags().strip()
-        return          f"{environ_override('CXX')} {cflags} -c {infile} -o {outfile}"
+        depflags: str = depfile and f" -MD -MF {depfile}" or ""
+        return          f"{environ_override('CXX')} {cflags} -c {infile} -o {outfile}{depflags}"
     
-    def ld_flag_string(self, outfile: str, *infiles) -> str:
-        """ Get the string template for the dynamic linker command """
+    def cxx_batch_flag_string(self, *infiles, depfiles: bool = False) -> str:
+        """ Get the string template for the C++ compiler command compiling several sources
+            at once -- writing each object file (and optionally, each Make-style dependency
+            file) to the working directory, named for its source, e.g. “yodogg.o”
+        """
+        allinfiles: str = " ".join(infiles)
+        cflags: str = self.get_cflags().strip()
+        depflags: str = depfiles and " -MD" or ""
+        return          f"{environ_override('CXX')} {cflags} -c {allinfiles.strip()}{depflags}"
+    
+    def cxx_preprocessor_flag_string(self, infile: str) -> str:
+        """ Get the string template for the C++ preprocessor command """
+        cflags: str = self.get_cflags().strip()
+        return          f"{environ_override('CXX')} {cflags} -E {infile}"
+    
+    def pch_flag_string(self, outfile: str, header: str) -> str:
+        """ Get the string template for the C++ precompiled-header compiler command """
+        cflags: str = self.get_cflags().strip()
+        return          f"{environ_override('CXX')} {cflags} -x c++-header {header} -o {outfile}"
+    
+    def ld_flag_string(self, outfile: str, *infiles, linker: MaybeStr = None) -> str:
+        """ Get the string template for the dynamic linker command -- optionally
+            selecting a linker, as per `linker_flags(…)`, q.v. supra.
+        """
         allinfiles: str = " ".join(infiles)
         ldflags: str = self.get_ldflags().strip()
-        return  f"{environ_override('LDCXXSHARED')} {ldflags} {allinfiles.strip()} -o {outfile}"
+        ldcxxshared: str = environ_override('LDCXXSHARED')
+        fuseflags: str = linker_flags(ldcxxshared, linker)
+        return  f"{ldcxxshared}{fuseflags} {ldflags} {allinfiles.strip()} -o {outfile}"
     
     @staticmethod
-    def ar_flag_string(outfile: str, *infiles) -> str:
+    def ar_flag_string(outfile: str, *infiles, thin: bool = False) -> str:
         """ Get the string template for the command executing the archiver
-            (née the “static linker”)
+            (née the “static linker”) -- optionally making a thin archive,
+            if the archiver supports it (q.v. `archiver_supports_thin(…)` supra.)
         """
         # This function is the ugly duckling here because:
         #   a) it does not use the `self` Config-class arg at all, and
@@ -220,6 +456,8 @@ class ConfigSubBase(abc.ABC, metaclass=abc.ABCMeta):
         arflags: str = environ_override('ARFLAGS')
         if 's' not in arflags:
             arflags += 's'
+        if thin and 'T' not in arflags and archiver_supports_thin(environ_override('AR')):
+            arflags += 'T'
         return           f"{environ_override('AR')} {arflags} {outfile} {allinfiles.strip()}"
     
     # Stringification and representation methods:
@@ -325,14 +563,41 @@ class FieldList(object):
         raise AttributeError("Can't delete a FieldList attribute")
 
 
+# The names of the flag-getter methods that Config-ish classes must furnish:
+flag_getters: tx.Tuple[str, ...] = ('get_includes', 'get_libs',
+                                    'get_cflags',   'get_ldflags')
+
+def memoized_getter(getter):
+    """ Memoize a flag-getter method per-instance, in the instances’ “flag_cache” dict --
+        keyed by the getters’ qualified name, so overridden getters calling up to their
+        ancestors’ implementations don’t trample one another. Cached values are cleared
+        by `ConfigBase.invalidate()` (q.v. class definition sub.)
+    """
+    if hasattr(getter, '__memoized__'):
+        return getter
+    key: str = getter.__qualname__
+    @wraps(getter)
+    def memoized(self) -> str:
+        cache: tx.Dict[str, str] = self.__dict__.setdefault('flag_cache', {})
+        if key not in cache:
+            cache[key] = getter(self)
+        return cache[key]
+    memoized.__memoized__ = True
+    return memoized
+
 class ConfigBaseMeta(abc.ABCMeta):
     
     """ The metaclass for all Config-ish classes we define here; used with
-        ConfigBase (q.v. class definition sub.)
+        ConfigBase (q.v. class definition sub.) -- which, amongst other things,
+        memoizes the flag-getter methods of its classes, q.v. `memoized_getter(…)` supra.
     """
     
     def __new__(metacls, name, bases, attributes, **kwargs) -> type:
         attributes['FieldList'] = FieldList
+        for getter_name in flag_getters:
+            if callable(attributes.get(getter_name, None)) and \
+                not getattr(attributes[getter_name], '__isabstractmethod__', False):
+                attributes[getter_name] = memoized_getter(attributes[getter_name])
         if not 'base_fields' in attributes:
             attributes['base_fields'] = tuple()
         base_fields: OCDSet[str] = OCDSet(attributes['base_fields'])
@@ -387,6 +652,11 @@ class ConfigBase(ConfigSubBase, metaclass=ConfigBaseMeta):
             field_list: tx.Iterable[str] = getattr(type(self), 'fields', tuple())
         return stringify(self, field_list)
     
+    def invalidate(self) -> "ConfigBase":
+        """ Clear the memoized values of all of the instances’ flag getters """
+        self.__dict__.pop('flag_cache', None)
+        return self
+    
     def __repr__(self) -> str:
         return stringify(self, getattr(type(self), 'fields', tuple()))
     
@@ -411,6 +681,12 @@ class SetWrap(ConfigBase):
     def sub_config_type(self) -> str:
         return self.config.name
     
+    def invalidate(self) -> "SetWrap":
+        """ Clear the memoized flags of both the wrapper and the wrapped config """
+        if hasattr(self.config, 'invalidate'):
+            self.config.invalidate()
+        return super(SetWrap, self).invalidate() # type: ignore
+    
     @property
     def name(self) -> str:
         """ The name of the Config instance. In this case, it is the typename
@@ -453,6 +729,53 @@ class SetWrap(ConfigBase):
         ldflags: str = self.get_ldflags()
         return { flag.strip() for flag in f" {ldflags}".split(TOKEN) if len(flag.strip()) } # type: ignore
 
+class PrecompiledHeaderWrap(SetWrap):
+    
+    """ A config wrapper that amends the C++ compiler commands of the config it wraps,
+        such that every translation unit is compiled against a precompiled header --
+        q.v. halogen.compile.PrecompiledHeader, which builds the header in question
+        and furnishes one of these as its `config` property.
+        
+        With Clang, the precompiled header is used directly, via “-include-pch”; with
+        GCC, a stub header is force-included, via “-include”, and GCC itself picks up
+        the precompiled “.gch” file sitting next to the stub.
+    """
+    
+    fields = FieldList('sub_config_type', 'header',
+                                          'pch',
+                                          'pch_flags', exclude=['prefix', 'config'],
+                                                       dir_fields=False)
+    
+    def __init__(self, config: ConfigType, header: str,
+                                           pch: str,
+                                           clang: bool = True):
+        super(PrecompiledHeaderWrap, self).__init__(config)
+        self.header: str = os.fspath(header)
+        self.pch: str = os.fspath(pch)
+        self.clang: bool = bool(clang)
+    
+    def pch_flags(self) -> str:
+        """ The compiler flags that make use of the precompiled header """
+        if self.clang:
+            return f"-include-pch {self.pch}"
+        return f"-include {self.header}"
+    
+    def cxx_flag_string(self, outfile: str, infile: str, depfile: MaybeStr = None) -> str:
+        """ Get the string template for the C++ compiler command -- including the
+            flags for the use of the precompiled header
+        """
+        command: str = super(PrecompiledHeaderWrap, self).cxx_flag_string(outfile, infile,
+                                                                          depfile=depfile)
+        return f"{command} {self.pch_flags()}"
+    
+    def cxx_batch_flag_string(self, *infiles, depfiles: bool = False) -> str:
+        """ Get the string template for the batched C++ compiler command -- including
+            the flags for the use of the precompiled header
+        """
+        command: str = super(PrecompiledHeaderWrap, self).cxx_batch_flag_string(*infiles,
+                                                                                depfiles=depfiles)
+        return f"{command} {self.pch_flags()}"
+
 MacroTuple = tx.Tuple[str, str]
 
 class Macro(object):
@@ -707,16 +1030,16 @@ class PythonConfig(ConfigBase):
                             self.python_version, 'Resources')
     
     def get_includes(self) -> str:
-        return back_tick(f"{self.pyconfigpath} --includes")
+        return probe(f"{self.pyconfigpath} --includes")
     
     def get_libs(self) -> str:
-        return back_tick(f"{self.pyconfigpath} --libs")
+        return probe(f"{self.pyconfigpath} --libs")
     
     def get_cflags(self) -> str:
-        return back_tick(f"{self.pyconfigpath} --cflags")
+        return probe(f"{self.pyconfigpath} --cflags")
     
     def get_ldflags(self) -> str:
-        return back_tick(f"{self.pyconfigpath} --ldflags")
+        return probe(f"{self.pyconfigpath} --ldflags")
 
 
 class BrewedPythonConfig(PythonConfig):
@@ -739,7 +1062,7 @@ class BrewedPythonConfig(PythonConfig):
         if not brew_name:
             brew_name = 'python'
         self.brew_name: str = brew_name
-        prefix: str = back_tick(f"{self.brew} --prefix {self.brew_name}")
+        prefix: str = probe(f"{self.brew} --prefix {self.brew_name}")
         super(BrewedPythonConfig, self).__init__(prefix=prefix)
     
     def include(self) -> MaybeStr:
@@ -899,7 +1222,7 @@ class PkgConfig(ConfigBase):
             from errors import ExecutionError
             script: str = which('all-pkgconfig-packages.sh', pathvar=script_path())
             try:
-                cls.packages |= OCDFrozenSet(back_tick(script).split('\n'))
+                cls.packages |= OCDFrozenSet(probe(script).split('\n'))
             except ExecutionError:
                 cls.did_load_packages = False
             else:
@@ -924,7 +1247,7 @@ class PkgConfig(ConfigBase):
             pkg_name = 'python3'
         self.pkg_name: str = pkg_name
         self.add_package(pkg_name)
-        self.prefix = back_tick(f"{self.pkgconfig} {self.pkg_name} --variable=prefix")
+        self.prefix = probe(f"{self.pkgconfig} {self.pkg_name} --variable=prefix")
     
     def bin(self) -> MaybeStr:
         return self.subdirectory("bin")
@@ -953,18 +1276,18 @@ class PkgConfig(ConfigBase):
         return f"{type(self).__name__}(pkg_name=“{self.pkg_name}”)"
     
     def get_includes(self) -> str:
-        return back_tick(f"{self.pkgconfig} {self.pkg_name} --cflags-only-I")
+        return probe(f"{self.pkgconfig} {self.pkg_name} --cflags-only-I")
     
     def get_libs(self) -> str:
-        return back_tick(f"{self.pkgconfig} {self.pkg_name} --libs-only-l --libs-only-other --static")
+        return probe(f"{self.pkgconfig} {self.pkg_name} --libs-only-l --libs-only-other --static")
     
     def get_cflags(self) -> str:
         global TOKEN
-        pc_cflags = back_tick(f"{self.pkgconfig} {self.pkg_name} --cflags")
+        pc_cflags = probe(f"{self.pkgconfig} {self.pkg_name} --cflags")
         return f"{TOKEN}{TOKEN.join(self.cflags)} {pc_cflags}".strip() # type: ignore
     
     def get_ldflags(self) -> str:
-        return back_tick(f"{self.pkgconfig} {self.pkg_name} --libs --static")
+        return probe(f"{self.pkgconfig} {self.pkg_name} --libs --static")
 
 
 class NumpyConfig(ConfigBase):
@@ -1063,7 +1386,7 @@ class BrewedConfig(ConfigBase):
         if not brew_name:
             brew_name = 'halide'
         self.brew_name: str = brew_name
-        self.prefix = back_tick(f"{self.brew} --prefix {self.brew_name}")
+        self.prefix = probe(f"{self.brew} --prefix {self.brew_name}")
     
     def bin(self) -> MaybeStr:
         return self.subdirectory("bin")
@@ -1162,7 +1485,7 @@ class BrewedImreadConfig(BrewedConfig):
         """ Complete override of BrewedConfig’s __init__ method: """
         if self.imread_config is None:
             self.imread_config = which('imread-config')
-        self.prefix = back_tick(f"{self.imread_config} --prefix")
+        self.prefix = probe(f"{self.imread_config} --prefix")
     
     @property
     def name(self) -> str:
@@ -1170,16 +1493,16 @@ class BrewedImreadConfig(BrewedConfig):
         return type(self).__name__
     
     def get_includes(self) -> str:
-        return back_tick(f"{self.imread_config} --includes")
+        return probe(f"{self.imread_config} --includes")
     
     def get_libs(self) -> str:
-        return back_tick(f"{self.imread_config} --libs")
+        return probe(f"{self.imread_config} --libs")
     
     def get_cflags(self) -> str:
-        return back_tick(f"{self.imread_config} --cflags")
+        return probe(f"{self.imread_config} --cflags")
     
     def get_ldflags(self) -> str:
-        return back_tick(f"{self.imread_config} --ldflags")
+        return probe(f"{self.imread_config} --ldflags")
 
 
 class ConfigUnion(ConfigBase, tx.Collection[ConfigType]):
@@ -1409,6 +1732,13 @@ class ConfigUnion(ConfigBase, tx.Collection[ConfigType]):
         """ Access one of the ConfigUnion instances’ sub-configs via subscript """
         return self.configs[key] # type: ignore
     
+    def invalidate(self) -> "ConfigUnion":
+        """ Clear the memoized flags of both the union and all of its sub-configs """
+        for config in self.configs: # type: ignore
+            if hasattr(config, 'invalidate'):
+                config.invalidate()
+        return super(ConfigUnion, self).invalidate() # type: ignore
+    
     def sub_config_types(self) -> OCDFrozenSet[str]:
         """ Retrieve a set of the names of this ConfigUnion instances’ sub-configs """
         return OCDFrozenSet( config.name for config in self.configs ) # type: ignore
@@ -1471,11 +1801,41 @@ CommandFuncType = tx.Union[CommandType, VariadicCommandType]
 WrappedCommandFuncType = tx.Callable[..., tx.Tuple[str, ...]]
 
 def command(func: CommandFuncType) -> WrappedCommandFuncType:
+    """ Decorate a function returning a command string, such that calling it will execute
+        the command, returning its (stdout, stderr) output -- the decorated function also
+        gets a `run_async(…)` attribute, which returns a coroutine that will execute the
+        command asynchronously (via `halogen.filesystem.async_back_tick(…)`), q.v. sub.
+        
+        Both accept a `timeout` keyword, in seconds (None for no timeout at all) -- and
+        `run_async(…)` also accepts an `on_stderr` callback, for streaming error output.
+    """
     @wraps(func)
     def command_function(*args, **kwargs) -> tx.Tuple[str, ...]:
+        # N.B. the “directory” keyword is passed along to both the wrapped
+        # function (for the compilation database) and to `back_tick(…)`,
+        # which will use it as the working directory for the subprocess --
+        # this is thread-safe, unlike calling `os.chdir(…)` via halogen.filesystem.cd:
+        timeout = kwargs.pop('timeout', DEFAULT_TIMEOUT)
         return back_tick(func(*args, **kwargs),
                          ret_err=True,
+                         timeout=timeout,
+                         directory=kwargs.get('directory', None),
                          verbose=kwargs.pop('verbose', DEFAULT_VERBOSITY))
+    
+    def run_async(*args, **kwargs) -> tx.Awaitable[tx.Tuple[str, ...]]:
+        # N.B. the command string is assembled (and any compilation database
+        # entry is pushed) synchronously, when `run_async(…)` is called --
+        # only the execution of the command itself is deferred:
+        timeout = kwargs.pop('timeout', DEFAULT_TIMEOUT)
+        on_stderr = kwargs.pop('on_stderr', None)
+        return async_back_tick(func(*args, **kwargs),
+                               ret_err=True,
+                               timeout=timeout,
+                               on_stderr=on_stderr,
+                               directory=kwargs.get('directory', None),
+                               verbose=kwargs.pop('verbose', DEFAULT_VERBOSITY))
+    
+    command_function.run_async = run_async
     return command_function
 
 @command
@@ -1502,21 +1862,44 @@ def CXX(conf: ConfigType,
         falling back to the compiler specified in Python `sysconfig`:
     """
     cdb: tx.Optional[compiledb.CDBSubBase] = kwargs.pop('cdb', None)
-    command: str = conf.cxx_flag_string(outfile, infile)
+    command: str = conf.cxx_flag_string(outfile, infile, depfile=kwargs.pop('depfile', None))
     if isinstance(cdb, compiledb.CDBSubBase):
         cdb.push(infile, command, directory=kwargs.pop('directory', None),
                                   destination=outfile)
     return command
 
+@command
+def CXXBATCH(conf: ConfigType,
+            *infiles,
+           **kwargs) -> str:
+    """ Execute the C++ compiler, as named in the `CXX` environment variable, on several
+        sources at once -- pass the directory to which the object files are to be written
+        as `directory`, and `depfiles=True` for dependency files. The compilation database
+        (if any) gets a per-source command for each, writing to the same object file.
+    """
+    cdb: tx.Optional[compiledb.CDBSubBase] = kwargs.pop('cdb', None)
+    directory: MaybeStr = kwargs.pop('directory', None)
+    depfiles: bool = bool(kwargs.pop('depfiles', False))
+    if isinstance(cdb, compiledb.CDBSubBase):
+        for infile in infiles:
+            outfile: str = os.path.join(directory or os.getcwd(),
+                                        f"{os.path.splitext(os.path.basename(infile))[0]}{os.extsep}o")
+            depfile: MaybeStr = depfiles and f"{os.path.splitext(outfile)[0]}{os.extsep}d" or None
+            cdb.push(infile, conf.cxx_flag_string(outfile, infile, depfile=depfile),
+                             directory=directory,
+                             destination=outfile)
+    return conf.cxx_batch_flag_string(*infiles, depfiles=depfiles)
+
 @command
 def LD(conf: ConfigType,
        outfile: str,
       *infiles,
      **kwargs) -> str:
     """ Execute the dynamic linker, as named in the `LDCXXSHARED` environment variable,
-        falling back to the linker specified in Python `sysconfig`:
+        falling back to the linker specified in Python `sysconfig` -- pass `linker` to
+        select a linker, as per `linker_flags(…)`, q.v. supra.:
     """
-    return conf.ld_flag_string(outfile, *infiles)
+    return conf.ld_flag_string(outfile, *infiles, linker=kwargs.pop('linker', None))
 
 @command
 def AR(conf: ConfigType,
@@ -1524,9 +1907,20 @@ def AR(conf: ConfigType,
       *infiles,
      **kwargs) -> str:
     """ Execute the library archiver, as named in the `AR` environment variable,
-        falling back to the library archiver specified in Python `sysconfig`:
+        falling back to the library archiver specified in Python `sysconfig` -- pass
+        `thin=True` for a thin archive, q.v. `archiver_supports_thin(…)` supra.:
+    """
+    return conf.ar_flag_string(outfile, *infiles, thin=kwargs.pop('thin', False))
+
+@command
+def PCH(conf: ConfigType,
+        outfile: str,
+        header: str,
+      **kwargs) -> str:
+    """ Execute the C++ compiler, as named in the `CXX` environment variable,
+        to precompile a header file:
     """
-    return conf.ar_flag_string(outfile, *infiles)
+    return conf.pch_flag_string(outfile, header)
 
 
 # modulize({
@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+#
+#       daemon.py
+#
+#       Keep generator libraries preloaded, and serve generate
+#       requests over a local socket (q.v. halogen.client)
+#
+"""
+Usage:
+  daemon.py [LIBRARY...]  [-s SOCKET | --socket=SOCKET]
+                          [-V | --verbose]
+  daemon.py -h | --help
+
+Options:
+  -s SOCKET, --socket=SOCKET        specify the socket path to listen on.
+  -V, --verbose                     print verbose output.
+  -h, --help                        show this text.
+
+"""
+from __future__ import print_function
+
+import os
+import socketserver
+import sys
+import threading
+import time
+
+if __package__ is None or __package__ == '':
+    from client import DEFAULT_SOCKET, encode_message, decode_message, GeneratorClient
+    from errors import DaemonError, HalogenError
+    from generate import ModuleMetadata, output_names
+    from utils import u8str
+else:
+    from .client import DEFAULT_SOCKET, encode_message, decode_message, GeneratorClient
+    from .errors import DaemonError, HalogenError
+    from .generate import ModuleMetadata, output_names
+    from .utils import u8str
+
+__all__ = ('GENERATE_ARGUMENTS',
+           'GeneratorDaemon')
+
+__dir__ = lambda: list(__all__)
+
+# The keyword arguments to halogen.generate.generate(…) that a request may pass along:
+GENERATE_ARGUMENTS = frozenset(('output_directory', 'target', 'emit',
+                                'substitutions', 'params',
+                                'multitarget', 'cache'))
+
+class RequestHandler(socketserver.StreamRequestHandler):
+
+    """ Handle the requests made over one client connection, one line of JSON at a time """
+    
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            op = None
+            try:
+                request = decode_message(line)
+                op = request.get('op')
+                result = self.server.dispatch(request)
+            except Exception as exc:
+                response = dict(ok=False, error=f"{type(exc).__name__}: {exc}")
+            else:
+                response = dict(ok=True, result=result)
+            try:
+                self.wfile.write(encode_message(response))
+                self.wfile.flush()
+            except OSError:
+                return
+            if response['ok'] and op == 'shutdown':
+                # N.B. shutdown() blocks until serve_forever() returns --
+                # so it must be called from some other thread than that one:
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+class GeneratorDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+
+    """ A long-lived server process that keeps generator libraries preloaded -- and so
+        keeps libHalide, LLVM and the Halide generator registry warm -- and runs generators
+        on behalf of clients (q.v. halogen.client.GeneratorClient) connecting over a Unix
+        domain socket. This saves each build step the cost of starting Python, importing
+        halogen.api, loading libHalide, preloading libraries and enumerating generators.
+        
+        Each connection is handled in its own thread, and requests are JSON messages, one
+        per line -- q.v. the `op_*` methods sub. for the operations. Generation requests
+        are run one at a time, in the daemon process itself, as the Halide generator
+        machinery isn’t thread-safe.
+        
+        As in:
+            
+            with GeneratorDaemon(libraries=(library,)) as daemon:
+                daemon.serve_forever()
+    """
+    
+    daemon_threads = True
+    
+    def __init__(self, socket_path=None, libraries=(), verbose=False):
+        self.socket_path = os.fspath(socket_path or DEFAULT_SOCKET)
+        self.verbose = bool(verbose)
+        self.started = time.time()
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.generation_lock = threading.Lock()
+        self.remove_stale_socket()
+        super(GeneratorDaemon, self).__init__(self.socket_path, RequestHandler)
+        os.chmod(self.socket_path, 0o600)
+        self.preload(*libraries)
+    
+    def remove_stale_socket(self):
+        """ Remove a socket file left behind by a daemon that is no longer running --
+            raising DaemonError if the daemon is, in fact, still running.
+        """
+        if not os.path.exists(self.socket_path):
+            return
+        try:
+            with GeneratorClient(socket_path=self.socket_path, timeout=1) as client:
+                client.ping()
+        except DaemonError:
+            os.unlink(self.socket_path)
+        else:
+            raise DaemonError(f"a halogen daemon is already listening at {self.socket_path}")
+    
+    def preload(self, *libraries):
+        """ Preload generator libraries, returning the names of all registered generators """
+        if __package__ is None or __package__ == '':
+            import api # type: ignore
+            from generate import preload
+        else:
+            from . import api # type: ignore
+            from .generate import preload
+        with self.generation_lock:
+            for library in libraries:
+                preload(os.fspath(library), verbose=self.verbose)
+            return sorted(api.registry_snapshot())
+    
+    def dispatch(self, request):
+        """ Call the `op_*` method named by the request, with the rest of the request as arguments """
+        op = u8str(request.pop('op', ''))
+        method = getattr(self, f"op_{op}", None)
+        if method is None:
+            raise DaemonError(f"unknown daemon operation: “{op}”")
+        with self.lock:
+            self.requests += 1
+        started = time.perf_counter()
+        result = method(**request)
+        if self.verbose:
+            print(f"daemon: {op} ({time.perf_counter() - started:.3f}s)")
+        return result
+    
+    def op_ping(self):
+        """ Report on the daemon -- its process ID, uptime, request count and libraries """
+        if __package__ is None or __package__ == '':
+            from generate import preload
+        else:
+            from .generate import preload
+        return dict(pid=os.getpid(), uptime=time.time() - self.started,
+                                     requests=self.requests,
+                                     libraries=sorted(getattr(preload, 'loaded_libraries', {}).keys()))
+    
+    def op_preload(self, libraries=()):
+        """ Preload generator libraries, returning the names of all registered generators """
+        return self.preload(*libraries)
+    
+    def op_generators(self):
+        """ Return the names of all registered generators """
+        if __package__ is None or __package__ == '':
+            import api # type: ignore
+        else:
+            from . import api # type: ignore
+        return sorted(api.registry_snapshot())
+    
+    def op_generate(self, generators=(), **arguments):
+        """ Run generators with halogen.generate.generate(…), returning a dict of the
+            resulting “artifacts” -- one dict per output module, with its base path,
+            the paths to its outputs, and its name, target and metadata -- and of the
+            “errors” raised by individual generators, if any.
+        """
+        if __package__ is None or __package__ == '':
+            from generate import generate
+        else:
+            from .generate import generate
+        unknown = set(arguments) - GENERATE_ARGUMENTS
+        if len(unknown) > 0:
+            raise DaemonError(f"unknown generate arguments: {', '.join(sorted(unknown))}")
+        if 'output_directory' not in arguments:
+            raise DaemonError("generate requests require an output directory")
+        errors = {}
+        with self.generation_lock:
+            artifacts = generate(*generators, errors=errors,
+                                              verbose=self.verbose, **arguments)
+        out = []
+        for base_path, outputs, module in artifacts:
+            metadata = ModuleMetadata.from_module(module)
+            out.append(dict(base_path=u8str(base_path),
+                            outputs={ name : getattr(outputs, name) for name in output_names \
+                                                                    if getattr(outputs, name) },
+                            name=metadata.name,
+                            target=metadata.target,
+                            metadata=metadata.metadata))
+        return dict(artifacts=out,
+                    errors={ label : f"{type(exc).__name__}: {exc}" for label, exc in errors.items() })
+    
+    def op_shutdown(self):
+        """ Stop serving, once the response has been sent """
+        return True
+    
+    def server_close(self):
+        super(GeneratorDaemon, self).server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def main(argv=None):
+    from docopt import docopt # type: ignore
+    arguments = docopt(__doc__, argv=(argv or sys.argv)[1:], help=True)
+    verbose = bool(arguments.get('--verbose'))
+    try:
+        daemon = GeneratorDaemon(socket_path=arguments.get('--socket'),
+                                 libraries=arguments.get('LIBRARY'),
+                                 verbose=verbose)
+    except HalogenError as exc:
+        print(str(exc), file=sys.stderr)
+        return 1
+    with daemon:
+        if verbose:
+            print(f"daemon: listening at {daemon.socket_path}")
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+def test():
+
+    """ Run the inline tests for the halogen.daemon module """
+    
+    if __package__ is None or __package__ == '':
+        from filesystem import TemporaryDirectory
+    else:
+        from .filesystem import TemporaryDirectory
+    
+    with TemporaryDirectory(prefix="test-daemon-", change=False) as td:
+        socket_path = td.subpath(f"daemon{os.extsep}sock")
+        daemon = GeneratorDaemon(socket_path=socket_path)
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        thread.start()
+        
+        with GeneratorClient(socket_path=socket_path) as client:
+            assert client.ping()['pid'] == os.getpid()
+            assert isinstance(client.generators(), list)
+            try:
+                client.request('i_heard_you_like_daemons')
+            except DaemonError:
+                pass
+            else:
+                assert False, "unknown operation didn’t raise"
+            try:
+                client.generate("yodogg", emit=['h'], output_directory=td.name)
+            except DaemonError:
+                pass
+            else:
+                assert False, "unknown generator didn’t raise"
+            assert client.ping()['requests'] == 4
+            assert client.shutdown()
+        
+        thread.join(timeout=10)
+        assert not thread.is_alive()
+        daemon.server_close()
+        assert not os.path.exists(socket_path)
+        
+        # A fresh daemon can’t be started while another is listening on the socket:
+        daemon = GeneratorDaemon(socket_path=socket_path)
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        thread.start()
+        try:
+            GeneratorDaemon(socket_path=socket_path)
+        except DaemonError:
+            pass
+        else:
+            assert False, "second daemon didn’t raise"
+        daemon.shutdown()
+        daemon.server_close()
+    print("* Daemon tests completed OK")
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--test':
+        test()
+    else:
+        sys.exit(main())
@@ -7,7 +7,10 @@ __all__ = ('HalogenError',
            'ExecutionError', 'FilesystemError',
            'ConfigurationError', 'ConfigCommandError',
            'GeneratorError', 'GeneratorLoaderError', 'GenerationError',
-           'CDBError')
+                                                     'ExtensionError',
+           'CDBError', 'CacheError', 'ManifestError',
+           'DaemonError', 'BuildFileError',
+           'GeneratorIndexError')
 
 __dir__ = lambda: list(__all__)
 
@@ -51,6 +54,36 @@ class GenerationError(GeneratorError):
     pass
 
 
+class ExtensionError(GeneratorError):
+    """ An error while building or importing a Python extension from generator outputs """
+    pass
+
+
 class CDBError(HalogenError):
     """ A problem with a compilation database """
+    pass
+
+
+class CacheError(HalogenError):
+    """ A problem with a build-artifact cache """
+    pass
+
+
+class ManifestError(HalogenError):
+    """ A problem with an incremental-build manifest """
+    pass
+
+
+class DaemonError(HalogenError):
+    """ A problem with the generator daemon, or with a request made of it """
+    pass
+
+
+class BuildFileError(HalogenError):
+    """ A problem with a build plan, or with writing it out as a build file """
+    pass
+
+
+class GeneratorIndexError(HalogenError):
+    """ A problem with the index of which generator libraries register which generators """
     pass
\ No newline at end of file
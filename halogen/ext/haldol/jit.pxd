@@ -0,0 +1,17 @@
+from libcpp.string cimport string
+from libcpp.vector cimport vector
+
+from ..halide.argument cimport Argument
+from ..halide.module cimport stringmap_t
+from ..halide.target cimport Target
+
+ctypedef vector[Argument]       argvec_t
+ctypedef vector[const void*]    argv_t
+
+cdef extern from "haldol/include/jit.hh" namespace "jit" nogil:
+    
+    cppclass callable "jit::callable":
+        callable(string&, stringmap_t&, Target&) except +
+        string& name()
+        argvec_t& arguments()
+        int call(argv_t&)
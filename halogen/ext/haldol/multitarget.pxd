@@ -0,0 +1,13 @@
+from libcpp.string cimport string
+
+from ..halide.module cimport ModuleProducer, targetvec_t, stringmap_t
+from ..halide.outputs cimport Outputs
+
+cdef extern from "haldol/include/multitarget.hh" namespace "multitarget" nogil:
+    
+    ModuleProducer generator_module_producer "multitarget::generator_module_producer" (string&,
+                                                                                       stringmap_t&)
+    void compile_generator_multitarget "multitarget::compile_generator" (string&, stringmap_t&,
+                                                                         Outputs&,
+                                                                         targetvec_t&,
+                                                                         stringmap_t&) except +
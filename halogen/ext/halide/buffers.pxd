@@ -78,6 +78,10 @@ cdef extern from "Halide.h" namespace "Halide" nogil:
         # Buffer[T] make_with_shape_of[T2](RuntimeBuffer[T2]) # RUNTIME BUFFER
         
         # INSERT ALL THE FORWARDED Runtime::Buffer METHODS HERE
+        halide_buffer_t* raw_buffer()
+        int dimensions()
+        size_t number_of_elements()
+        size_t size_in_bytes()
         
         void set_name(string&)
         string& name()
@@ -32,6 +32,7 @@ __all__ = ('DEFAULT_PATH',
            'DEFAULT_ENCODING',
            'DEFAULT_TIMEOUT',
            'script_path', 'which', 'back_tick',
+           'async_back_tick',
            'rm_rf', 'temporary',
            'TemporaryName',
            'Directory',
@@ -101,9 +102,10 @@ def back_tick(command,  as_str=True,
         verbose : bool, optional
             Whether or not debug information should be spewed to `sys.stderr`.
             Default is False.
-        timeout : int, optional
+        timeout : int or None, optional
             Number of seconds to wait for the executed command to complete before
-            forcibly killing the subprocess. Default is 60.
+            forcibly killing the subprocess. Default is 60; pass None (or zero) to
+            wait for as long as it takes.
         
         Returns
         -------
@@ -122,12 +124,13 @@ def back_tick(command,  as_str=True,
     # Step 1: Prepare for battle:
     import subprocess, shlex
     verbose = bool(kwargs.pop('verbose',  False))
-    timeout =  int(kwargs.pop('timeout',  DEFAULT_TIMEOUT))
+    timeout =      kwargs.pop('timeout',  DEFAULT_TIMEOUT) or None
     encoding = str(kwargs.pop('encoding', DEFAULT_ENCODING))
     raise_err = raise_err is not None and raise_err or bool(not ret_err)
     issequence = isinstance(command, (list, tuple))
     command_str = issequence and " ".join(command) or u8str(command).strip()
-    directory = 'directory' in kwargs and os.fspath(kwargs.pop('directory')) or None
+    directory = kwargs.pop('directory', None)
+    directory = directory is not None and os.fspath(directory) or None
     # Step 2: DO IT DOUG:
     if not issequence:
         command = shlex.split(command)
@@ -146,15 +149,30 @@ def back_tick(command,  as_str=True,
         process.kill()
         output, errors = process.communicate(timeout=None)
     returncode = process.returncode
-    # Step 3: Analyze the return code:
+    # Steps 3 and 4: analyze the return code, then tidy the output and return it:
     if returncode is None:
         process.terminate()
+    return command_result(command_str, output, errors, returncode, as_str=as_str,
+                                                                   ret_err=ret_err,
+                                                                 raise_err=raise_err,
+                                                                  encoding=encoding,
+                                                                   verbose=verbose)
+
+def command_result(command_str, output, errors, returncode, as_str=True,
+                                                            ret_err=False,
+                                                          raise_err=True,
+                                                           encoding=DEFAULT_ENCODING,
+                                                            verbose=False):
+    """ Analyze the return code and output of an executed command, raising or tidying
+        up and returning its output, per the `back_tick(…)` return contract (q.v. supra) --
+        this is shared by `back_tick(…)` and `async_back_tick(…)` (q.v. sub).
+    """
+    if returncode is None:
         raise ExecutionError('`{}` terminated without exiting cleanly'.format(command_str))
     if raise_err and returncode != 0:
         raise ExecutionError('`{}` exited with status {}, error: “{}”'.format(command_str,
                                    returncode,
                                    u8str(errors).strip()))
-    # Step 4: Tidy the output and return it:
     if verbose:
         if returncode != 0:
             print("",                           file=sys.stderr)
@@ -178,6 +196,85 @@ def back_tick(command,  as_str=True,
                (as_str and errors.decode(encoding) or errors)
     return (as_str and output.decode(encoding) or output)
 
+# The most bytes we’ll buffer while waiting for a line of stderr output to end:
+STREAM_LIMIT = 2 ** 20
+
+async def async_back_tick(command,  as_str=True,
+                                   ret_err=False,
+                                 raise_err=None, **kwargs):
+    """ Run command `command` asynchronously, without blocking the calling thread --
+        this coroutine takes the same arguments as `back_tick(…)` (q.v. supra) and has
+        the same return contract, with a few differences:
+        
+        timeout : int or None, optional
+            Number of seconds to wait for the executed command to complete before
+            forcibly killing the subprocess. Default is 60; pass None (or zero) to
+            wait for as long as it takes.
+        on_stderr : callable, optional
+            A function to call with each line of stderr output (as a string, sans
+            the line ending) as it arrives from the subprocess, rather than once it
+            has finished. The complete stderr output is still returned, per `ret_err`.
+        
+        If the awaiting task is cancelled, the subprocess is killed (and reaped) before
+        the `asyncio.CancelledError` is re-raised -- so many of these can be in flight
+        at once, e.g. with `asyncio.gather(…)`, without leaving any strays about.
+    """
+    # Step 1: Prepare for battle:
+    import asyncio, shlex
+    verbose = bool(kwargs.pop('verbose',  False))
+    timeout =      kwargs.pop('timeout',  DEFAULT_TIMEOUT) or None
+    encoding = str(kwargs.pop('encoding', DEFAULT_ENCODING))
+    on_stderr =    kwargs.pop('on_stderr', None)
+    raise_err = raise_err is not None and raise_err or bool(not ret_err)
+    issequence = isinstance(command, (list, tuple))
+    command_str = issequence and " ".join(command) or u8str(command).strip()
+    directory = kwargs.pop('directory', None)
+    directory = directory is not None and os.fspath(directory) or None
+    # Step 2: DO IT DOUG:
+    if not issequence:
+        command = shlex.split(command)
+    if verbose:
+        print("EXECUTING:", file=sys.stdout)
+        print("`{}`".format(command_str),
+                            file=sys.stdout)
+        print("",           file=sys.stdout)
+    process = await asyncio.create_subprocess_exec(*command, stdout=asyncio.subprocess.PIPE,
+                                                             stderr=asyncio.subprocess.PIPE,
+                                                                cwd=directory,
+                                                              limit=STREAM_LIMIT)
+    errorlines = []
+    
+    async def stream_errors():
+        async for line in process.stderr:
+            errorlines.append(line)
+            if on_stderr is not None:
+                on_stderr(line.decode(encoding).rstrip("\r\n"))
+    
+    async def communicate():
+        output, _ = await asyncio.gather(process.stdout.read(), stream_errors())
+        await process.wait()
+        return output
+    
+    task = asyncio.ensure_future(communicate())
+    try:
+        output = await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        output = await task
+    except asyncio.CancelledError:
+        if process.returncode is None:
+            process.kill()
+        task.cancel()
+        await process.wait()
+        raise
+    # Steps 3 and 4: analyze the return code, then tidy the output and return it:
+    return command_result(command_str, output, b"".join(errorlines), process.returncode,
+                                                                     as_str=as_str,
+                                                                    ret_err=ret_err,
+                                                                  raise_err=raise_err,
+                                                                   encoding=encoding,
+                                                                    verbose=verbose)
+
 def rm_rf(pth):
     """ rm_rf() does what `rm -rf` does – so, for the love of fuck,
         BE FUCKING CAREFUL WITH IT.
@@ -1342,6 +1439,38 @@ def test():
     # Confirm that the TemporaryDirectory has been deleted:
     assert not tdp.exists
     
+    # Run a few commands asynchronously, all at once, streaming stderr --
+    # then run one that outlives its timeout, and cancel another one outright:
+    import asyncio
+    
+    async def run_commands():
+        lines = []
+        results = await asyncio.gather(*(async_back_tick(f"sh -c 'echo yo {idx}; echo dogg {idx} 1>&2'",
+                                                         ret_err=True,
+                                                         on_stderr=lines.append) \
+                                                         for idx in range(4)))
+        assert results == [(f"yo {idx}", f"dogg {idx}") for idx in range(4)]
+        assert sorted(lines) == [f"dogg {idx}" for idx in range(4)]
+        assert await async_back_tick("echo i heard you like") == back_tick("echo i heard you like")
+        try:
+            await async_back_tick("sleep 10", timeout=0.1)
+        except ExecutionError:
+            pass
+        else:
+            assert False, "timed-out command didn’t raise"
+        task = asyncio.ensure_future(async_back_tick("sleep 10", timeout=None))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        assert task.cancelled()
+    
+    asyncio.run(run_commands())
+    print("* Asynchronous command tests completed OK")
+    print("")
+    
     # Check the 'ts' submodule:
     # assert ts
     # assert ts.DirectoryLike
@@ -12,7 +12,10 @@ else:
 
 __all__ = ('valid_emits', 'emit_defaults',
                           'default_emits',
-           'preload',
+           'ModuleMetadata',
+           'GenerationProfile',
+           'profile_summary',
+           'preload', 'index_library', 'load_generators',
            'generate')
 
 __dir__ = lambda: list(__all__)
@@ -38,13 +41,17 @@ default_emits = ('static_library', 'h')
 def preload(library_path, **kwargs):
     """ Load and auto-register generators from a dynamic-link library at a
         given path. Currently we use ctypes to do this cross-platform-ly.
-        We also use a memoization cache to avoid loading anything twice.
+        We also use a memoization cache to avoid loading anything twice --
+        and as loading a library afresh registers its generators, we then
+        invalidate the snapshot of the generator registry kept by halogen.api.
     """
     import os, ctypes
     if __package__ is None or __package__ == '':
+        import api # type: ignore
         from config import DEFAULT_VERBOSITY
         from errors import GeneratorLoaderError
     else:
+        from . import api # type: ignore
         from .config import DEFAULT_VERBOSITY
         from .errors import GeneratorLoaderError
     verbose = bool(kwargs.pop('verbose', DEFAULT_VERBOSITY))
@@ -68,38 +75,502 @@ def preload(library_path, **kwargs):
     
     # so far, I have no use for the object returned by LoadLibrary:
     preload.loaded_libraries[realpth] = ctypes.cdll.LoadLibrary(realpth)
+    api.invalidate_registry()
     
     # return the new and freshly loaded handle
     if verbose:
         print(f"preload(): Library {realpth} loaded afresh")
     return preload.loaded_libraries[realpth]
 
+def generator_index(index=None):
+    """ Return a halogen.index.GeneratorIndex instance -- the default index, given
+        None (or True), or the index in a given directory -- or None, given False.
+    """
+    if __package__ is None or __package__ == '':
+        from index import GeneratorIndex
+    else:
+        from .index import GeneratorIndex
+    if index is False:
+        return None
+    if index is None or index is True:
+        return GeneratorIndex()
+    if not isinstance(index, GeneratorIndex):
+        return GeneratorIndex(directory=index)
+    return index
+
+def index_library(library_path, **kwargs):
+    """ Load a generator library, as per `preload(…)` supra., and record the generators it
+        registers -- the names in the registry after loading it that weren’t there before --
+        in the generator index (q.v. halogen.index.GeneratorIndex). Pass `index` to use an
+        index other than the default one. Returns a sorted list of the generator names.
+        
+        N.B. a library that was already loaded can’t be diffed in this way, so the index
+        is left as-is, and the names already indexed for the library are returned.
+    """
+    import os
+    if __package__ is None or __package__ == '':
+        import api # type: ignore
+    else:
+        from . import api # type: ignore
+    index = generator_index(kwargs.pop('index', None))
+    realpth = os.path.realpath(library_path)
+    if realpth in getattr(preload, 'loaded_libraries', {}):
+        preload(library_path, **kwargs)
+        return index is not None and index.generators_for(realpth) or []
+    before = api.registry_snapshot()
+    preload(library_path, **kwargs)
+    generators = sorted(api.registry_snapshot() - before)
+    if index is not None:
+        with index:
+            index.record(realpth, generators)
+    return generators
+
+def load_generators(*generators, **kwargs):
+    """ Ensure that the named generators are registered -- loading, for any that aren’t,
+        just the libraries that register them, as per the generator index (q.v. function
+        `index_library(…)` supra.) rather than each and every generator library around.
+        Pass `index` to use an index other than the default one.
+        
+        Returns a list of the libraries loaded. Generators that are neither registered
+        nor indexed are left for the caller to complain about.
+    """
+    if __package__ is None or __package__ == '':
+        import api # type: ignore
+    else:
+        from . import api # type: ignore
+    index = generator_index(kwargs.pop('index', None))
+    missing = [generator for generator in generators if not api.is_registered_generator(generator)]
+    if index is None or len(missing) == 0 or not index.exists:
+        return []
+    libraries = index.read().libraries_for(*missing)
+    for library in libraries:
+        preload(library, **kwargs)
+    return libraries
+
+class ModuleMetadata(tx.NamedTuple):
+    
+    """ The particulars of a generated module, in lieu of the module itself --
+        as returned by `generate(…)` when run with a pool of worker processes,
+        as halogen.api.Module instances can’t be passed between processes.
+        
+        This is also what a pickled halogen.api.Module instance unpickles as:
+        a lightweight proxy, made from the compact serialized form of the module
+        (its name, target string, metadata map and output filenames) without
+        rebuilding the module itself (q.v. `halogen.api.Module.serialize()`).
+    """
+    
+    name: str
+    target: str
+    metadata: tx.Dict[str, str]
+    outputs: tx.Optional[tx.Dict[str, str]] = None
+    
+    def get_metadata(self) -> tx.Dict[str, str]:
+        return dict(self.metadata)
+    
+    def get_target(self):
+        """ Return the target string as a halogen.api.Target instance """
+        if __package__ is None or __package__ == '':
+            import api # type: ignore
+        else:
+            from . import api # type: ignore
+        return api.Target(target_string=self.target)
+    
+    def get_outputs(self):
+        """ Return the output filenames as a halogen.api.Outputs instance """
+        if __package__ is None or __package__ == '':
+            import api # type: ignore
+        else:
+            from . import api # type: ignore
+        return api.Outputs(**dict(self.outputs or {}))
+    
+    def serialize(self) -> tx.Dict[str, tx.Any]:
+        """ Return the compact serialized form, as per `halogen.api.Module.serialize()` """
+        return dict(name=self.name, target=self.target,
+                                    metadata=dict(self.metadata),
+                                    outputs=dict(self.outputs or {}))
+    
+    @classmethod
+    def from_module(cls, module, outputs=None) -> 'ModuleMetadata':
+        """ Extract the particulars of a halogen.api.Module instance (or pass through
+            a ModuleMetadata instance) as a new ModuleMetadata instance -- optionally
+            replacing its output filenames with those in the `outputs` dict.
+        """
+        if __package__ is None or __package__ == '':
+            from utils import u8str
+        else:
+            from .utils import u8str
+        if isinstance(module, cls):
+            out = module
+        elif hasattr(module, 'serialize'):
+            out = cls(**module.serialize())
+        else:
+            out = cls(name=u8str(module.name),
+                      target=u8str(module.target),
+                      metadata={ u8str(k) : u8str(v) for k, v in module.get_metadata().items() })
+        if outputs is not None:
+            out = out._replace(outputs={ name : filename for name, filename in outputs.items() if filename })
+        return out
+
+# The names of the halogen.api.Outputs filename properties:
+output_names = ('object_name', 'assembly_name',
+                               'bitcode_name',
+                               'llvm_assembly_name',
+                               'c_header_name',
+                               'c_source_name',
+                               'python_extension_name',
+                               'stmt_name',
+                               'stmt_html_name',
+                               'static_library_name',
+                               'schedule_name')
+
+class GenerationProfile(tx.NamedTuple):
+    
+    """ How long it took to run one generator, for one target (or several, in the case
+        of a multi-target run) -- in seconds, broken down into the time spent building
+        the module (running the generator’s `generate()` and `schedule()` methods and
+        lowering the resulting pipeline) and that spent compiling the module (LLVM code
+        generation and the writing of the outputs). The `artifacts` dict maps the name of
+        each output (as in “static_library_name”) to a tuple of the seconds spent compiling
+        it and its size in bytes. Profiles of artifact-cache hits have `cached` set, and
+        zeroes for timings.
+    """
+    
+    name: str
+    target: str
+    lowering: float
+    codegen: float
+    artifacts: tx.Dict[str, tx.Tuple[float, int]]
+    cached: bool = False
+    
+    @property
+    def total(self) -> float:
+        return self.lowering + self.codegen
+    
+    @property
+    def size(self) -> int:
+        return sum(size for _, size in self.artifacts.values())
+    
+    @classmethod
+    def for_outputs(cls, name, target, names, lowering=0.0, timings=None, cached=False) -> 'GenerationProfile':
+        """ Profile a generator run, given a dict of output filenames (as per `output_names`)
+            and a dict of the seconds spent compiling each output -- the outputs are sized up
+            by way of the filesystem, and the sum of the output timings is taken as the time
+            spent on code generation.
+        """
+        import os
+        timings = dict(timings or {})
+        artifacts = { output : (float(timings.get(output, 0.0)),
+                                os.path.isfile(filename) and os.path.getsize(filename) or 0) \
+                                              for output, filename in names.items() if filename }
+        return cls(name=name, target=target, lowering=float(lowering),
+                                             codegen=sum(seconds for seconds, _ in artifacts.values()),
+                                             artifacts=artifacts,
+                                             cached=bool(cached))
+
+def profile_summary(profiles, count=10):
+    """ Return a table, as a string, summarizing the slowest `count` generator runs in a dict
+        of GenerationProfile instances (as filled in by `generate(…, profile={})`, q.v. sub.)
+        -- listing, for each, the time spent on lowering and code generation, the slowest
+        artifact to compile, and the total size of the outputs.
+    """
+    profiles = sorted(profiles.items(), key=lambda item: item[1].total, reverse=True)
+    width = max([len(label) for label, _ in profiles] + [9])
+    lines = [f"{'generator':<{width}}  {'total':>8}  {'lowering':>8}  {'codegen':>8}  "
+             f"{'slowest artifact':<28}  {'bytes':>10}"]
+    for label, profile in profiles[:count]:
+        slowest = "(cached)"
+        if not profile.cached and profile.artifacts:
+            output, (seconds, _) = max(profile.artifacts.items(), key=lambda item: item[1][0])
+            slowest = f"{output} ({seconds:.3f}s)"
+        lines.append(f"{label:<{width}}  {profile.total:8.3f}  {profile.lowering:8.3f}  "
+                     f"{profile.codegen:8.3f}  {slowest:<28}  {profile.size:>10}")
+    if len(profiles) > count:
+        lines.append(f"… and {len(profiles) - count} more, totalling "
+                     f"{sum(profile.total for _, profile in profiles[count:]):.3f}s")
+    return "\n".join(lines)
+
+def emit_options_for(emits, substitutions):
+    """ Create a halogen.api.EmitOptions instance, setting up the emit options
+        as per an iterable of emit names (e.g. “static_library”, “h”, “o”, etc),
+        and a dict of filename-suffix substitutions.
+    """
+    if __package__ is None or __package__ == '':
+        import api # type: ignore
+    else:
+        from . import api # type: ignore
+    
+    # Set what emits to, er, emit, as per the “emit” keyword argument;
+    # These have been rolled into the “emits” set (q.v. argument processing supra.);
+    # …plus, we’ve already ensured that the set is valid:
+    emit_dict = dict(emit_defaults)
+    for emit in emits:
+        emit_dict[f"emit_{emit}"] = True
+    
+    # The “substitutions” keyword to the EmitOptions constructor is special;
+    # It’s just a dict, passed forward during argument processing:
+    emit_dict['substitutions'] = dict(substitutions)
+    
+    # Actually create the EmitOptions object from “emit_dict”:
+    return api.EmitOptions(**emit_dict)
+
+def generate_one(generator, output_directory, target, emit_options, verbose=False, params=None,
+                                                                                   profile=None):
+    """ Build and compile the module for one named generator, returning a tuple containing
+        the base path (a string), the outputs (a halogen.api.Outputs instance) and the
+        module (a halogen.api.Module instance). GeneratorParam values may be passed as
+        a dict of strings, in `params`.
+        
+        Pass a dict as `profile` to have it filled in with the time spent building the module,
+        as “lowering”, and the times spent compiling each output, as “timings” (a dict keyed
+        by output name) -- N.B. when profiling, each output is compiled on its own, so as to
+        time them individually, which will take longer overall than compiling them together.
+    """
+    import os, time
+    if __package__ is None or __package__ == '':
+        import api # type: ignore
+        from utils import terminal_width, u8bytes, u8str
+    else:
+        from . import api # type: ignore
+        from .utils import terminal_width, u8bytes, u8str
+    
+    # “base_path” (a bytestring) is computed using the `compute_base_path()` API function:
+    base_path = api.compute_base_path(u8bytes(
+                                    os.fspath(output_directory)),
+                                      u8bytes(generator))
+    
+    # “output” (an instance of halogen.api.Outputs) is computed using the eponymously named
+    # halogen.api.EmitOptions method `compute_outputs_for_target_and_path()` with an instance
+    # of halogen.api.Target and a base path bytestring (q.v. note supra.):
+    output = emit_options.compute_outputs_for_target_and_path(target, base_path)
+    
+    if verbose:
+        print(f"BSEPTH: {u8str(base_path)}")
+        print(f"OUTPUT: {u8str(output)}")
+    
+    # This API call prepares the generator code module:
+    started = time.perf_counter()
+    module = api.get_generator_module(generator,
+                                      arguments=dict(params or {}, target=target))
+    
+    if verbose:
+        print(f"MODULE: {u8str(module.name)} ({u8str(module)})")
+        print('=' * max(terminal_width, 100))
+    
+    # The module-compilation call -- once per output, if profiling:
+    if profile is None:
+        module.compile(output)
+    else:
+        profile['lowering'] = time.perf_counter() - started
+        profile['timings'] = {}
+        for name in output_names:
+            filename = getattr(output, name)
+            if filename:
+                started = time.perf_counter()
+                module.compile(api.Outputs(**{ name : filename }))
+                profile['timings'][name] = time.perf_counter() - started
+    
+    # Return the post-compile base path (a string), outputs (an instance of
+    # halogen.api.Outputs) and the module instance itself:
+    return u8str(base_path), output, module
+
+def preload_worker(libraries, verbose=False):
+    """ Initialize a worker process for `generate(…)`, by preloading the generator
+        libraries loaded in the parent process. N.B. this is a no-op for libraries
+        the worker already has loaded, e.g. when forked from the parent process.
+    """
+    for library in libraries:
+        preload(library, verbose=verbose)
+
+# Worker processes keep the EmitOptions they build, keyed by emits and substitutions --
+# as each worker will generally be handed the same ones, for many generators and targets:
+worker_emit_options = {}
+
+def worker_emit_options_for(emits, substitutions):
+    """ Memoized `emit_options_for(…)`, for use in worker processes """
+    key = (tuple(sorted(emits)), tuple(sorted(substitutions.items())))
+    if key not in worker_emit_options:
+        worker_emit_options[key] = emit_options_for(emits, substitutions)
+    return worker_emit_options[key]
+
+def generate_worker(generator, output_directory, target_string, emits, substitutions, verbose=False,
+                                                                                           params=None,
+                                                                                           profile=False):
+    """ Generate one named generator in a worker process, returning the base path,
+        a dict of output filenames, a ModuleMetadata tuple and -- if `profile` is True --
+        a GenerationProfile tuple (or None, if not), all of which can be pickled and
+        sent back to the parent process.
+    """
+    if __package__ is None or __package__ == '':
+        import api # type: ignore
+    else:
+        from . import api # type: ignore
+    
+    timings = {} if profile else None
+    base_path, output, module = generate_one(generator, output_directory,
+                                             api.Target(target_string=target_string),
+                                             worker_emit_options_for(emits, substitutions),
+                                             verbose=verbose,
+                                             params=params,
+                                             profile=timings)
+    names = { name : getattr(output, name) for name in output_names }
+    metadata = ModuleMetadata.from_module(module, outputs=names)
+    if timings is None:
+        return base_path, names, metadata, None
+    return base_path, names, metadata, GenerationProfile.for_outputs(generator, metadata.target, names,
+                                                                     lowering=timings['lowering'],
+                                                                     timings=timings['timings'])
+
+# Halide’s multi-target compilation only supports emitting these:
+multitarget_emits = ('static_library', 'h')
+
+def generate_multitarget(generator, output_directory, target_strings, substitutions, verbose=False,
+                                                                                        params=None,
+                                                                                        profile=False):
+    """ Compile one named generator for each of several targets, combining the results
+        into one runtime-dispatching static library (plus its header) -- returning the
+        base path, a dict of output filenames, and a ModuleMetadata tuple, whose target
+        is a comma-separated list of the target strings (as per GenGen.cpp) -- plus a
+        GenerationProfile tuple if `profile` is True, or None if not. N.B. a multi-target
+        compilation can’t be broken down by phase or by output; all of it is taken as time
+        spent on code generation, and split evenly between the outputs.
+    """
+    import os, time
+    if __package__ is None or __package__ == '':
+        import api # type: ignore
+        from utils import u8bytes, u8str
+    else:
+        from . import api # type: ignore
+        from .utils import u8bytes, u8str
+    
+    targets = tuple(api.Target(target_string=target_string) for target_string in target_strings)
+    base_path = api.compute_base_path(u8bytes(
+                                    os.fspath(output_directory)),
+                                      u8bytes(generator))
+    
+    # The first target is used as the basis for the output filenames:
+    output = worker_emit_options_for(multitarget_emits,
+                                     substitutions).compute_outputs_for_target_and_path(targets[0],
+                                                                                        base_path)
+    if verbose:
+        print(f"MULTITARGET: {generator} ({len(targets)} targets)")
+        print(f"OUTPUT: {u8str(output)}")
+    
+    started = time.perf_counter()
+    api.compile_multitarget(generator, output, *targets, arguments=dict(params or {}))
+    elapsed = time.perf_counter() - started
+    names = { name : getattr(output, name) for name in output_names }
+    metadata = ModuleMetadata(name=u8str(generator),
+                              target=",".join(u8str(target) for target in targets),
+                              metadata={},
+                              outputs={ name : filename for name, filename in names.items() if filename })
+    if not profile:
+        return u8str(base_path), names, metadata, None
+    outputs = [name for name, filename in names.items() if filename]
+    return u8str(base_path), names, metadata, GenerationProfile.for_outputs(metadata.name, metadata.target, names,
+                                                                            timings={ name : elapsed / max(len(outputs), 1) \
+                                                                                             for name in outputs })
+
 def generate(*generators, **arguments):
     """ Invoke halogen.api.Module.compile(…) with the proper arguments. This function
-        was concieved with replacing GenGen.cpp’s options in mind. """
+        was concieved with replacing GenGen.cpp’s options in mind.
+        
+        Generators are run in sorted order by name, and the return value is a list of
+        (base_path, outputs, module) tuples, in that same order. Pass `jobs=N` to run
+        the generators in a pool of N worker processes, each of which preloads all of
+        the libraries previously loaded with `preload(…)` (or those passed in as the
+        `libraries` keyword) -- in this case, each tuple contains a ModuleMetadata
+        instance in lieu of a halogen.api.Module.
+        
+        The `target` keyword may be a single target string, or a list of them -- in the
+        latter case, each generator is run once per target, with the outputs for each
+        target written to a subdirectory of the output directory named for the target,
+        and the tuples for each generator are returned in the order of the targets. The
+        (generator, target) pairs are all farmed out to the same pool of workers. Pass
+        `multitarget=True` to also compile each generator into a runtime-dispatching
+        multi-target static library (and header) in the output directory proper, q.v.
+        `generate_multitarget(…)` supra. -- the tuple for which follows those for the
+        individual targets.
+        
+        GeneratorParam values may be passed as a dict in the `params` keyword. Pass
+        `cache=True` (or the path to a cache directory, or a halogen.cache.ArtifactCache
+        instance) to consult a persistent cache of generator outputs before running any
+        generators -- on a hit, the outputs are materialized from the cache, and the tuple
+        contains a ModuleMetadata instance; on a miss, the outputs are cached afterwards.
+        
+        Pass `profile=True` to have a dict of GenerationProfile tuples, one for each generator
+        run (keyed like the `errors` dict, q.v. sub.) returned alongside the list of artifact
+        tuples, as in `artifacts, profiles = generate(…, profile=True)` -- timing the lowering
+        of each module and the compilation of each of its outputs, and sizing up the outputs;
+        q.v. `generate_one(…)` supra. for the caveats, and the function `profile_summary(…)`
+        supra. for a table of the slowest generators. Alternatively, pass a dict as `profile`
+        to have it filled in with the same, in which case just the artifacts are returned.
+        
+        Pass `index` -- True for the default generator index, or the path to the directory
+        of another, or a halogen.index.GeneratorIndex instance -- to have generators that
+        aren’t yet registered loaded on demand: that is, just the libraries that register
+        them are loaded, as per the index, q.v. the function `load_generators(…)` supra.
+        
+        Exceptions raised by individual generators are collected until all generators
+        have had their turn; they are then either added to the dict passed in as the
+        `errors` keyword (keyed by generator name -- qualified with the target string,
+        when running for several targets) or, failing that, summarized in a
+        GenerationError raised at the end.
+    """
     import os
+    from concurrent.futures import ProcessPoolExecutor, as_completed
     if __package__ is None or __package__ == '':
         import api # type: ignore
+        from cache import ArtifactCache
         from config import DEFAULT_VERBOSITY
         from errors import GenerationError
         from filesystem import Directory
-        from utils import terminal_width, u8bytes, u8str
+        from utils import is_string, terminal_width, u8bytes, u8str
     else:
         from . import api # type: ignore
+        from .cache import ArtifactCache
         from .config import DEFAULT_VERBOSITY
         from .errors import GenerationError
         from .filesystem import Directory
-        from .utils import terminal_width, u8bytes, u8str
+        from .utils import is_string, terminal_width, u8bytes, u8str
     
     # ARGUMENT PROCESSING:
     
-    generators = { u8str(generator) for generator in generators }
-    generator_names = OCDFrozenSet(arguments.pop('generator_names', api.registered_generators()))
+    generators = tuple(sorted({ u8str(generator) for generator in generators }))
+    verbose = bool(arguments.pop('verbose', DEFAULT_VERBOSITY))
+    index = arguments.pop('index', False)
+    if index is not None and index is not False and 'generator_names' not in arguments:
+        load_generators(*generators, index=index, verbose=verbose)
+    generator_names = OCDFrozenSet(arguments.pop('generator_names', api.registry_snapshot()))
     output_directory = Directory(pth=arguments.pop('output_directory', None))
-    target = api.Target(target_string=u8bytes(arguments.pop('target', 'host')))
+    target_argument = arguments.pop('target', 'host')
+    if is_string(target_argument):
+        target_argument = (target_argument,)
     emits = OCDFrozenSet(arguments.pop('emit', default_emits))
     substitutions = dict(arguments.pop('substitutions', {}))
-    verbose = bool(arguments.pop('verbose', DEFAULT_VERBOSITY))
+    jobs = int(arguments.pop('jobs', None) or 1)
+    errors = arguments.pop('errors', None)
+    libraries = tuple(arguments.pop('libraries', getattr(preload, 'loaded_libraries', {}).keys()))
+    multitarget = bool(arguments.pop('multitarget', False))
+    profile = arguments.pop('profile', None)
+    return_profile = profile is True
+    if return_profile:
+        profile = {}
+    elif profile is False:
+        profile = None
+    params = { u8str(k) : u8str(v) for k, v in dict(arguments.pop('params', {})).items() }
+    cache = arguments.pop('cache', None)
+    if cache is True:
+        cache = ArtifactCache()
+    elif cache and not isinstance(cache, ArtifactCache):
+        cache = ArtifactCache(directory=cache)
+    cache = cache or None
+    
+    # Normalize the target strings (e.g. “host” becomes the actual host target
+    # string) -- dropping any duplicates, but otherwise keeping them in order:
+    targets = {}
+    for target_string in target_argument:
+        target = api.Target(target_string=u8bytes(target_string))
+        targets.setdefault(u8str(target), target)
     
     # ARGUMENT POST-PROCESS BOUNDS-CHECKS:
     
@@ -109,84 +580,203 @@ def generate(*generators, **arguments):
     if len(generator_names) == 0:
         raise GenerationError(">=1 generator name is required")
     
-    if not generators.issubset(generator_names):
+    if len(targets) == 0:
+        raise GenerationError(">=1 target is required")
+    
+    if not generator_names.issuperset(generators):
         raise GenerationError(f"generator name in {str(generator_names)} unknown to set: {str(generators)}")
     
+    if jobs < 1:
+        raise GenerationError(f"the number of generation jobs must be 1 or more (not {jobs})")
+    
     if not output_directory.exists:
         output_directory.makedirs()
     
     if not emits.issubset(valid_emits):
         raise GenerationError(f"invalid emit in {str(emits)}")
     
+    # With more than one target, each gets its own output subdirectory:
+    output_directories = {}
+    for target_string in targets:
+        if len(targets) == 1:
+            output_directories[target_string] = output_directory
+            continue
+        output_directories[target_string] = output_directory.subdirectory(target_string)
+        if not output_directories[target_string].exists:
+            output_directories[target_string].makedirs()
+    
+    # The generator-and-target pairs to run -- plus, one multi-target
+    # pass per generator (keyed by the tuple of all target strings):
+    tasks = [(generator, target_string) for generator in generators for target_string in targets]
+    if multitarget:
+        tasks.extend((generator, tuple(targets)) for generator in generators)
+    
+    def label(task):
+        generator, target_key = task
+        if len(targets) == 1 and not multitarget:
+            return generator
+        if not is_string(target_key):
+            return f"{generator} (multitarget)"
+        return f"{generator} ({target_key})"
+    
     if verbose:
         print("")
         print(f"generate(): Preparing {len(generators)} generator modules to emit data …")
         print("")
     
-    # Set what emits to, er, emit, as per the “emit” keyword argument;
-    # These have been rolled into the “emits” set (q.v. argument processing supra.);
-    # …plus, we’ve already ensured that the set is valid:
-    emit_dict = dict(emit_defaults)
-    for emit in emits:
-        emit_dict[f"emit_{emit}"] = True
-    
-    # The “substitutions” keyword to the EmitOptions constructor is special;
-    # It’s just a dict, passed forward during argument processing:
-    emit_dict['substitutions'] = substitutions
-    
-    # Actually create the EmitOptions object from “emit_dict”:
-    emit_options = api.EmitOptions(**emit_dict)
+    emit_options = emit_options_for(emits, substitutions)
     
     if verbose:
-        print(f"generate(): Target: {u8str(target)}")
+        print(f"generate(): Targets: {', '.join(targets)}")
         print("generate(): Emit Options:")
         print(u8str(emit_options))
         print("")
     
-    # This list will store generator module compilation artifacts:
-    artifacts = []
+    # These dicts will store generator module compilation artifacts and failures:
+    results = {}
+    failures = {}
+    
+    # Consult the artifact cache (if we have one) before running anything --
+    # the outputs for any hits are materialized from the cache, in situ:
+    pending = tasks
+    cache_keys = {}
+    if cache is not None:
+        pending = []
+        multitarget_emit_options = multitarget and emit_options_for(multitarget_emits, substitutions)
+        for task in tasks:
+            generator, target_key = task
+            if is_string(target_key):
+                directory, target, options = output_directories[target_key], targets[target_key], emit_options
+                cache_keys[task] = cache.key_for(generator, target_key, emits, substitutions, params, libraries)
+            else:
+                directory, target, options = output_directory, targets[target_key[0]], multitarget_emit_options
+                cache_keys[task] = cache.key_for(generator, ",".join(target_key), multitarget_emits, substitutions,
+                                                                                                    params,
+                                                                                                    libraries)
+            base_path = api.compute_base_path(u8bytes(os.fspath(directory)),
+                                              u8bytes(generator))
+            outputs = options.compute_outputs_for_target_and_path(target, base_path)
+            module = cache.fetch_outputs(cache_keys[task], { name : getattr(outputs, name) for name in output_names })
+            if module is None:
+                pending.append(task)
+            else:
+                # The cached output filenames are those of the run that stored them:
+                results[task] = (u8str(base_path), outputs, ModuleMetadata(**dict(module,
+                                                                           outputs=outputs.to_dict())))
+                if profile is not None:
+                    profile[label(task)] = GenerationProfile.for_outputs(generator, module['target'],
+                                                                   { name : getattr(outputs, name) \
+                                                                            for name in output_names },
+                                                                                     cached=True)
+        if verbose:
+            print(f"generate(): Artifact cache: {len(results)} hits, {len(pending)} misses")
     
     if verbose:
         print('-' * max(terminal_width, 100))
     
-    # The generator loop compiles each named generator:
-    for generator in generators:
-        
-        # “base_path” (a bytestring) is computed using the `compute_base_path()` API function:
-        base_path = api.compute_base_path(u8bytes(
-                                        os.fspath(output_directory)),
-                                          u8bytes(generator))
-        
-        # “output” (an instance of halogen.api.Outputs) is computed using the eponymously named
-        # halogen.api.EmitOptions method `compute_outputs_for_target_and_path()` with an instance
-        # of halogen.api.Target and a base path bytestring (q.v. note supra.):
-        output = emit_options.compute_outputs_for_target_and_path(target, base_path)
-        
-        if verbose:
-            print(f"BSEPTH: {u8str(base_path)}")
-            print(f"OUTPUT: {u8str(output)}")
-        
-        # This API call prepares the generator code module:
-        module = api.get_generator_module(generator,
-                                          arguments={ 'target': target })
-        
+    if jobs == 1 or len(pending) <= 1:
+        # The generator loop compiles each named generator, for each target:
+        for task in pending:
+            generator, target_key = task
+            try:
+                if is_string(target_key):
+                    timings = {} if profile is not None else None
+                    results[task] = generate_one(generator, output_directories[target_key],
+                                                            targets[target_key],
+                                                            emit_options,
+                                                            verbose=verbose,
+                                                            params=params,
+                                                            profile=timings)
+                    if timings is not None:
+                        base_path, outputs, module = results[task]
+                        profile[label(task)] = GenerationProfile.for_outputs(generator, target_key,
+                                                                       { name : getattr(outputs, name) \
+                                                                                for name in output_names },
+                                                                             lowering=timings['lowering'],
+                                                                              timings=timings['timings'])
+                else:
+                    base_path, names, metadata, timing = generate_multitarget(generator, output_directory,
+                                                                                         target_key,
+                                                                                         substitutions,
+                                                                                         verbose=verbose,
+                                                                                         params=params,
+                                                                                         profile=profile is not None)
+                    results[task] = (base_path, api.Outputs(**names), metadata)
+                    if timing is not None:
+                        profile[label(task)] = timing
+            except Exception as exc:
+                failures[label(task)] = exc
+    else:
         if verbose:
-            print(f"MODULE: {u8str(module.name)} ({u8str(module)})")
-            print('=' * max(terminal_width, 100))
-        
-        # The module-compilation call:
-        module.compile(output)
-        
-        # Stow the post-compile base path (a string), outputs (an instance of
-        # halogen.api.Outputs) and the module instance itself:
-        artifacts.append((u8str(base_path), output, module))
+            print(f"generate(): Running generators in {min(jobs, len(pending))} worker processes")
+        # The worker pool compiles each named generator for each target -- from whence the
+        # outputs come back as a dict of filenames, from which we rebuild the Outputs instance:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pending)),
+                                 initializer=preload_worker,
+                                 initargs=(libraries, verbose)) as executor:
+            futures = {}
+            for task in pending:
+                generator, target_key = task
+                if is_string(target_key):
+                    future = executor.submit(generate_worker, generator,
+                                                              os.fspath(output_directories[target_key]),
+                                                              target_key,
+                                                              tuple(emits),
+                                                              substitutions,
+                                                              verbose,
+                                                              params,
+                                                              profile is not None)
+                else:
+                    future = executor.submit(generate_multitarget, generator,
+                                                                   os.fspath(output_directory),
+                                                                   target_key,
+                                                                   substitutions,
+                                                                   verbose,
+                                                                   params,
+                                                                   profile is not None)
+                futures[future] = task
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    base_path, names, metadata, timing = future.result()
+                except Exception as exc:
+                    failures[label(task)] = exc
+                else:
+                    results[task] = (base_path, api.Outputs(**names), metadata)
+                    if timing is not None:
+                        profile[label(task)] = timing
+    
+    # Cache the outputs of everything we actually ran:
+    if cache is not None:
+        for task in pending:
+            if task in results:
+                base_path, outputs, module = results[task]
+                cache.store_outputs(cache_keys[task], { name : getattr(outputs, name) for name in output_names },
+                                                      ModuleMetadata.from_module(module)._asdict())
+        cache.save_stats()
+    
+    if verbose and profile:
+        print('-' * max(terminal_width, 100))
+        print("generate(): Slowest generators:")
+        print(profile_summary(profile))
+        print("")
     
-    # Return the post-compile value artifacts for all generators:
+    if len(failures) > 0:
+        if errors is None:
+            summary = "\n".join(f"{name}: {str(exc)}" for name, exc in sorted(failures.items()))
+            raise GenerationError(f"{len(failures)} of {len(tasks)} generator runs failed:\n{summary}")
+        errors.update(failures)
+    
+    # Return the post-compile value artifacts for all generators and targets, in order --
+    # along with their profiles, if asked to return those as well:
+    artifacts = [results[task] for task in sorted(tasks, key=lambda task: generators.index(task[0])) \
+                                                                       if task in results]
+    if return_profile:
+        return artifacts, profile
     return artifacts
 
-
 def test():
-    
+
     """ Run the inline tests for the halogen.generate module """
     
     import os
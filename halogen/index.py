@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function
+
+import contextlib
+import json
+import os
+import threading
+
+if __package__ is None or __package__ == '':
+    from cache import DEFAULT_CACHE_DIRECTORY, file_digest
+    from errors import GeneratorIndexError
+    from filesystem import Directory
+    from utils import stringify, u8str
+else:
+    from .cache import DEFAULT_CACHE_DIRECTORY, file_digest
+    from .errors import GeneratorIndexError
+    from .filesystem import Directory
+    from .utils import stringify, u8str
+
+__all__ = ('DEFAULT_INDEX_DIRECTORY',
+           'GeneratorIndex')
+
+__dir__ = lambda: list(__all__)
+
+# The index lives in the directory named by the `HALOGEN_INDEX_DIR` environment
+# variable -- or failing that, alongside the caches (q.v. halogen.cache):
+DEFAULT_INDEX_DIRECTORY = os.environ.get('HALOGEN_INDEX_DIR', DEFAULT_CACHE_DIRECTORY)
+
+class GeneratorIndex(contextlib.AbstractContextManager):
+
+    """ A persistent index of which generators are registered by which dynamic-link
+        libraries -- mapping each generator name to the real path of its library, and
+        the content hash (plus the size and modification time) of that library, as of
+        when the library was indexed.
+        
+        Libraries are indexed when they’re linked and first loaded by a Generators instance
+        that was given an index (q.v. the method `halogen.compile.Generators.preload_all()`)
+        by diffing the generator registry from before and after the load. Thereafter, `halogen.generate.load_generators(…)`
+        can load just the library that owns a given generator, instead of all of them.
+        
+        An entry is only good for as long as its library is unchanged: if the size or
+        modification time of the library differs from those recorded, it’s rehashed,
+        and if the hash differs as well, the entry is ignored. The index is kept as a
+        JSON file, which is re-read and merged before each write (and then atomically
+        renamed into place) so that concurrent builds don’t clobber one another’s
+        entries. Instances are safe to share between threads.
+    """
+    
+    fields = ('filename', 'length', 'exists')
+    filename = f'halogen_generators{os.extsep}json'
+    
+    def __init__(self, directory=None):
+        if not directory:
+            directory = DEFAULT_INDEX_DIRECTORY
+        self.directory = Directory(pth=directory)
+        self.target = self.directory.subpath(self.filename)
+        self.lock = threading.RLock()
+        self.entries = {}
+    
+    @property
+    def name(self):
+        return self.target
+    
+    @property
+    def exists(self):
+        return os.path.isfile(self.name)
+    
+    @property
+    def length(self):
+        return len(self.entries)
+    
+    def __len__(self):
+        return self.length
+    
+    def __contains__(self, generator):
+        return u8str(generator) in self.entries
+    
+    def __getitem__(self, generator):
+        return self.entries[u8str(generator)]
+    
+    def record(self, library, generators):
+        """ Record that the library at `library` registers the named generators --
+            replacing any entries for generators that the library no longer registers.
+        """
+        library = os.path.realpath(os.fspath(library))
+        st = os.stat(library)
+        entry = dict(library=library, digest=file_digest(library),
+                                      size=st.st_size,
+                                      mtime=st.st_mtime_ns)
+        with self.lock:
+            self.discard(library)
+            for generator in generators:
+                self.entries[u8str(generator)] = dict(entry)
+        return entry
+    
+    def discard(self, library):
+        """ Forget all of the generators registered by the library at `library` """
+        library = os.path.realpath(os.fspath(library))
+        with self.lock:
+            for generator in [generator for generator, entry in self.entries.items() \
+                                                         if entry.get('library') == library]:
+                del self.entries[generator]
+    
+    def valid(self, entry):
+        """ Determine whether or not the library named by an entry is as it was when indexed """
+        library = entry.get('library')
+        try:
+            st = os.stat(library)
+        except (TypeError, FileNotFoundError, NotADirectoryError):
+            return False
+        if st.st_size == entry.get('size') and st.st_mtime_ns == entry.get('mtime'):
+            return True
+        return file_digest(library) == entry.get('digest')
+    
+    def library_for(self, generator):
+        """ Return the path to the library that registers the named generator --
+            or None, if the generator isn’t indexed, or its library has changed.
+        """
+        with self.lock:
+            entry = self.entries.get(u8str(generator))
+        if entry is None or not self.valid(entry):
+            return None
+        return entry['library']
+    
+    def libraries_for(self, *generators):
+        """ Return a list of the paths to the libraries that register the named generators
+            -- each listed once, in the order of the generators -- omitting any generators
+            that aren’t indexed, or whose libraries have changed.
+        """
+        out = []
+        for generator in generators:
+            library = self.library_for(generator)
+            if library is not None and library not in out:
+                out.append(library)
+        return out
+    
+    def generators_for(self, library):
+        """ Return a sorted list of the generators indexed for the library at `library` """
+        library = os.path.realpath(os.fspath(library))
+        with self.lock:
+            return sorted(generator for generator, entry in self.entries.items() \
+                                                     if entry.get('library') == library)
+    
+    def load(self, pth=None):
+        """ Load and return the entries from an index file, sans merging """
+        loadpth = os.fspath(pth or self.target)
+        if not os.path.isfile(loadpth):
+            raise GeneratorIndexError(f"no generator index file from which to read: {loadpth}")
+        with open(loadpth, mode='r') as handle:
+            try:
+                entries = json.load(handle)
+            except json.JSONDecodeError as json_error:
+                raise GeneratorIndexError(str(json_error))
+        if not isinstance(entries, dict):
+            raise GeneratorIndexError(f"malformed generator index file: {loadpth}")
+        return entries
+    
+    def read(self, pth=None):
+        entries = self.load(pth)
+        with self.lock:
+            self.entries.update(entries)
+        return self
+    
+    def write(self, pth=None):
+        writepth = os.fspath(pth or self.target)
+        if os.path.isdir(writepth):
+            raise GeneratorIndexError("can't overwrite a directory")
+        if not self.directory.exists:
+            self.directory.makedirs()
+        incoming = f"{writepth}{os.extsep}{os.getpid()}{os.extsep}tmp"
+        with self.lock:
+            # Merge in whatever was written since we last read -- keeping our own
+            # entries for any library we know about, and theirs for the rest:
+            libraries = { entry.get('library') for entry in self.entries.values() }
+            try:
+                theirs = os.path.isfile(writepth) and self.load(writepth) or {}
+            except GeneratorIndexError:
+                theirs = {}
+            merged = { generator : entry for generator, entry in theirs.items() \
+                                          if entry.get('library') not in libraries }
+            merged.update(self.entries)
+            self.entries = merged
+            # Write to a temporary file alongside, then atomically rename:
+            with open(incoming, mode='w') as handle:
+                json.dump(self.entries, handle, indent=4, sort_keys=True)
+            os.replace(incoming, writepth)
+        return self
+    
+    def to_string(self):
+        return stringify(self, type(self).fields)
+    
+    def __repr__(self):
+        return stringify(self, type(self).fields)
+    
+    def __str__(self):
+        with self.lock:
+            return json.dumps(self.entries, indent=4, sort_keys=True)
+    
+    def __bool__(self):
+        return True
+    
+    def __enter__(self):
+        if self.exists:
+            self.read()
+        return self
+    
+    def __exit__(self, exc_type=None,
+                       exc_val=None,
+                       exc_tb=None):
+        self.write()
+
+
+def test():
+
+    """ Run the inline tests for the halogen.index module """
+    
+    if __package__ is None or __package__ == '':
+        from filesystem import TemporaryDirectory
+    else:
+        from .filesystem import TemporaryDirectory
+    
+    with TemporaryDirectory(prefix="test-index-", change=False) as td:
+        library = os.path.realpath(td.subpath(f"yodogg{os.extsep}so"))
+        other = os.path.realpath(td.subpath(f"other{os.extsep}so"))
+        for pth in (library, other):
+            with open(pth, mode='wb') as handle:
+                handle.write(b"yo dogg")
+        
+        with GeneratorIndex(directory=td) as index:
+            index.record(library, ('brighten', 'resize'))
+            index.record(other, ('blur',))
+            assert index.library_for('brighten') == library
+            assert index.libraries_for('resize', 'blur', 'brighten', 'nope') == [library, other]
+            assert index.generators_for(library) == ['brighten', 'resize']
+            
+            # Re-recording a library replaces its entries:
+            index.record(library, ('brighten',))
+            assert 'resize' not in index
+        
+        # Another instance writing concurrently doesn’t clobber our entries:
+        with GeneratorIndex(directory=td) as index:
+            assert len(index) == 2
+            index.record(other, ('blur', 'sharpen'))
+        with GeneratorIndex(directory=td) as index:
+            assert index.generators_for(other) == ['blur', 'sharpen']
+            assert index.library_for('brighten') == library
+        
+        # Entries for changed libraries are ignored:
+        with open(library, mode='wb') as handle:
+            handle.write(b"i heard you like generators")
+        assert GeneratorIndex(directory=td).read().library_for('brighten') is None
+    print("* Generator index tests completed OK")
+
+if __name__ == '__main__':
+    test()
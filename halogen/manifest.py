@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function
+
+import contextlib
+import json
+import os
+import threading
+
+if __package__ is None or __package__ == '':
+    from errors import ManifestError
+    from filesystem import Directory
+    from ocd import OCDList
+    from utils import stringify
+else:
+    from .errors import ManifestError
+    from .filesystem import Directory
+    from .ocd import OCDList
+    from .utils import stringify
+
+__all__ = ('DEPFILE_SUFFIX',
+           'parse_depfile',
+           'BuildManifest')
+
+__dir__ = lambda: list(__all__)
+
+DEPFILE_SUFFIX = f"{os.extsep}d"
+
+def parse_depfile(pth, directory=None):
+    """ Parse a Make-style dependency file -- as written by a compiler invoked
+        with `-MD -MF <pth>` -- returning a list of the dependencies it names.
+        
+        Relative dependency paths are resolved against `directory` (which should
+        be the working directory of the compiler invocation that wrote the file),
+        or the directory containing the depfile, if `directory` is unspecified.
+    """
+    pth = os.fspath(pth)
+    if not os.path.isfile(pth):
+        raise ManifestError(f"can't find a dependency file: {pth}")
+    directory = os.fspath(directory or os.path.dirname(pth))
+    with open(pth, mode='r') as handle:
+        contents = handle.read()
+    
+    # Join escaped line continuations, then tokenize -- honoring
+    # backslash-escaped spaces, which may appear within paths:
+    contents = contents.replace("\\\r\n", " ").replace("\\\n", " ")
+    tokens, token, escaped = [], [], False
+    for character in contents:
+        if escaped:
+            if character not in " #\\":
+                token.append("\\")
+            token.append(character)
+            escaped = False
+        elif character == "\\":
+            escaped = True
+        elif character.isspace():
+            if token:
+                tokens.append("".join(token))
+                token = []
+        else:
+            token.append(character)
+    if token:
+        tokens.append("".join(token))
+    
+    # Everything up to and including the first token that ends in a colon
+    # is a rule target; everything thereafter is a dependency, up until any
+    # phony targets (from `-MP`) which we also skip:
+    dependencies = OCDList()
+    in_targets = True
+    for token in tokens:
+        token = token.replace("$$", "$")
+        if token.endswith(":"):
+            in_targets = False
+            continue
+        if in_targets:
+            continue
+        dependency = os.path.normpath(os.path.join(directory, token))
+        if dependency not in dependencies:
+            dependencies.append(dependency)
+    return dependencies
+
+def mtime(pth):
+    """ Return the modification time of a file in nanoseconds, or None if the file is AWOL """
+    try:
+        return os.stat(pth).st_mtime_ns
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+class BuildManifest(contextlib.AbstractContextManager):
+
+    """ A record of what went into each of the artifacts of an incremental build.
+        
+        For each artifact -- the object code compiled from a generator source, or
+        a library linked or archived from those objects -- the manifest records
+        the command (sans any transient filenames) that produced it, and the
+        modification times of all of its inputs (as gleaned from the depfile the
+        compiler writes, in the case of object code). An artifact is stale, and
+        needs rebuilding, if it’s missing, if its command has changed, or if any
+        of its inputs have been modified, moved, or deleted since it was built.
+        
+        The manifest lives as a JSON file alongside the compilation database, in
+        the intermediate directory of a halogen.compile.Generators instance.
+        Instances are safe to share between threads.
+    """
+    
+    fields = ('filename', 'length', 'exists')
+    filename = f'halogen_manifest{os.extsep}json'
+    
+    @classmethod
+    def in_directory(cls, directory):
+        return cls.filename in Directory(pth=directory)
+    
+    def __init__(self, directory=None):
+        if not directory:
+            directory = os.getcwd()
+        self.directory = Directory(pth=directory)
+        self.target = self.directory.subpath(self.filename)
+        self.lock = threading.RLock()
+        self.entries = {}
+    
+    @property
+    def name(self):
+        return self.target
+    
+    @property
+    def exists(self):
+        return os.path.isfile(self.name)
+    
+    @property
+    def length(self):
+        return len(self.entries)
+    
+    def __len__(self):
+        return self.length
+    
+    def __contains__(self, key):
+        return os.fspath(key) in self.entries
+    
+    def __getitem__(self, key):
+        return self.entries[os.fspath(key)]
+    
+    def record(self, key, output, command, inputs):
+        """ Record the command that produced `output`, and the current modification
+            times of its inputs, under `key` (typically the source filename, for
+            object code, or the output filename itself, for libraries).
+        """
+        entry = dict(output=os.fspath(output),
+                     command=command,
+                     inputs={ os.fspath(inpt) : mtime(inpt) for inpt in inputs })
+        with self.lock:
+            self.entries[os.fspath(key)] = entry
+        return entry
+    
+    def discard(self, key):
+        """ Forget the entry recorded under `key`, if there is one """
+        with self.lock:
+            return self.entries.pop(os.fspath(key), None)
+    
+    def stale(self, key, output, command):
+        """ Determine whether or not the artifact recorded under `key` needs rebuilding """
+        with self.lock:
+            entry = self.entries.get(os.fspath(key))
+        if entry is None:
+            return True
+        if entry.get('output') != os.fspath(output):
+            return True
+        if not os.path.isfile(output):
+            return True
+        if entry.get('command') != command:
+            return True
+        for inpt, recorded in entry.get('inputs', {}).items():
+            current = mtime(inpt)
+            if current is None or current != recorded:
+                return True
+        return False
+    
+    def read(self, pth=None):
+        readpth = os.fspath(pth or self.target)
+        if not os.path.isfile(readpth):
+            raise ManifestError(f"no manifest file from which to read: {readpth}")
+        with open(readpth, mode='r') as handle:
+            try:
+                entries = json.load(handle)
+            except json.JSONDecodeError as json_error:
+                raise ManifestError(str(json_error))
+        if not isinstance(entries, dict):
+            raise ManifestError(f"malformed manifest file: {readpth}")
+        with self.lock:
+            self.entries.update(entries)
+        return self
+    
+    def write(self, pth=None):
+        writepth = os.fspath(pth or self.target)
+        if os.path.isdir(writepth):
+            raise ManifestError("can't overwrite a directory")
+        # Write to a temporary file alongside, then atomically rename:
+        incoming = f"{writepth}{os.extsep}{os.getpid()}{os.extsep}tmp"
+        with self.lock:
+            with open(incoming, mode='w') as handle:
+                json.dump(self.entries, handle, indent=4, sort_keys=True)
+            os.replace(incoming, writepth)
+        return self
+    
+    def to_string(self):
+        return stringify(self, type(self).fields)
+    
+    def __repr__(self):
+        return stringify(self, type(self).fields)
+    
+    def __str__(self):
+        with self.lock:
+            return json.dumps(self.entries, indent=4, sort_keys=True)
+    
+    def __bool__(self):
+        return True
+    
+    def __enter__(self):
+        if self.exists:
+            self.read()
+        return self
+    
+    def __exit__(self, exc_type=None,
+                       exc_val=None,
+                       exc_tb=None):
+        self.write()
+
+
+def test():
+
+    """ Run the inline tests for the halogen.manifest module """
+    
+    if __package__ is None or __package__ == '':
+        from filesystem import TemporaryDirectory
+    else:
+        from .filesystem import TemporaryDirectory
+    
+    with TemporaryDirectory(prefix="test-manifest-", change=False) as td:
+        header = td.subpath(f"yodogg{os.extsep}h")
+        source = td.subpath(f"yodogg{os.extsep}cpp")
+        output = td.subpath(f"yodogg{os.extsep}o")
+        depfile = td.subpath(f"yodogg{os.extsep}d")
+        for pth in (header, source, output):
+            with open(pth, mode='w') as handle:
+                handle.write("// yo dogg\n")
+        with open(depfile, mode='w') as handle:
+            handle.write(f"yodogg.o: yodogg.cpp \\\n  {header}\n")
+        
+        dependencies = parse_depfile(depfile)
+        assert len(dependencies) == 2
+        assert source in dependencies
+        assert header in dependencies
+        
+        with BuildManifest(directory=td) as manifest:
+            assert manifest.stale(source, output, "c++ -c")
+            manifest.record(source, output, "c++ -c", dependencies)
+            assert not manifest.stale(source, output, "c++ -c")
+            assert manifest.stale(source, output, "c++ -O3 -c")
+            os.utime(header, ns=(0, 0))
+            assert manifest.stale(source, output, "c++ -c")
+        
+        assert BuildManifest.in_directory(td)
+        with BuildManifest(directory=td) as manifest:
+            assert len(manifest) == 1
+            assert source in manifest
+        print("* Manifest tests completed OK")
+
+if __name__ == '__main__':
+    test()
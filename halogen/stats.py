@@ -0,0 +1,314 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function
+
+import contextlib
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+if __package__ is None or __package__ == '':
+    from utils import stringify
+else:
+    from .utils import stringify
+
+__all__ = ('cpu_times', 'peak_rss',
+           'Measurement',
+           'BuildStats',
+           'measured')
+
+__dir__ = lambda: list(__all__)
+
+# N.B. `ru_maxrss` is in kilobytes on Linux and in bytes on Mac OS X:
+RSS_SCALE = sys.platform == 'darwin' and 1 or 1024
+
+def cpu_times():
+    """ Return a tuple of the CPU time, in seconds (user plus system), consumed
+        thus far by this process and by its terminated, waited-upon child processes --
+        (0.0, 0.0) on platforms lacking the `resource` module.
+    """
+    if resource is None:
+        return 0.0, 0.0
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (own.ru_utime + own.ru_stime), \
+           (children.ru_utime + children.ru_stime)
+
+def peak_rss():
+    """ Return a tuple of the peak resident set sizes, in bytes, of this process and of
+        the largest of its terminated, waited-upon child processes -- these are high-water
+        marks, so they only ever go up. Returns (0, 0) sans the `resource` module.
+    """
+    if resource is None:
+        return 0, 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * RSS_SCALE, \
+           resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * RSS_SCALE
+
+class Measurement(object):
+
+    """ The wall time, CPU time and peak RSS figures for one measured span of a build --
+        one phase of a Generators pipeline, say, or the compilation of a single source.
+        
+        CPU times are taken as the difference in `getrusage(…)` values from the start of
+        the span to its end: `cpu` for this process and `children_cpu` for subprocesses
+        (compilers, linkers, archivers &c.) -- so, as children are only counted once they
+        are waited upon, spans that overlap one another (e.g. per-source compilations run
+        concurrently) will each include some of the CPU time of the others’ children.
+        The `peak_rss` and `children_peak_rss` values are the high-water marks as of the
+        end of the span, in bytes. Anything else of note (e.g. whether or not there was a
+        cache hit) is kept in the `args` dict.
+    """
+    
+    __slots__ = ('name', 'category',
+                 'start', 'wall',
+                 'cpu', 'children_cpu',
+                 'peak_rss', 'children_peak_rss',
+                 'thread', 'args')
+    
+    def __init__(self, name, category, start, wall=0.0, cpu=0.0, children_cpu=0.0,
+                                                       peak_rss=0, children_peak_rss=0,
+                                                       thread=None, args=None):
+        self.name = str(name)
+        self.category = str(category)
+        self.start = float(start)
+        self.wall = float(wall)
+        self.cpu = float(cpu)
+        self.children_cpu = float(children_cpu)
+        self.peak_rss = int(peak_rss)
+        self.children_peak_rss = int(children_peak_rss)
+        self.thread = thread or threading.get_ident()
+        self.args = dict(args or {})
+    
+    def to_dict(self):
+        """ Return the measurement as a JSON-friendly dict """
+        return { field : getattr(self, field) for field in type(self).__slots__ }
+    
+    def trace_event(self, origin=0.0):
+        """ Return the measurement as a Chrome trace-event “complete” event dict, with
+            timestamps in microseconds relative to `origin` (q.v. the “Trace Event Format” doc)
+        """
+        args = dict(self.args)
+        args.update(cpu=self.cpu, children_cpu=self.children_cpu,
+                    peak_rss=self.peak_rss,
+                    children_peak_rss=self.children_peak_rss)
+        return { 'name' : self.name,
+                  'cat' : self.category,
+                   'ph' : 'X',
+                   'ts' : (self.start - origin) * 1e6,
+                  'dur' : self.wall * 1e6,
+                  'pid' : os.getpid(),
+                  'tid' : self.thread,
+                 'args' : args }
+    
+    def __repr__(self):
+        return stringify(self, type(self).__slots__)
+
+
+class BuildStats(object):
+
+    """ A thread-safe collection of Measurements, gathered by way of the `measure(…)`
+        context manager -- as in:
+            
+            stats = BuildStats()
+            with stats.measure('link', category='phase') as args:
+                link_everything()
+                args['libraries'] = 1
+        
+        … the measurements can be summarized with `report()`, or written out as
+        Chrome trace-event JSON with `write_trace(…)` -- load the latter file with
+        chrome://tracing (or https://ui.perfetto.dev) to see where the time went.
+    """
+    
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.measurements = []
+        self.lock = threading.Lock()
+    
+    @contextlib.contextmanager
+    def measure(self, name, category='phase', **args):
+        """ Measure the span of the managed block, yielding a dict of arguments that the
+            block may amend -- the measurement is recorded even if the block raises, in
+            which case the exception’s type name is recorded in the arguments, as “error”.
+        """
+        cpu, children_cpu = cpu_times()
+        start = time.perf_counter()
+        try:
+            yield args
+        except BaseException as exc:
+            args['error'] = type(exc).__name__
+            raise
+        finally:
+            wall = time.perf_counter() - start
+            cpu_end, children_cpu_end = cpu_times()
+            rss, children_rss = peak_rss()
+            self.record(Measurement(name, category, start, wall=wall,
+                                                           cpu=cpu_end - cpu,
+                                                           children_cpu=children_cpu_end - children_cpu,
+                                                           peak_rss=rss,
+                                                           children_peak_rss=children_rss,
+                                                           args=args))
+    
+    def record(self, measurement):
+        """ Record a Measurement instance, returning it """
+        with self.lock:
+            self.measurements.append(measurement)
+        return measurement
+    
+    def clear(self):
+        """ Forget all recorded measurements """
+        with self.lock:
+            self.measurements.clear()
+    
+    def category(self, category):
+        """ Return a dict of the named measurements in a given category --
+            per name, the last such measurement to have been recorded
+        """
+        with self.lock:
+            return { measurement.name : measurement for measurement in self.measurements \
+                                                    if measurement.category == category }
+    
+    @property
+    def phases(self):
+        """ A dict of pipeline phase measurements, keyed by phase name """
+        return self.category('phase')
+    
+    @property
+    def sources(self):
+        """ A dict of per-source compilation measurements, keyed by source name """
+        return self.category('source')
+    
+    @property
+    def total(self):
+        """ The total wall time, in seconds, of all the phases measured """
+        return sum(measurement.wall for measurement in self.phases.values())
+    
+    def to_dict(self):
+        """ Return all of the measurements as a JSON-friendly dict """
+        with self.lock:
+            return { 'measurements' : [measurement.to_dict() for measurement in self.measurements] }
+    
+    def trace(self):
+        """ Return all of the measurements as a Chrome trace-event JSON-friendly dict """
+        with self.lock:
+            events = [measurement.trace_event(self.origin) for measurement in self.measurements]
+        return { 'traceEvents' : sorted(events, key=lambda event: event['ts']),
+                 'displayTimeUnit' : 'ms' }
+    
+    def write_trace(self, pth):
+        """ Atomically write out the measurements as Chrome trace-event JSON """
+        pth = os.fspath(pth)
+        incoming = f"{pth}{os.extsep}{os.getpid()}{os.extsep}tmp"
+        with open(incoming, mode='w') as handle:
+            json.dump(self.trace(), handle, indent=4)
+        os.replace(incoming, pth)
+        return pth
+    
+    def report(self):
+        """ Return a summary of the phase measurements as a string -- plus a count of
+            the per-source measurements that were cache hits, if there are any such
+        """
+        lines = []
+        for name, measurement in self.phases.items():
+            lines.append(f"{name:>14}: {measurement.wall:8.3f}s wall, "
+                                     f"{measurement.cpu:8.3f}s CPU, "
+                                     f"{measurement.children_cpu:8.3f}s subprocess CPU, "
+                                     f"{measurement.children_peak_rss / 2 ** 20:8.1f}MiB peak subprocess RSS")
+        sources = self.sources
+        if len(sources) > 0:
+            hits = sum(1 for measurement in sources.values() if measurement.args.get('cache_hit'))
+            slowest = max(sources.values(), key=lambda measurement: measurement.wall)
+            lines.append(f"{'sources':>14}: {len(sources)} compiled, {hits} cache hits, "
+                         f"slowest: {slowest.name} ({slowest.wall:.3f}s)")
+        return "\n".join(lines)
+    
+    def __len__(self):
+        return len(self.measurements)
+    
+    def __repr__(self):
+        return stringify(self, ('origin', 'measurements'))
+
+
+def measured(phase):
+    """ Decorate a method -- or a coroutine method -- of an instance with a `stats` attribute
+        (a BuildStats instance) such that each call is measured, as a named phase.
+    """
+    def decorator(method):
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def measured_coroutine(self, *args, **kwargs):
+                with self.stats.measure(phase, category='phase'):
+                    return await method(self, *args, **kwargs)
+            return measured_coroutine
+        
+        @functools.wraps(method)
+        def measured_method(self, *args, **kwargs):
+            with self.stats.measure(phase, category='phase'):
+                return method(self, *args, **kwargs)
+        return measured_method
+    return decorator
+
+def test():
+
+    """ Run the inline tests for the halogen.stats module """
+    
+    if __package__ is None or __package__ == '':
+        from filesystem import back_tick, TemporaryDirectory
+    else:
+        from .filesystem import back_tick, TemporaryDirectory
+    
+    class Pipeline(object):
+        
+        def __init__(self):
+            self.stats = BuildStats()
+        
+        @measured('compile')
+        def compile(self):
+            with self.stats.measure('yodogg.cpp', category='source') as args:
+                back_tick("sleep 0.05")
+                args['cache_hit'] = False
+            with self.stats.measure('iheard.cpp', category='source') as args:
+                args['cache_hit'] = True
+            return True
+        
+        @measured('link')
+        def link(self):
+            raise ValueError("I heard you like linkers")
+    
+    pipeline = Pipeline()
+    assert pipeline.compile()
+    try:
+        pipeline.link()
+    except ValueError:
+        pass
+    else:
+        assert False, "measured phase didn’t raise"
+    
+    stats = pipeline.stats
+    assert len(stats) == 4
+    assert tuple(stats.phases.keys()) == ('compile', 'link')
+    assert stats.phases['compile'].wall >= stats.sources['yodogg.cpp'].wall >= 0.05
+    assert stats.phases['link'].args['error'] == 'ValueError'
+    assert stats.sources['iheard.cpp'].args['cache_hit']
+    assert "1 cache hits" in stats.report()
+    
+    with TemporaryDirectory(prefix="test-stats-", change=False) as td:
+        trace = stats.write_trace(td.subpath(f"trace{os.extsep}json"))
+        with open(trace, mode='r') as handle:
+            events = json.load(handle)['traceEvents']
+        assert len(events) == 4
+        assert all(event['ph'] == 'X' for event in events)
+        assert [event['ts'] for event in events] == sorted(event['ts'] for event in events)
+    print("* Build stats tests completed OK")
+
+if __name__ == '__main__':
+    test()
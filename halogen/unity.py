@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function
+
+import collections
+import json
+import os
+import re
+
+if __package__ is None or __package__ == '':
+    from errors import HalogenError
+    from filesystem import Directory
+    from ocd import OCDList
+else:
+    from .errors import HalogenError
+    from .filesystem import Directory
+    from .ocd import OCDList
+
+__all__ = ('unity_symbols',
+           'unity_batches',
+           'write_jumbo',
+           'read_timings', 'write_timings')
+
+__dir__ = lambda: list(__all__)
+
+# Comments and string/character literals, which we blank out before scanning:
+comments_and_literals = re.compile(r'//[^\n]*|/\*.*?\*/|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'',
+                                   re.DOTALL)
+
+# Preprocessor directives -- including any escaped line continuations:
+directives = re.compile(r'^[ \t]*#(?:[^\n]*\\\n)*[^\n]*$', re.MULTILINE)
+macro_definition = re.compile(r'^[ \t]*#[ \t]*define[ \t]+(\w+)')
+
+# Braces, and the namespace declarations that open some of them:
+scope_token = re.compile(r'\bnamespace(?:\s+(\w+(?:\s*::\s*\w+)*))?\s*\{|[{}]')
+
+# The name declared by a namespace-scope declaration -- the first identifier
+# followed by an opening parenthesis, an initializer, an array bound, a base
+# clause, or the end of the declaration (but not a scope-resolution operator):
+declared_name = re.compile(r'(?<![:\w])([A-Za-z_]\w*)\s*(?:\(|=|\[|:(?!:)|$)')
+
+# All-caps identifiers followed by a parenthesis are assumed to be macro invocations
+# (e.g. HALIDE_REGISTER_GENERATOR(…)) rather than function declarations:
+macro_invocation = re.compile(r'^[A-Z_][A-Z0-9_]*$')
+
+keywords = frozenset(('alignas', 'const', 'constexpr', 'decltype', 'explicit',
+                      'extern', 'final', 'inline', 'noexcept', 'operator',
+                      'override', 'sizeof', 'static', 'static_assert',
+                      'template', 'typename', 'virtual', 'volatile'))
+
+def unity_symbols(source):
+    """ Scan a C++ source file for the names it declares at namespace scope (including
+        any anonymous namespaces), plus the names of any macros it defines, returning
+        them as a frozenset of strings -- each name qualified by its enclosing named
+        namespaces, as in “halogen::yodogg”.
+        
+        Two sources that share any of these names can’t safely be merged into one
+        jumbo translation unit: all anonymous namespaces and `static` definitions in a
+        jumbo file share the same scope, so what were separate file-local definitions
+        will collide. This is a heuristic scan, not a parse -- it errs on the side of
+        reporting too many names, which only means sources get compiled standalone.
+    """
+    with open(os.fspath(source), mode='r', errors='replace') as handle:
+        text = handle.read()
+    text = comments_and_literals.sub(" ", text)
+    symbols = set(f"#{match.group(1)}" for match in map(macro_definition.match,
+                                                        directives.findall(text)) if match)
+    text = directives.sub(" ", text)
+    
+    # Gather the text at namespace scope, by way of tracking scopes as they
+    # open and close -- text within any other kind of brace is skipped:
+    stack = []
+    segments = []
+    position = 0
+    for match in scope_token.finditer(text):
+        if 'block' not in stack:
+            namespace = "::".join(name for name in stack if name)
+            segments.append((namespace, text[position:match.start()]))
+        token = match.group(0)
+        if token == '}':
+            if stack:
+                stack.pop()
+        elif token == '{':
+            stack.append('block')
+        else:
+            stack.append(re.sub(r'\s+', '', match.group(1) or ''))
+        position = match.end()
+    if 'block' not in stack:
+        segments.append(("::".join(name for name in stack if name), text[position:]))
+    
+    for namespace, segment in segments:
+        for declaration in segment.split(';'):
+            declaration = " ".join(declaration.split())
+            if not declaration or declaration.startswith('using') and '=' not in declaration:
+                continue
+            for name in declared_name.findall(declaration):
+                if name in keywords:
+                    continue
+                if macro_invocation.match(name) and f"{name}(" in declaration.replace(" (", "("):
+                    break
+                symbols.add(namespace and f"{namespace}::{name}" or name)
+                break
+    return frozenset(symbols)
+
+def unity_batches(sources, size):
+    """ Divvy up a list of C++ source files into batches of up to `size` sources apiece,
+        for merging into jumbo translation units -- returning a tuple containing a list of
+        batches (each a tuple of sources) and a list of those sources that must instead be
+        compiled standalone (because they share namespace-scope names with other sources,
+        q.v. `unity_symbols(…)` supra, or because they couldn’t be scanned at all).
+    """
+    size = int(size)
+    if size < 2:
+        raise HalogenError(f"unity batches must contain 2 or more sources (not {size})")
+    symbols = {}
+    standalone = OCDList()
+    for source in sources:
+        try:
+            symbols[source] = unity_symbols(source)
+        except (OSError, IOError):
+            standalone.append(source)
+    counts = collections.Counter(symbol for names in symbols.values() for symbol in names)
+    mergeable = []
+    for source in sources:
+        if source not in symbols:
+            continue
+        if any(counts[symbol] > 1 for symbol in symbols[source]):
+            standalone.append(source)
+        else:
+            mergeable.append(source)
+    batches = [tuple(mergeable[idx:idx + size]) for idx in range(0, len(mergeable), size)]
+    if batches and len(batches[-1]) < 2:
+        standalone.extend(batches.pop())
+    return batches, standalone
+
+def write_jumbo(pth, sources):
+    """ Write out a jumbo translation unit, which includes each of the sources in turn """
+    pth = os.fspath(pth)
+    with open(pth, mode='w') as handle:
+        handle.write("// Jumbo translation unit generated by halogen.unity -- do not edit\n")
+        for source in sources:
+            handle.write(f"#include \"{os.path.realpath(os.fspath(source))}\"\n")
+    return pth
+
+timings_filename = f'compile_timings{os.extsep}json'
+
+def read_timings(directory):
+    """ Read the compile timings recorded in a directory (if any) into a dict """
+    pth = Directory(pth=directory).subpath(timings_filename)
+    try:
+        with open(pth, mode='r') as handle:
+            return dict(json.load(handle))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def write_timings(directory, timings):
+    """ Atomically write out compile timings, as a dict, to a directory """
+    pth = Directory(pth=directory).subpath(timings_filename)
+    incoming = f"{pth}{os.extsep}{os.getpid()}{os.extsep}tmp"
+    with open(incoming, mode='w') as handle:
+        json.dump(timings, handle, indent=4, sort_keys=True)
+    os.replace(incoming, pth)
+    return pth
+
+def test():
+
+    """ Run the inline tests for the halogen.unity module """
+    
+    if __package__ is None or __package__ == '':
+        from filesystem import TemporaryDirectory
+    else:
+        from .filesystem import TemporaryDirectory
+    
+    sources = {
+        'one' : """
+            #include "Halide.h"
+            using namespace Halide;
+            namespace {
+                class YoDogg : public Generator<YoDogg> { public: void generate() {} };
+                static int helper(int x) { return x; }
+            }
+            HALIDE_REGISTER_GENERATOR(YoDogg, yodogg)
+        """,
+        'two' : """
+            #include "Halide.h"
+            namespace {
+                class YoDogg : public Halide::Generator<YoDogg> { public: void generate() {} };
+            }
+            HALIDE_REGISTER_GENERATOR(YoDogg, yodogg_two)
+        """,
+        'three' : """
+            #include "Halide.h"
+            namespace halogen { std::vector<int> yodogg = { 1, 2, 3 }; }
+        """,
+        'four' : """
+            #define I_HEARD_YOU_LIKE 1
+            int like_functions(int x) { return x; }
+        """
+    }
+    
+    with TemporaryDirectory(prefix="test-unity-", change=False) as td:
+        paths = OCDList()
+        for name, text in sources.items():
+            pth = td.subpath(f"{name}{os.extsep}cpp")
+            with open(pth, mode='w') as handle:
+                handle.write(text)
+            paths.append(pth)
+        four, one, three, two = paths
+        
+        assert unity_symbols(one) == frozenset(('YoDogg', 'helper'))
+        assert unity_symbols(three) == frozenset(('halogen::yodogg',))
+        assert unity_symbols(four) == frozenset(('#I_HEARD_YOU_LIKE', 'like_functions'))
+        
+        batches, standalone = unity_batches(paths, 4)
+        assert batches == [(four, three)]
+        assert one in standalone
+        assert two in standalone
+        
+        jumbo = write_jumbo(td.subpath(f"jumbo{os.extsep}cpp"), batches[0])
+        assert os.path.isfile(jumbo)
+        
+        write_timings(td, { 'yo' : { 'dogg' : 1.0 } })
+        assert read_timings(td)['yo']['dogg'] == 1.0
+        print("* Unity tests completed OK")
+
+if __name__ == '__main__':
+    test()
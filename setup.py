@@ -61,7 +61,7 @@ classifiers = [
     'License :: OSI Approved :: MIT License']
 
 api_extension_sources = [os.path.join('halogen', 'api.pyx')]
-haldol_source_names = ('detail.cc', 'gil.cc', 'structcode.cc', 'terminal.cc', 'typecode.cc')
+haldol_source_names = ('detail.cc', 'gil.cc', 'jit.cc', 'multitarget.cc', 'structcode.cc', 'terminal.cc', 'typecode.cc')
 haldol_sources = [os.path.join('haldol', source) for source in haldol_source_names]
 
 halogen_base_path = os.path.abspath(os.path.dirname('halogen'))
@@ -100,6 +100,13 @@ setup(name='halide-halogen',
         'halogen'   : 'halogen'
     },
     package_data=dict(),
+    entry_points={
+        'console_scripts' : [
+            'halogen = halogen.cli:main',
+            'halogen-daemon = halogen.daemon:main',
+            'halogen-client = halogen.client:main'
+        ]
+    },
     test_suite='nose.collector',
     ext_modules=cythonize([                 # type: ignore
         Extension('halogen.api',            # type: ignore
@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for the halogen compile/link/generate pipeline -- written asv-style, as classes
+whose `time_*` methods are timed (over a number of repeats, all preceded by one call to the
+class’ `setup(…)` method and followed by one call to `teardown(…)`, if it has them) and whose
+`track_*` methods return a value that is recorded as-is. Classes with `params` run each benchmark once per parameter value.
+
+The generator sources used are those in tests/generators, plus the inline sources from the
+halogen.test_generators module. Results are appended to a JSON file, along with the commit,
+host and interpreter they came from -- pass --compare to compare them with the previous run.
+
+Usage:
+  benchmark.py [-r N | --repeat=N] [-o FILE | --output=FILE]
+               [-k PATTERN...] [--compare] [-V | --verbose]
+  benchmark.py --list
+  benchmark.py -h | --help
+
+Options:
+  -r N, --repeat=N              number of samples to take for each timing [default: 5].
+  -o FILE, --output=FILE        JSON file to which results are appended [default: benchmarks.json].
+  -k PATTERN                    only run benchmarks whose names match these glob patterns.
+  --compare                     compare the results with those of the previous run.
+  --list                        list the benchmark names, and exit.
+  -V, --verbose                 print verbose output.
+  -h, --help                    show this text.
+
+"""
+from __future__ import print_function
+
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from docopt import docopt # type: ignore
+
+whereat = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+sys.path.append(whereat)
+
+from halogen.filesystem import back_tick, Directory, TemporaryDirectory
+from halogen.ocd import OCDList
+
+# Regressions are flagged when a benchmark is slower than in the previous run by this ratio:
+REGRESSION_THRESHOLD = 1.1
+
+GENERATOR_DIRECTORY = os.path.join(whereat, 'tests', 'generators')
+
+class Session(object):
+
+    """ State shared across all benchmarks in a run: a scratch directory, the directory of
+        inline generator sources, and the library of generators compiled from tests/generators
+        -- which is built and preloaded once only, as the generators it registers can’t be
+        registered twice in one process. The preload is timed, as it can’t be repeated.
+    """
+    
+    def __init__(self):
+        self.scratch = TemporaryDirectory(prefix='halogen-benchmark-', change=False)
+        self.generators = None
+        self.preload_time = None
+        self._inline = None
+    
+    @property
+    def inline(self):
+        """ A directory containing the inline generator sources """
+        from halogen import test_generators
+        if self._inline is None:
+            self._inline = self.scratch.subdirectory('inline')
+            self._inline.makedirs()
+            for name in test_generators.__all__:
+                with open(self._inline.subpath(f"{name}{os.extsep}cpp"), mode='wb') as handle:
+                    handle.write(getattr(test_generators, name))
+        return self._inline
+    
+    def directory(self, sources):
+        """ Return the generator source directory for a benchmark parameter """
+        return sources == 'inline' and self.inline or Directory(GENERATOR_DIRECTORY)
+    
+    def library(self):
+        """ Build (if need be) and preload the tests/generators library """
+        from halogen.compile import CONF, Generators
+        from halogen.generate import preload
+        if self.generators is None:
+            self.generators = Generators(CONF, destination=self.scratch.subdirectory('library'),
+                                               directory=GENERATOR_DIRECTORY,
+                                               intermediate=self.scratch.subdirectory('library-intermediate'),
+                                               do_static=False,
+                                               do_preload=False,
+                                               verbose=False)
+            self.generators.__enter__()
+            started = time.perf_counter()
+            preload(self.generators.library)
+            self.preload_time = time.perf_counter() - started
+            self.generators.preload_all()
+        return self.generators
+    
+    def close(self):
+        if self.generators is not None:
+            self.generators.__exit__()
+        self.scratch.close()
+
+session = None
+
+# THE BENCHMARKS:
+
+class ConfigFlags(object):
+
+    """ Computing the compiler and linker flags with the default ConfigUnion -- cold, with
+        the config’s flag memos and the system-probe cache emptied, and warm, with both full.
+    """
+    
+    def setup(self):
+        from halogen.compile import CONF
+        self.conf = CONF
+        self.flags()
+    
+    def flags(self):
+        return (self.conf.get_cflags(), self.conf.get_ldflags(),
+                self.conf.cxx_flag_string("<output>", "<input>"),
+                self.conf.ld_flag_string("<output>", "<input>"))
+    
+    def time_union_flags_cold(self):
+        from halogen import config
+        probes = dict(config.probe_cache.entries)
+        config.probe_cache.entries.clear()
+        self.conf.invalidate()
+        try:
+            self.flags()
+        finally:
+            config.probe_cache.entries.update(probes)
+    
+    def time_union_flags_warm(self):
+        self.flags()
+
+
+class Build(object):
+
+    """ Compiling and dynamically linking a Generators library -- cold, with no caches; warm,
+        from a primed object cache; and incremental, with none of the object code gone stale.
+    """
+    
+    params = ('generators', 'inline')
+    
+    def setup(self, sources):
+        self.directory = session.directory(sources)
+        self.workspace = TemporaryDirectory(prefix='build-', parent=session.scratch.name,
+                                                             change=False)
+    
+    def teardown(self, sources):
+        self.workspace.close()
+    
+    def build(self, destination=None, **kwargs):
+        from halogen.compile import CONF, Generators
+        if destination is not None:
+            with Generators(CONF, destination=destination,
+                                  directory=self.directory,
+                                  do_static=False,
+                                  do_preload=False,
+                                  verbose=False, **kwargs) as gens:
+                return gens.linked
+        with TemporaryDirectory(prefix='destination-', parent=self.workspace.name,
+                                                       change=False) as destination:
+            return self.build(destination=destination.name, **kwargs)
+    
+    def time_cold(self, sources):
+        self.build()
+    
+    def time_warm_object_cache(self, sources):
+        # N.B. the first sample primes the cache -- the median is what to go by:
+        self.build(cache=self.workspace.subdirectory('cache'))
+    
+    def time_warm_incremental(self, sources):
+        # N.B. the first sample is a full build -- the median is what to go by:
+        self.build(destination=self.workspace.subdirectory('destination'),
+                   intermediate=self.workspace.subdirectory('intermediate'),
+                   incremental=True)
+
+
+class Generate(object):
+
+    """ Running all of the tests/generators generators with `generate(…)`, per set of emits """
+    
+    params = ('default', 'expanded', 'o', 'stmt_html')
+    
+    def setup(self, emits):
+        from halogen.compile import Generators
+        self.generators = session.library()
+        self.emits = Generators.emits.get(emits, (emits,))
+        self.output = TemporaryDirectory(prefix='generate-', parent=session.scratch.name,
+                                                             change=False)
+    
+    def teardown(self, emits):
+        self.output.close()
+    
+    def time_generate(self, emits):
+        from halogen.generate import generate
+        generate(*self.generators.loaded_generators(), target='host',
+                                                       emit=tuple(self.emits),
+                                                       output_directory=self.output.name,
+                                                       errors={},
+                                                       verbose=False)
+
+
+class Registry(object):
+
+    """ Preloading the tests/generators library, and listing the registered generators """
+    
+    def setup(self):
+        self.generators = session.library()
+    
+    def track_preload_cold(self):
+        return session.preload_time
+    
+    def time_preload_loaded(self):
+        from halogen.generate import preload
+        preload(self.generators.library)
+    
+    def time_registered_generators(self):
+        from halogen import api # type: ignore
+        api.registered_generators()
+    
+    def time_registered_generators_invalidated(self):
+        from halogen import api # type: ignore
+        api.invalidate_registry()
+        api.registered_generators()
+
+
+benchmarks = (ConfigFlags, Build, Generate, Registry)
+
+# THE RUNNER:
+
+def benchmark_names():
+    """ Yield a tuple of (name, class, method name, parameter) for each benchmark """
+    for cls in benchmarks:
+        for parameter in getattr(cls, 'params', (None,)):
+            for method in sorted(dir(cls)):
+                if method.startswith(('time_', 'track_')):
+                    name = f"{cls.__name__}.{method}"
+                    if parameter is not None:
+                        name += f"({parameter})"
+                    yield name, cls, method, parameter
+
+def run_benchmark(cls, method, parameter, repeat):
+    """ Run one benchmark, returning a dict of its samples and their statistics """
+    args = parameter is not None and (parameter,) or tuple()
+    instance = cls()
+    samples = []
+    if hasattr(instance, 'setup'):
+        instance.setup(*args)
+    try:
+        for idx in range(method.startswith('time_') and repeat or 1):
+            started = time.perf_counter()
+            value = getattr(instance, method)(*args)
+            elapsed = time.perf_counter() - started
+            samples.append(method.startswith('time_') and elapsed or float(value))
+    finally:
+        if hasattr(instance, 'teardown'):
+            instance.teardown(*args)
+    return dict(samples=samples, min=min(samples),
+                                 median=statistics.median(samples),
+                                 mean=statistics.mean(samples),
+                                 stdev=len(samples) > 1 and statistics.stdev(samples) or 0.0)
+
+def commit():
+    """ Return the current git commit hash, if there is one """
+    try:
+        return back_tick("git rev-parse HEAD", directory=whereat)
+    except Exception:
+        return None
+
+def read_runs(pth):
+    """ Read the list of previous runs from a results file """
+    try:
+        with open(pth, mode='r') as handle:
+            return list(json.load(handle))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+
+def write_runs(pth, runs):
+    """ Atomically write out a list of runs to a results file """
+    incoming = f"{pth}{os.extsep}{os.getpid()}{os.extsep}tmp"
+    with open(incoming, mode='w') as handle:
+        json.dump(runs, handle, indent=4)
+    os.replace(incoming, pth)
+    return pth
+
+def compare(previous, current):
+    """ Print a comparison of the median results of two runs, flagging regressions """
+    print("")
+    print(f"Compared with {previous.get('commit') or 'the previous run'} "
+          f"({time.ctime(previous.get('timestamp', 0))}):")
+    for name, result in current['results'].items():
+        before = previous['results'].get(name)
+        if not before or 'median' not in before or 'median' not in result:
+            continue
+        ratio = result['median'] / max(before['median'], 1e-9)
+        flag = ratio > REGRESSION_THRESHOLD and "  << REGRESSION" or ""
+        print(f"{name:<56} {before['median']:10.4f} -> {result['median']:10.4f}  ({ratio:5.2f}x){flag}")
+
+def main(argv=None):
+    global session
+    arguments = docopt(__doc__, argv=(argv or sys.argv)[1:], help=True)
+    patterns = arguments.get('-k') or ['*']
+    selected = OCDList(entry for entry in benchmark_names() \
+                             if any(fnmatch.fnmatch(entry[0], pattern) for pattern in patterns))
+    
+    if arguments.get('--list'):
+        for name, _, _, _ in selected:
+            print(name)
+        return 0
+    
+    repeat = max(int(arguments.get('--repeat')), 1)
+    verbose = bool(arguments.get('--verbose'))
+    run = dict(commit=commit(), timestamp=time.time(),
+                                machine=platform.node(),
+                                platform=platform.platform(),
+                                python=platform.python_version(),
+                                repeat=repeat,
+                                results={})
+    session = Session()
+    try:
+        for name, cls, method, parameter in selected:
+            try:
+                result = run_benchmark(cls, method, parameter, repeat)
+            except Exception as exc:
+                result = dict(error=f"{type(exc).__name__}: {str(exc)}")
+                print(f"{name:<56} FAILED: {result['error']}")
+            else:
+                print(f"{name:<56} {result['median']:10.4f}" + (verbose and f"  {result['samples']}" or ""))
+            run['results'][name] = result
+    finally:
+        session.close()
+    
+    output = arguments.get('--output')
+    runs = read_runs(output)
+    if arguments.get('--compare') and len(runs) > 0:
+        compare(runs[-1], run)
+    runs.append(run)
+    write_runs(output, runs)
+    print("")
+    print(f"Results written to {output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
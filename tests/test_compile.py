@@ -11,7 +11,7 @@ class CompileTests(BaseCase):
         super(CompileTests, self).setUp()
         from halogen.compile import CONF
         self.CONF = CONF
-        with cd("/Users/fish/Dropbox/halogen/tests/generators") as gendir:
+        with cd(os.path.join(self.whereat, 'tests', 'generators')) as gendir:
             self.gendir = gendir.realpath()
             self.genfiles = gendir.ls_la(suffix="cpp")
     
@@ -60,6 +60,979 @@ class CompileTests(BaseCase):
                                           "stmt_name", "stmt_html_name"):
                             self.assertFalse(os.path.exists(getattr(output, prop_name)))
     
+    def test_registry_snapshot(self):
+        from halogen.compile import Generators
+        from halogen.filesystem import TemporaryDirectory
+        
+        with TemporaryDirectory(prefix='test-registry-snapshot-') as td:
+            
+            with Generators(self.CONF,
+                            destination=td.subdirectory('destination'),
+                            directory=self.gendir,
+                            do_static=False,
+                            verbose=False) as gens:
+                self.assertTrue(gens.preloaded)
+                
+                # The snapshot is retaken only after it’s been invalidated:
+                snapshot = self.halapi.registry_snapshot()
+                self.assertIs(self.halapi.registry_snapshot(), snapshot)
+                self.assertEqual(self.halapi.registered_generators(), set(snapshot))
+                self.assertIs(gens.loaded_generators(), gens.loaded_generators())
+                for name in snapshot:
+                    self.assertTrue(self.halapi.is_registered_generator(name))
+                self.assertFalse(self.halapi.is_registered_generator("i_heard_you_like_generators"))
+                
+                self.halapi.invalidate_registry()
+                self.assertIsNot(self.halapi.registry_snapshot(), snapshot)
+                self.assertEqual(self.halapi.registry_snapshot(), snapshot)
+                self.assertEqual(gens.loaded_generators(), snapshot)
+    
+    def test_buffer_numpy_zero_copy(self):
+        import numpy
+        
+        # A C-contiguous (height, width, channels) image:
+        image = numpy.zeros((48, 64, 3), dtype=numpy.uint16)
+        buffer = self.halapi.Buffer(image, name="image")
+        self.assertTrue(buffer.defined)
+        self.assertTrue(buffer.writable)
+        self.assertEqual(buffer.name, "image")
+        self.assertEqual(str(buffer.type), "uint16_t")
+        self.assertEqual(buffer.dimensions, 3)
+        self.assertEqual(buffer.extents, (3, 64, 48))
+        self.assertEqual(buffer.strides, (1, 3, 192))
+        self.assertEqual(len(buffer), image.size)
+        self.assertEqual(buffer.size_in_bytes, image.nbytes)
+        self.assertIs(numpy.asarray(buffer), image)
+        
+        # Axes in NumPy order, from a strided (non-contiguous) view:
+        view = image[::2, :, 1]
+        buffer = self.halapi.Buffer(view, reverse_axes=False)
+        self.assertEqual(buffer.extents, (24, 64))
+        self.assertEqual(buffer.strides, (384, 3))
+        
+        # Read-only arrays are fine, unless a writable buffer is requested:
+        image.flags.writeable = False
+        self.assertFalse(self.halapi.Buffer(image).writable)
+        with self.assertRaises(ValueError):
+            self.halapi.Buffer(image, writable=True)
+        
+        # Unsupported dtypes, byte orders and strides are refused:
+        with self.assertRaises(TypeError):
+            self.halapi.Buffer(numpy.zeros(8, dtype=numpy.complex64))
+        with self.assertRaises(ValueError):
+            self.halapi.Buffer(numpy.zeros(8, dtype=numpy.dtype('float32').newbyteorder()))
+        with self.assertRaises(ValueError):
+            self.halapi.Buffer(numpy.zeros(9, dtype=numpy.uint8)[1:].view(numpy.uint16))
+    
+    def test_jit_realize(self):
+        import numpy
+        from halogen.compile import Generators
+        from halogen.filesystem import TemporaryDirectory
+        
+        with TemporaryDirectory(prefix='test-jit-realize-') as td:
+            
+            with Generators(self.CONF,
+                            destination=td.subdirectory('destination'),
+                            directory=self.gendir,
+                            do_static=False,
+                            verbose=False) as gens:
+                self.assertTrue(gens.preloaded)
+                self.halapi.jit_cache_clear()
+                
+                # The callable is compiled once per (name, params, target):
+                jitted = self.halapi.jit_compile("my_first_generator")
+                self.assertIs(self.halapi.jit_compile("my_first_generator"), jitted)
+                self.assertEqual(jitted.argument_names[:2], ("offset", "input"))
+                self.assertEqual(len(jitted.argument_names), 3)
+                
+                # Realize in place, sans copies -- positionally and by name:
+                image = numpy.arange(64 * 32, dtype=numpy.uint8).reshape(32, 64)
+                output = numpy.zeros_like(image)
+                self.assertIs(self.halapi.realize("my_first_generator", 10, image, output), output)
+                self.assertTrue(numpy.array_equal(output, image + numpy.uint8(10)))
+                jitted(offset=20, input=image, **{ jitted.argument_names[2] : output })
+                self.assertTrue(numpy.array_equal(output, image + numpy.uint8(20)))
+                
+                # Mismatched buffers and missing arguments are refused:
+                with self.assertRaises(ValueError):
+                    jitted(10, image.astype(numpy.uint16), output)
+                with self.assertRaises(ValueError):
+                    jitted(10, image[0], output)
+                with self.assertRaises(TypeError):
+                    jitted(10, image)
+                with self.assertRaises(ValueError):
+                    self.halapi.jit_compile("i_heard_you_like_generators")
+                
+                self.halapi.jit_cache_clear()
+                self.assertIsNot(self.halapi.jit_compile("my_first_generator"), jitted)
+    
+    def test_generators_python_extensions(self):
+        import numpy
+        from halogen.compile import Generators
+        from halogen.filesystem import TemporaryDirectory
+        
+        with TemporaryDirectory(prefix='test-python-extensions-') as td:
+            
+            with Generators(self.CONF,
+                            destination=td.subdirectory('destination'),
+                            directory=self.gendir,
+                            intermediate=td.subdirectory('intermediate'),
+                            do_static=False,
+                            verbose=False) as gens:
+                generated = gens.run(emit='expanded')
+                for artifact in generated.values():
+                    # Run in-process by default, so these are the modules themselves:
+                    self.assertIsInstance(artifact['module'], self.halapi.Module)
+                callables = gens.extensions(generated)
+                self.assertEqual(set(callables.keys()), set(generated.keys()))
+                self.assertIn('extensions', gens.stats.phases)
+                
+                # The AOT-compiled pipeline writes its output in place:
+                image = numpy.arange(64 * 32, dtype=numpy.uint8).reshape(32, 64)
+                output = numpy.zeros_like(image)
+                callables['my_first_generator'](10, image, output)
+                self.assertTrue(numpy.array_equal(output, image + numpy.uint8(10)))
+    
+    def test_generator_daemon(self):
+        import threading
+        from halogen.client import GeneratorClient
+        from halogen.compile import Generators
+        from halogen.daemon import GeneratorDaemon
+        from halogen.errors import DaemonError
+        from halogen.filesystem import TemporaryDirectory
+        
+        with TemporaryDirectory(prefix='test-generator-daemon-') as td:
+            
+            with Generators(self.CONF,
+                            destination=td.subdirectory('destination'),
+                            directory=self.gendir,
+                            do_static=False,
+                            do_preload=False,
+                            verbose=False) as gens:
+                socket_path = td.subpath("daemon.sock")
+                with GeneratorDaemon(socket_path=socket_path,
+                                     libraries=(gens.library,)) as daemon:
+                    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+                    thread.start()
+                    
+                    with GeneratorClient(socket_path=socket_path) as client:
+                        self.assertIn(gens.library, client.ping()['libraries'])
+                        generators = client.generators()
+                        self.assertEqual(set(generators), set(gens.loaded_generators()))
+                        
+                        # Many requests, one connection, no reloading:
+                        output = td.subdirectory('generated')
+                        result = client.generate(*generators, output_directory=output,
+                                                              emit=['static_library', 'h'])
+                        self.assertEqual(result['errors'], {})
+                        self.assertEqual(len(result['artifacts']), len(generators))
+                        for artifact in result['artifacts']:
+                            self.assertIn(artifact['name'], generators)
+                            for pth in artifact['outputs'].values():
+                                self.assertTrue(os.path.isfile(pth))
+                        
+                        with self.assertRaises(DaemonError):
+                            client.generate("i_heard_you_like_generators", output_directory=output)
+                        
+                        self.assertTrue(client.shutdown())
+                    thread.join(timeout=10)
+                    self.assertFalse(thread.is_alive())
+                self.assertFalse(os.path.exists(socket_path))
+    
+    def test_cli_sources_and_library(self):
+        from halogen.cli import cli
+        from halogen.filesystem import TemporaryDirectory
+        
+        with TemporaryDirectory(prefix='test-cli-sources-and-library-') as td:
+            sources_output = td.subpath('sources')
+            library_output = td.subpath('library')
+            
+            # Build, link and run the generators from source -- GenGen-style, with “target=…”:
+            self.assertEqual(cli(['halogen', 'my_first_generator', 'target=host',
+                                  f"--sources={self.gendir}",
+                                  f"--output={sources_output}",
+                                  '--emit=h,static_library',
+                                  '--jobs=2', '--stats']), 0)
+            headers = [path for path in os.listdir(sources_output) if path.endswith('.h')]
+            self.assertTrue(len(headers) > 0)
+            libraries = [path for path in os.listdir(sources_output) if path.endswith(('.dylib', '.so'))]
+            self.assertEqual(len(libraries), 1)
+            
+            # Run the generators again, from the linked library -- naming the generator
+            # with GenGen’s “-g” flag, this time:
+            self.assertEqual(cli(['halogen', '-g', 'my_first_generator',
+                                  f"--library={os.path.join(sources_output, libraries[0])}",
+                                  f"--output={library_output}",
+                                  '--emit=h']), 0)
+            self.assertEqual(sorted(headers), sorted(path for path in os.listdir(library_output) \
+                                                                    if path.endswith('.h')))
+            
+            # Unknown generators are reported with a nonzero exit status:
+            self.assertNotEqual(cli(['halogen', 'i_heard_you_like_generators',
+                                     f"--sources={self.gendir}",
+                                     f"--output={sources_output}"]), 0)
+    
+    def test_generators_write_ninja_and_cmake(self):
+        import shutil, subprocess
+        from halogen.compile import Generators
+        from halogen.filesystem import TemporaryDirectory
+        
+        with TemporaryDirectory(prefix='test-generators-write-ninja-and-cmake-') as td:
+            
+            with Generators(self.CONF,
+                            destination=td.subdirectory('destination'),
+                            directory=self.gendir,
+                            do_static=False,
+                            verbose=False) as gens:
+                self.assertTrue(gens.preloaded)
+                plan = gens.build_plan(td.name, emit=['h', 'static_library'])
+                cmake = gens.write_cmake(td.subpath('generators.cmake'), emit=['h', 'static_library'])
+                
+                # The Ninja build gets a library of its own, rather than relinking ours in place:
+                planner = Generators(self.CONF,
+                                     destination=td.subdirectory('ninja'),
+                                     directory=self.gendir,
+                                     do_static=False,
+                                     verbose=False)
+                ninja_plan = planner.build_plan(td.name, emit=['h', 'static_library'],
+                                                         generators=gens.loaded_generators())
+                ninja = planner.write_ninja(td.subpath('build.ninja'), emit=['h', 'static_library'],
+                                                                       generators=gens.loaded_generators())
+                
+                # One compile step per source, one link step, one generate step per generator:
+                steps = [step.rule for step in plan.steps]
+                self.assertEqual(steps.count('cxx'), gens.source_count)
+                self.assertEqual(steps.count('ld'), 1)
+                self.assertEqual(steps.count('ar'), 0)
+                self.assertEqual(steps.count('generate'), gens.loaded_count)
+                self.assertIn(gens.library, plan.defaults)
+                
+                with open(ninja, 'r') as handle:
+                    contents = handle.read()
+                    self.assertIn("deps = gcc", contents)
+                    self.assertIn("restat = 1", contents)
+                    self.assertIn(f"default {plan.name}", contents)
+                with open(cmake, 'r') as handle:
+                    contents = handle.read()
+                    self.assertIn("add_custom_command(", contents)
+                    self.assertIn(f"add_custom_target({plan.name} ALL", contents)
+                
+                if shutil.which('ninja'):
+                    # Really build it -- compiling, linking and running each generator:
+                    pythonpath = os.pathsep.join(pth for pth in (self.whereat, os.environ.get('PYTHONPATH')) if pth)
+                    subprocess.run(['ninja', '-f', ninja], check=True,
+                                                           cwd=td.name,
+                                                           env=dict(os.environ, PYTHONPATH=pythonpath),
+                                                           stdout=subprocess.DEVNULL)
+                    for output in ninja_plan.outputs:
+                        self.assertTrue(os.path.isfile(output), f"not built: {output}")
+                    self.assertTrue(any(output.endswith('.h') for output in ninja_plan.outputs))
+                    self.assertTrue(any(output.endswith('.a') for output in ninja_plan.outputs))
+                planner.clear()
+    
+    def test_generator_index(self):
+        from halogen.compile import Generators
+        from halogen.filesystem import TemporaryDirectory
+        from halogen.generate import index_library, load_generators
+        from halogen.index import GeneratorIndex
+        
+        with TemporaryDirectory(prefix='test-generator-index-') as td:
+            index_directory = td.subdirectory('index')
+            
+            with Generators(self.CONF,
+                            destination=td.subdirectory('destination'),
+                            directory=self.gendir,
+                            do_static=False,
+                            index=index_directory,
+                            verbose=False) as gens:
+                self.assertTrue(gens.preloaded)
+                library = os.path.realpath(gens.library)
+                
+                # The library was indexed as it was first loaded:
+                index = GeneratorIndex(directory=index_directory)
+                self.assertTrue(index.exists)
+                indexed = index.read().generators_for(library)
+                self.assertTrue(set(indexed).issubset(gens.loaded_generators()))
+                for generator in indexed:
+                    self.assertEqual(index.library_for(generator), library)
+                
+                # Indexing an already-loaded library leaves the index as-is:
+                self.assertEqual(index_library(library, index=index), indexed)
+                
+                # Registered generators don’t need loading:
+                self.assertEqual(load_generators(*gens.loaded_generators(), index=index), [])
+    
+    def test_generators_concurrent_link_fast_linker_and_thin_archive(self):
+        import shlex, subprocess
+        from halogen import config
+        from halogen.compile import Generators, CompilerError
+        from halogen.filesystem import TemporaryDirectory
+        
+        self.assertEqual(config.linker_flags("c++ -shared", None), "")
+        self.assertEqual(config.linker_flags("c++ -shared", 'lld'), " -fuse-ld=lld")
+        self.assertIn(config.fast_linker(config.environ_override('CXX')), (None, 'mold', 'lld'))
+        
+        with TemporaryDirectory(prefix='test-generators-concurrent-link-fast-linker-and-thin-archive-') as td:
+            
+            # Thin archives reference object code that a non-incremental build deletes:
+            with self.assertRaises(CompilerError):
+                Generators(self.CONF,
+                           destination=td.subdirectory('nope'),
+                           directory=self.gendir,
+                           thin_archive=True,
+                           verbose=False)
+            
+            with Generators(self.CONF,
+                            destination=td.subdirectory('destination'),
+                            intermediate=td.subdirectory('intermediate'),
+                            directory=self.gendir,
+                            linker='auto',
+                            thin_archive=True,
+                            incremental=True,
+                            do_preload=False,
+                            verbose=False) as gens:
+                self.assertTrue(gens.linked)
+                self.assertTrue(gens.archived)
+                self.assertIn('link', gens.stats.phases)
+                self.assertIn('arch', gens.stats.phases)
+                archive = gens.archive
+            
+            # Thin archives start with their own magic number -- and remain usable
+            # after the build, as the object code they reference is still around:
+            with open(archive, 'rb') as handle:
+                magic = handle.read(8)
+            if config.archiver_supports_thin(config.environ_override('AR')):
+                self.assertEqual(magic, b"!<thin>\n")
+            else:
+                self.assertEqual(magic, b"!<arch>\n")
+            archiver = shlex.split(config.environ_override('AR'))
+            members = subprocess.run(archiver + ['t', archive], check=True,
+                                                                capture_output=True,
+                                                                text=True).stdout.split()
+            self.assertEqual(len(members), gens.source_count)
+            if magic == b"!<thin>\n":
+                for member in members:
+                    self.assertTrue(os.path.isfile(member), f"missing thin-archive member: {member}")
+            subprocess.run(archiver + ['p', archive], check=True,
+                                                      stdout=subprocess.DEVNULL)
+    
+    def test_generators_batched_compilation(self):
+        import shutil
+        from halogen.compile import Generators, CompilerError
+        from halogen.filesystem import TemporaryDirectory
+        
+        with TemporaryDirectory(prefix='test-generators-batched-compilation-') as td:
+            
+            with Generators(self.CONF,
+                            destination=td.name,
+                            directory=self.gendir,
+                            batch=4,
+                            jobs=2,
+                            do_static=False,
+                            verbose=False) as gens:
+                self.assertTrue(gens.compiled)
+                self.assertTrue(gens.linked)
+                self.assertEqual(gens.prelink_count, gens.source_count)
+                self.assertEqual(len(gens.batch_fallbacks), 0)
+                
+                # Batches are as big as requested, however few the jobs:
+                batches = gens.compile_batches(list(gens.sources))
+                self.assertTrue(all(len(batch) <= 4 for batch in batches))
+                if gens.source_count > 1:
+                    self.assertTrue(any(len(batch) > 1 for batch in batches))
+                    self.assertTrue(any(measurement.args.get('batch', 0) > 1 \
+                                        for measurement in gens.stats.sources.values()))
+        
+        with TemporaryDirectory(prefix='test-generators-batched-compilation-incremental-') as td:
+            intermediate = td.subdirectory('intermediate')
+            
+            # Depfiles from batches name real dependencies -- not paths
+            # within the since-deleted scratch directory of the batch:
+            with Generators(self.CONF,
+                            destination=td.subdirectory('destination'),
+                            intermediate=intermediate,
+                            directory=self.gendir,
+                            batch=4,
+                            do_preload=False,
+                            do_static=False,
+                            incremental=True,
+                            verbose=False) as gens:
+                self.assertTrue(gens.compiled)
+                self.assertEqual(len(gens.batch_fallbacks), 0)
+                for source in gens.sources:
+                    inputs = gens.manifest[source]['inputs']
+                    self.assertIn(source, inputs)
+                    for inpt in inputs:
+                        self.assertTrue(os.path.isfile(inpt), f"missing dependency: {inpt}")
+                        self.assertFalse(inpt.startswith(os.fspath(intermediate)))
+        
+        with TemporaryDirectory(prefix='test-generators-batched-compilation-fallback-') as td:
+            sources = td.subdirectory('sources')
+            sources.makedirs()
+            for genfile in list(self.genfiles)[:3]:
+                shutil.copy2(os.path.join(self.gendir, genfile), sources.subpath(os.path.basename(genfile)))
+            with open(sources.subpath('i_heard_you_like_syntax_errors.cpp'), 'w') as handle:
+                handle.write("yo dogg {\n")
+            
+            # The batch with the broken source fails -- and then its sources
+            # are compiled one by one, so only the broken source is to blame:
+            gens = Generators(self.CONF,
+                              destination=td.subdirectory('destination'),
+                              directory=sources,
+                              batch=2,
+                              jobs=1,
+                              verbose=False)
+            gens.precompile()
+            with self.assertRaises(CompilerError):
+                gens.compile_all()
+            self.assertEqual(list(os.path.basename(source) for source in gens.compile_errors),
+                             ['i_heard_you_like_syntax_errors.cpp'])
+            self.assertTrue(len(gens.batch_fallbacks) > 0)
+            gens.clear()
+    
+    def test_module_and_outputs_pickling(self):
+        import pickle
+        from halogen.generate import generate, ModuleMetadata
+        from halogen.compile import Generators
+        from halogen.filesystem import TemporaryDirectory
+        
+        with TemporaryDirectory(prefix='test-module-and-outputs-pickling-') as td:
+            
+            with Generators(self.CONF,
+                            destination=td.subdirectory('destination'),
+                            directory=self.gendir,
+                            do_static=False,
+                            verbose=False) as gens:
+                self.assertTrue(gens.preloaded)
+                registered = self.halapi.registered_generators()
+                self.assertTrue(len(registered) > 0)
+                
+                artifacts = generate(*sorted(registered)[:1], verbose=False,
+                                                              target='host',
+                                                              emit=('static_library', 'h'),
+                                                              output_directory=td.subdirectory('generated'))
+                self.assertEqual(len(artifacts), 1)
+                base_path, outputs, module = artifacts[0]
+                self.assertIsInstance(module, self.halapi.Module)
+                
+                # Outputs round-trip, as Outputs:
+                unpickled = pickle.loads(pickle.dumps(outputs))
+                self.assertIsInstance(unpickled, self.halapi.Outputs)
+                self.assertEqual(unpickled.to_dict(), outputs.to_dict())
+                self.assertEqual(unpickled.static_library_name, outputs.static_library_name)
+                
+                # Modules round-trip as ModuleMetadata proxies, output filenames included:
+                proxy = pickle.loads(pickle.dumps(module))
+                self.assertIsInstance(proxy, ModuleMetadata)
+                self.assertEqual(proxy.serialize(), module.serialize())
+                self.assertEqual(proxy.name, module.serialize()['name'])
+                self.assertEqual(proxy.get_metadata(), module.serialize()['metadata'])
+                self.assertEqual(proxy.outputs, outputs.to_dict())
+                self.assertEqual(proxy.get_outputs().c_header_name, outputs.c_header_name)
+                self.assertEqual(str(proxy.get_target()), str(module.get_target()))
+                self.assertEqual(ModuleMetadata.from_module(module), proxy)
+    
+    def test_generators_shared_streaming_compilation_database(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from halogen.compile import Generators
+        from halogen.compiledb import CDBJsonFile, CDBJsonStream
+        from halogen.filesystem import TemporaryDirectory
+        
+        self.assertTrue(len(self.genfiles) > 0)
+        
+        with TemporaryDirectory(prefix='test-generators-shared-streaming-compilation-database-') as td:
+            
+            intermediate = td.subdirectory('intermediate')
+            
+            def build(name):
+                with Generators(self.CONF,
+                                destination=td.subdirectory(name),
+                                intermediate=intermediate,
+                                directory=self.gendir,
+                                do_shared=False, do_static=False,
+                                stream_cdb=True,
+                                verbose=False) as gens:
+                    self.assertIsInstance(gens.cdb, CDBJsonStream)
+                    self.assertTrue(gens.postcompiled)
+                    return gens.source_count
+            
+            # Two builds at once, sharing one compilation database:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                counts = list(executor.map(build, ('yo', 'dogg')))
+            
+            self.assertTrue(CDBJsonFile.in_directory(intermediate))
+            cdb = CDBJsonStream(directory=intermediate)
+            entries = cdb.load()
+            self.assertEqual(len({ entry['file'] for entry in entries }), counts[0])
+            self.assertEqual(len(entries), counts[0])
+            with open(cdb.journal, mode='r') as handle:
+                journaled = len(handle.readlines())
+            self.assertTrue(journaled <= 2 * counts[0])
+            
+            # Another build merges into the database -- appending nothing, as nothing changed:
+            build('heard')
+            cdb.read()
+            self.assertEqual(len(cdb), counts[0])
+            self.assertEqual(len(cdb.ondisk), counts[0])
+            with open(cdb.journal, mode='r') as handle:
+                self.assertEqual(len(handle.readlines()), journaled)
+    
+    def test_generate_worker_processes(self):
+        from halogen.generate import generate, ModuleMetadata
+        from halogen.compile import Generators
+        from halogen.filesystem import TemporaryDirectory
+        
+        with TemporaryDirectory(prefix='test-generate-worker-processes-') as td:
+            
+            with Generators(self.CONF,
+                            destination=td.subdirectory('destination'),
+                            directory=self.gendir,
+                            do_static=False,
+                            verbose=False) as gens:
+                self.assertTrue(gens.preloaded)
+                registered = self.halapi.registered_generators()
+                self.assertTrue(len(registered) > 0)
+                
+                errors = {}
+                artifacts = generate(*registered, verbose=False,
+                                                  target='host',
+                                                  emit=('static_library', 'h'),
+                                                  output_directory=td.subdirectory('generated'),
+                                                  libraries=(gens.library,),
+                                                  errors=errors,
+                                                  jobs=4)
+                
+                self.assertEqual(len(artifacts) + len(errors), len(registered))
+                names = [artifact[2].name for artifact in artifacts]
+                self.assertEqual(names, sorted(names))
+                for base_path, outputs, module in artifacts:
+                    self.assertIsInstance(module, ModuleMetadata)
+                    self.assertTrue(os.path.exists(outputs.static_library_name))
+                    self.assertTrue(os.path.exists(outputs.c_header_name))
+    
+    def test_generate_profile(self):
+        from halogen.generate import generate, profile_summary, GenerationProfile
+        from halogen.compile import Generators
+        from halogen.filesystem import TemporaryDirectory
+        
+        with TemporaryDirectory(prefix='test-generate-profile-') as td:
+            
+            with Generators(self.CONF,
+                            destination=td.subdirectory('destination'),
+                            directory=self.gendir,
+                            do_static=False,
+                            verbose=False) as gens:
+                self.assertTrue(gens.preloaded)
+                registered = self.halapi.registered_generators()
+                self.assertTrue(len(registered) > 0)
+                
+                for jobs in (1, 4):
+                    errors = {}
+                    profile = {}
+                    artifacts = generate(*registered, verbose=False,
+                                                      target='host',
+                                                      emit=('static_library', 'h', 'stmt_html'),
+                                                      output_directory=td.subdirectory(f'generated-{jobs}'),
+                                                      libraries=(gens.library,),
+                                                      errors=errors,
+                                                      profile=profile,
+                                                      jobs=jobs)
+                    
+                    # The profiles may also be returned, alongside the artifacts:
+                    returned, profiles = generate(*registered, verbose=False,
+                                                               target='host',
+                                                               emit=('static_library', 'h', 'stmt_html'),
+                                                               output_directory=td.subdirectory(f'returned-{jobs}'),
+                                                               libraries=(gens.library,),
+                                                               profile=True,
+                                                               jobs=jobs)
+                    self.assertEqual(len(returned), len(artifacts))
+                    self.assertEqual(set(profiles.keys()), set(profile.keys()))
+                    
+                    self.assertEqual(len(profile), len(artifacts))
+                    for base_path, outputs, module in artifacts:
+                        timing = profile[module.name]
+                        self.assertIsInstance(timing, GenerationProfile)
+                        self.assertFalse(timing.cached)
+                        self.assertGreater(timing.lowering, 0.0)
+                        self.assertEqual(set(timing.artifacts.keys()), { 'static_library_name',
+                                                                         'c_header_name',
+                                                                         'stmt_html_name' })
+                        self.assertEqual(timing.artifacts['static_library_name'][1],
+                                         os.path.getsize(outputs.static_library_name))
+                        self.assertAlmostEqual(timing.codegen, sum(seconds for seconds, _ in timing.artifacts.values()))
+                    
+                    summary = profile_summary(profile, count=1)
+                    self.assertIn(max(profile, key=lambda name: profile[name].total), summary)
+    
+    def test_generate_multiple_targets(self):
+        from halogen.generate import generate, ModuleMetadata
+        from halogen.compile import Generators
+        from halogen.filesystem import TemporaryDirectory
+        
+        # Two variants of the host OS/architecture/bit-width, sans other features:
+        host_base = "-".join(str(self.halapi.Target()).split("-")[:3])
+        targets = (f"{host_base}-no_asserts", host_base)
+        
+        with TemporaryDirectory(prefix='test-generate-multiple-targets-') as td:
+            
+            with Generators(self.CONF,
+                            destination=td.subdirectory('destination'),
+                            directory=self.gendir,
+                            do_static=False,
+                            verbose=False) as gens:
+                self.assertTrue(gens.preloaded)
+                registered = self.halapi.registered_generators()
+                self.assertTrue(len(registered) > 0)
+                
+                errors = {}
+                generated = td.subdirectory('generated')
+                artifacts = generate(*registered, verbose=False,
+                                                  target=targets,
+                                                  emit=('static_library', 'h'),
+                                                  output_directory=generated,
+                                                  libraries=(gens.library,),
+                                                  errors=errors,
+                                                  multitarget=True,
+                                                  jobs=4)
+                
+                # One artifact per generator per target, plus one multi-target artifact:
+                self.assertEqual(len(artifacts) + len(errors), len(registered) * (len(targets) + 1))
+                for base_path, outputs, module in artifacts:
+                    self.assertIsInstance(module, ModuleMetadata)
+                    self.assertTrue(os.path.exists(outputs.static_library_name))
+                    self.assertTrue(os.path.exists(outputs.c_header_name))
+                    if module.target in targets:
+                        self.assertEqual(os.path.basename(os.path.dirname(base_path)), module.target)
+                    else:
+                        self.assertEqual(module.target, ",".join(targets))
+                        self.assertEqual(os.path.dirname(base_path), os.fspath(generated))
+    
+    def test_halide_version(self):
+        from halogen.cache import halide_version, loaded_library
+        
+        # The Halide library linked by halogen.api is found by its real path,
+        # not just its soname -- unless it’s been linked in statically:
+        library = loaded_library('Halide')
+        if library is not None:
+            self.assertTrue(os.path.isabs(library))
+            self.assertTrue(os.path.isfile(library))
+            self.assertTrue(halide_version().startswith(f"{library}:"))
+        self.assertIsNone(loaded_library('yodogg-no-such-library'))
+    
+    def test_generate_artifact_cache(self):
+        from halogen.cache import ArtifactCache
+        from halogen.generate import generate, ModuleMetadata
+        from halogen.compile import Generators
+        from halogen.filesystem import TemporaryDirectory, rm_rf
+        
+        with TemporaryDirectory(prefix='test-generate-artifact-cache-') as td:
+            
+            with Generators(self.CONF,
+                            destination=td.subdirectory('destination'),
+                            directory=self.gendir,
+                            do_static=False,
+                            verbose=False) as gens:
+                self.assertTrue(gens.preloaded)
+                registered = self.halapi.registered_generators()
+                self.assertTrue(len(registered) > 0)
+                
+                cache = ArtifactCache(directory=td.subdirectory('cache'))
+                generated = td.subdirectory('generated')
+                arguments = dict(verbose=False, target='host',
+                                                emit=('static_library', 'h', 'stmt'),
+                                                output_directory=generated,
+                                                libraries=(gens.library,),
+                                                cache=cache)
+                
+                # FIRST RUN: ALL MISSES
+                errors = {}
+                artifacts = generate(*registered, errors=errors, **arguments)
+                self.assertEqual(cache.saved_stats()['hits'], 0)
+                self.assertEqual(cache.saved_stats()['misses'], len(registered))
+                
+                # SECOND RUN, SANS OUTPUTS: ALL HITS
+                rm_rf(generated)
+                cached = generate(*registered, errors=errors, **arguments)
+                self.assertEqual(cache.saved_stats()['hits'], len(artifacts))
+                self.assertEqual(len(cached), len(artifacts))
+                for (base_path, outputs, module), original in zip(cached, artifacts):
+                    self.assertIsInstance(module, ModuleMetadata)
+                    self.assertEqual(module, ModuleMetadata.from_module(original[2]))
+                    self.assertTrue(os.path.exists(outputs.static_library_name))
+                    self.assertTrue(os.path.exists(outputs.c_header_name))
+                    self.assertTrue(os.path.exists(outputs.stmt_name))
+                
+                # DIFFERENT EMITS: ALL MISSES
+                arguments['emit'] = ('static_library', 'h')
+                generate(*registered, errors=errors, **arguments)
+                self.assertGreaterEqual(cache.saved_stats()['misses'], len(registered) * 2)
+    
+    def test_generators_parallel_compile(self):
+        from halogen.compile import Generators
+        from halogen.filesystem import TemporaryDirectory
+        
+        self.assertTrue(len(self.genfiles) > 0)
+        
+        with TemporaryDirectory(prefix='test-generators-parallel-compile-') as td:
+            
+            # COMPILE, FOUR AT A TIME:
+            gens = Generators(self.CONF,
+                              destination=td.subdirectory('destination'),
+                              directory=self.gendir,
+                              do_shared=False, do_static=False,
+                              jobs=4,
+                              verbose=False)
+            
+            self.assertEqual(gens.jobs, 4)
+            self.assertTrue(gens.precompile())
+            self.assertTrue(gens.compile_all())
+            self.assertEqual(gens.prelink_count, gens.source_count)
+            self.assertEqual(len(gens.compile_errors), 0)
+            self.assertEqual(len(gens.cdb), gens.source_count)
+            gens.clear()
+    
+    def test_generators_async_build(self):
+        import asyncio
+        from halogen.compile import Generators
+        from halogen.filesystem import TemporaryDirectory
+        
+        self.assertTrue(len(self.genfiles) > 0)
+        
+        async def build(destination):
+            diagnostics = []
+            async with Generators(self.CONF,
+                                  destination=destination,
+                                  directory=self.gendir,
+                                  do_preload=False,
+                                  jobs=4,
+                                  timeout=None,
+                                  on_stderr=diagnostics.append,
+                                  verbose=False) as gens:
+                self.assertTrue(gens.compiled)
+                self.assertTrue(gens.postcompiled)
+                self.assertTrue(gens.linked)
+                self.assertTrue(gens.archived)
+                self.assertEqual(gens.prelink_count, gens.source_count)
+                self.assertEqual(len(gens.compile_errors), 0)
+                self.assertTrue(os.path.isfile(gens.library))
+                self.assertTrue(os.path.isfile(gens.archive))
+            return diagnostics
+        
+        with TemporaryDirectory(prefix='test-generators-async-build-') as td:
+            
+            # COMPILE, LINK AND ARCHIVE, AS A DAG OF AWAITABLES:
+            diagnostics = asyncio.run(build(td.subdirectory('destination')))
+            self.assertTrue(all(isinstance(line, str) for line in diagnostics))
+    
+    def test_generators_build_stats(self):
+        import json
+        from halogen.compile import Generators
+        from halogen.filesystem import TemporaryDirectory
+        
+        self.assertTrue(len(self.genfiles) > 0)
+        
+        with TemporaryDirectory(prefix='test-generators-build-stats-') as td:
+            
+            trace = td.subpath('trace.json')
+            with Generators(self.CONF,
+                            destination=td.subdirectory('destination'),
+                            directory=self.gendir,
+                            do_preload=False,
+                            trace=trace,
+                            verbose=False) as gens:
+                self.assertTrue(gens.linked)
+                phases = gens.stats.phases
+                for phase in ('precompile', 'compile', 'postcompile', 'link', 'arch'):
+                    self.assertIn(phase, phases)
+                    self.assertGreaterEqual(phases[phase].wall, 0.0)
+                self.assertGreater(phases['compile'].children_cpu, 0.0)
+                self.assertEqual(len(gens.stats.sources), gens.source_count)
+                for measurement in gens.stats.sources.values():
+                    self.assertFalse(measurement.args['cache_hit'])
+            
+            with open(trace, mode='r') as handle:
+                events = json.load(handle)['traceEvents']
+            self.assertEqual(len(events), len(gens.stats))
+            self.assertEqual(set(event['cat'] for event in events), { 'phase', 'source' })
+    
+    def test_generators_object_cache(self):
+        from halogen.cache import ObjectCache
+        from halogen.compile import Generators
+        from halogen.filesystem import TemporaryDirectory
+        
+        self.assertTrue(len(self.genfiles) > 0)
+        
+        with TemporaryDirectory(prefix='test-generators-object-cache-') as td:
+            
+            cache = ObjectCache(directory=td.subdirectory('cache'))
+            
+            # COLD CACHE: EVERYTHING MISSES AND GETS STORED:
+            gens = Generators(self.CONF,
+                              destination=td.subdirectory('cold'),
+                              directory=self.gendir,
+                              do_shared=False, do_static=False,
+                              cache=cache,
+                              verbose=False)
+            self.assertTrue(gens.precompile())
+            self.assertTrue(gens.compile_all())
+            self.assertEqual(gens.prelink_count, gens.source_count)
+            cold = cache.saved_stats()
+            self.assertEqual(cold['hits'], 0)
+            self.assertEqual(cold['stores'], gens.source_count)
+            gens.clear()
+            
+            # WARM CACHE: EVERYTHING HITS:
+            gens = Generators(self.CONF,
+                              destination=td.subdirectory('warm'),
+                              directory=self.gendir,
+                              do_shared=False, do_static=False,
+                              cache=cache,
+                              verbose=False)
+            self.assertTrue(gens.precompile())
+            self.assertTrue(gens.compile_all())
+            self.assertEqual(gens.prelink_count, gens.source_count)
+            self.assertEqual(len(gens.cdb), gens.source_count)
+            warm = cache.saved_stats()
+            self.assertEqual(warm['hits'], gens.source_count)
+            self.assertEqual(warm['stores'], cold['stores'])
+            gens.clear()
+    
+    def test_generators_incremental_rebuild(self):
+        from halogen.compile import Generators
+        from halogen.filesystem import TemporaryDirectory
+        from halogen.manifest import BuildManifest
+        
+        self.assertTrue(len(self.genfiles) > 0)
+        
+        with TemporaryDirectory(prefix='test-generators-incremental-rebuild-') as td:
+            
+            destination = td.subdirectory('destination')
+            intermediate = td.subdirectory('intermediate')
+            
+            # FIRST BUILD: COMPILE EVERYTHING:
+            with Generators(self.CONF,
+                            destination=destination,
+                            intermediate=intermediate,
+                            directory=self.gendir,
+                            do_preload=False,
+                            incremental=True,
+                            verbose=False) as gens:
+                self.assertTrue(gens.linked)
+                self.assertTrue(gens.archived)
+                self.assertEqual(len(gens.recompiled), gens.source_count)
+                library = gens.library
+                first_sources = tuple(gens.sources)
+            
+            self.assertTrue(BuildManifest.in_directory(intermediate))
+            library_mtime = os.stat(library).st_mtime_ns
+            
+            # SECOND BUILD: NOTHING IS STALE, NOTHING IS RELINKED:
+            with Generators(self.CONF,
+                            destination=destination,
+                            intermediate=intermediate,
+                            directory=self.gendir,
+                            do_preload=False,
+                            incremental=True,
+                            verbose=False) as gens:
+                self.assertTrue(gens.linked)
+                self.assertTrue(gens.archived)
+                self.assertEqual(len(gens.recompiled), 0)
+                self.assertEqual(gens.prelink_count, gens.source_count)
+            
+            self.assertEqual(os.stat(library).st_mtime_ns, library_mtime)
+            
+            # THIRD BUILD: TOUCH ONE SOURCE, RECOMPILE AND RELINK:
+            os.utime(first_sources[0])
+            with Generators(self.CONF,
+                            destination=destination,
+                            intermediate=intermediate,
+                            directory=self.gendir,
+                            do_preload=False,
+                            incremental=True,
+                            verbose=False) as gens:
+                self.assertTrue(gens.linked)
+                self.assertEqual(tuple(gens.recompiled), first_sources[:1])
+            
+            self.assertNotEqual(os.stat(library).st_mtime_ns, library_mtime)
+    
+    def test_generators_precompiled_header(self):
+        from halogen.compile import Generators, PrecompiledHeader
+        from halogen.filesystem import TemporaryDirectory
+        
+        self.assertTrue(len(self.genfiles) > 0)
+        
+        with TemporaryDirectory(prefix='test-generators-precompiled-header-') as td:
+            
+            with PrecompiledHeader(self.CONF, directory=td.name,
+                                              verbose=False) as pch:
+                self.assertTrue(pch.compiled)
+                self.assertTrue(os.path.isfile(pch.destination))
+                self.assertIn(pch.clang and pch.destination or pch.header,
+                              pch.config.cxx_flag_string("yo.o", "yo.cpp"))
+                destination = pch.destination
+            
+            # A second precompilation reuses the first:
+            with PrecompiledHeader(self.CONF, directory=td.name,
+                                              verbose=False) as pch:
+                self.assertTrue(pch.compiled)
+                self.assertEqual(pch.destination, destination)
+                self.assertEqual(len(pch.result), 0)
+            
+            gens = Generators(self.CONF,
+                              destination=td.subdirectory('destination'),
+                              intermediate=td.name,
+                              directory=self.gendir,
+                              do_shared=False, do_static=False,
+                              precompiled_header=True,
+                              verbose=False)
+            self.assertTrue(gens.precompile())
+            self.assertTrue(gens.compile_all())
+            self.assertIsNotNone(gens.pch)
+            self.assertIsNone(gens.pch_error)
+            self.assertEqual(gens.pch.destination, destination)
+            self.assertEqual(gens.prelink_count, gens.source_count)
+            gens.clear()
+    
+    def test_generators_unity_build(self):
+        from halogen.compile import Generators
+        from halogen.filesystem import TemporaryDirectory
+        
+        self.assertTrue(len(self.genfiles) > 0)
+        
+        with TemporaryDirectory(prefix='test-generators-unity-build-') as td:
+            
+            # PER-FILE BASELINE, THEN UNITY:
+            gens = Generators(self.CONF,
+                              destination=td.subdirectory('per-file'),
+                              intermediate=td.name,
+                              directory=self.gendir,
+                              timings=td.subdirectory('timings'),
+                              do_shared=False, do_static=False,
+                              verbose=False)
+            self.assertTrue(gens.precompile())
+            self.assertTrue(gens.compile_all())
+            gens.clear()
+            
+            with Generators(self.CONF,
+                            destination=td.subdirectory('unity'),
+                            intermediate=td.name,
+                            directory=self.gendir,
+                            timings=td.subdirectory('timings'),
+                            do_preload=False,
+                            unity=4,
+                            verbose=False) as gens:
+                self.assertTrue(gens.compiled)
+                self.assertTrue(gens.linked)
+                self.assertTrue(gens.archived)
+                merged = sum(len(batch) for batch in gens.unity_units.values())
+                self.assertEqual(merged + len(gens.unity_standalone) - sum(len(gens.unity_units[unit]) \
+                                                          for unit in gens.unity_fallbacks),
+                                 gens.source_count)
+                self.assertLessEqual(gens.prelink_count, gens.source_count)
+                self.assertIsNotNone(gens.unity_speedup)
+                self.assertEqual(gens.unity_baseline['sources'], gens.source_count)
+    
     def test_generator_compile_context_manager(self):
         from halogen.compile import Generator
         from halogen.filesystem import TemporaryName, TemporaryDirectory
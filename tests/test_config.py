@@ -182,6 +182,62 @@ class ConfigTests(BaseCase):
         self.assertTrue(flags_to_set(SysConfig().get_ldflags()).issubset(flags_to_set(conf.get_ldflags())))
         self.assertTrue(flags_to_set(BrewedHalideConfig().get_ldflags()).issubset(flags_to_set(conf.get_ldflags())))
     
+    def test_memoized_flags(self):
+        from halogen.config import ConfigBase, ConfigUnion, SetWrap, SysConfig
+        
+        class CountingConfig(ConfigBase):
+            calls = 0
+            def get_includes(self):
+                type(self).calls += 1
+                return "-I/yo/dogg"
+            def get_libs(self):
+                return "-lyodogg"
+            def get_cflags(self):
+                return "-O2"
+            def get_ldflags(self):
+                return "-L/yo/dogg"
+        
+        counting = CountingConfig()
+        conf = SetWrap(ConfigUnion(counting, SysConfig()))
+        
+        includes = conf.get_includes()
+        self.assertEqual(includes, conf.get_includes())
+        self.assertEqual(CountingConfig.calls, 1)
+        
+        conf.invalidate()
+        self.assertEqual(includes, conf.get_includes())
+        self.assertEqual(CountingConfig.calls, 2)
+    
+    def test_probe_cache(self):
+        import os
+        from halogen.config import ProbeCache
+        from halogen.filesystem import TemporaryDirectory
+        
+        with TemporaryDirectory(prefix='test-probe-cache-') as td:
+            filename = td.subpath('probes.json')
+            probes = ProbeCache(filename=filename)
+            output = probes.probe("echo yo dogg")
+            self.assertEqual(output, "yo dogg")
+            self.assertTrue(os.path.isfile(filename))
+            
+            # A new cache reads the persisted outputs:
+            self.assertEqual(len(ProbeCache(filename=filename)), 1)
+            
+            # Changing the environment invalidates the outputs:
+            fingerprint = probes.fingerprint("echo yo dogg")
+            pkg_config_path = os.environ.get('PKG_CONFIG_PATH', None)
+            os.environ['PKG_CONFIG_PATH'] = "/yo/dogg"
+            try:
+                self.assertNotEqual(fingerprint, probes.fingerprint("echo yo dogg"))
+            finally:
+                if pkg_config_path is None:
+                    del os.environ['PKG_CONFIG_PATH']
+                else:
+                    os.environ['PKG_CONFIG_PATH'] = pkg_config_path
+            
+            probes.clear()
+            self.assertFalse(os.path.isfile(filename))
+    
     def test_config_compiler(self):
         from halogen import config
         from halogen.utils import test_compile